@@ -2,10 +2,206 @@
 
 import re
 import logging
+from collections import OrderedDict
 from datetime import datetime
 
+from config import MAX_REMEMBERED_RESTAURANTS
+from utils.date_parser import parse_date, parse_time
+from utils.helpers import approximate_size
+
 logger = logging.getLogger('conversation_context')
 
+# Tool parameters that can be filled from a follow-up message, and the kind
+# of value each one takes
+PARAMETER_SLOTS = {
+    "date": "date",
+    "reservation_date": "date",
+    "time": "time",
+    "reservation_time": "time",
+    "party_size": "party_size",
+    "customer_name": "customer_name",
+    "reservation_id": "reservation_id",
+    "customer_email": "customer_email",
+    "customer_phone": "customer_phone"
+}
+
+# How each parameter is asked for in a clarification question
+PARAMETER_LABELS = {
+    "restaurant_id": "which restaurant",
+    "date": "the date",
+    "reservation_date": "the date",
+    "time": "the time",
+    "reservation_time": "the time",
+    "party_size": "the number of people",
+    "customer_name": "the name for the reservation",
+    "reservation_id": "your reservation ID",
+    "customer_email": "your email address",
+    "customer_phone": "your phone number"
+}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12
+}
+
+_NUMBER = r"(\d{1,2}|" + "|".join(NUMBER_WORDS) + r")"
+PARTY_SIZE_PATTERNS = [
+    re.compile(_NUMBER + r"\s*(?:people|persons|person|guests|pax|diners|adults|of us)\b", re.IGNORECASE),
+    re.compile(r"\b(?:party|table|group) (?:of|for) " + _NUMBER + r"\b", re.IGNORECASE),
+    re.compile(r"\bfor " + _NUMBER + r"\b(?!\s*(?::|am|pm|a\.m|p\.m|o'clock))", re.IGNORECASE)
+]
+BARE_NUMBER_PATTERN = re.compile(r"^\s*" + _NUMBER + r"\s*[.!]?\s*$", re.IGNORECASE)
+RESERVATION_ID_PATTERN = re.compile(r"\b(res(?=[0-9a-z]*\d)[0-9a-z]+)\b", re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r"\b([\w.+-]+@[\w-]+(?:\.[\w-]+)+)\b")
+PHONE_PATTERN = re.compile(r"(\+?\d[\d\s-]{7,}\d)")
+NAME_INTRO_PATTERN = re.compile(
+    r"\b(?:my name is|name is|name's|under the name(?: of)?|under|book it for|for mr\.?|for ms\.?)\s+"
+    r"([a-z][a-z'.-]*(?:\s+[a-z][a-z'.-]*){0,2})", re.IGNORECASE)
+SELF_INTRO_PATTERN = re.compile(r"\b(?:i am|i'm|this is)\s+([A-Z][a-zA-Z'.-]*(?:\s+[A-Z][a-zA-Z'.-]*){0,2})")
+NAME_STOP_WORDS = {
+    "and", "for", "at", "on", "with", "please", "today", "tomorrow", "tonight", "people",
+    "yes", "no", "ok", "okay", "sure", "thanks", "thank", "the", "a", "an"
+}
+
+
+def _parse_number(text):
+    text = text.lower()
+    return NUMBER_WORDS[text] if text in NUMBER_WORDS else int(text)
+
+
+def _extract_party_size(message, only_slot):
+    for pattern in PARTY_SIZE_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            return _parse_number(match.group(1))
+    if only_slot:
+        match = BARE_NUMBER_PATTERN.match(message)
+        if match:
+            return _parse_number(match.group(1))
+    return None
+
+
+def _clean_name(words):
+    kept = []
+    for word in words.split():
+        if word.lower() in NAME_STOP_WORDS:
+            break
+        kept.append(word)
+    return " ".join(word.capitalize() if word.islower() else word for word in kept) or None
+
+
+def _extract_customer_name(message, only_slot):
+    for pattern in (NAME_INTRO_PATTERN, SELF_INTRO_PATTERN):
+        match = pattern.search(message)
+        if match:
+            name = _clean_name(match.group(1))
+            if name:
+                return name
+    if only_slot:
+        # A short answer made only of words, e.g. "Rahul Sharma"
+        text = message.strip().strip(".!")
+        if re.fullmatch(r"[A-Za-z][A-Za-z'.-]*(?:\s+[A-Za-z][A-Za-z'.-]*){0,3}", text):
+            return _clean_name(text)
+    return None
+
+
+def extract_parameters(message, wanted):
+    """
+    Pull tool parameter values out of a user message without calling the LLM.
+
+    Only the parameters asked for are looked at, which keeps ambiguous
+    answers (a bare "4", a bare name) from being read as the wrong thing.
+
+    Args:
+        message (str): The user's message
+        wanted (list): Names of the tool parameters to look for
+
+    Returns:
+        dict: Parameter name -> extracted value, for the ones found
+    """
+    slots = {PARAMETER_SLOTS[name] for name in wanted if name in PARAMETER_SLOTS}
+    only_slot = len(slots) == 1
+    values = {}
+    if "party_size" in slots:
+        values["party_size"] = _extract_party_size(message, only_slot)
+    if "date" in slots:
+        values["date"] = parse_date(message)
+    if "time" in slots:
+        values["time"] = parse_time(message)
+    if "reservation_id" in slots:
+        match = RESERVATION_ID_PATTERN.search(message)
+        values["reservation_id"] = match.group(1) if match else None
+    if "customer_email" in slots:
+        match = EMAIL_PATTERN.search(message)
+        values["customer_email"] = match.group(1) if match else None
+    if "customer_phone" in slots:
+        match = PHONE_PATTERN.search(message)
+        values["customer_phone"] = re.sub(r"[\s-]", "", match.group(1)) if match else None
+    if "customer_name" in slots:
+        values["customer_name"] = _extract_customer_name(message, only_slot)
+
+    return {name: values[PARAMETER_SLOTS[name]] for name in wanted
+            if values.get(PARAMETER_SLOTS.get(name)) is not None}
+
+
+def missing_parameters(args, required):
+    """
+    Get the required parameters that have no value yet.
+
+    Args:
+        args (dict): Tool arguments collected so far
+        required (list): Required parameter names from the tool schema
+
+    Returns:
+        list: Names of the missing parameters, in schema order
+    """
+    return [name for name in required if args.get(name) in (None, "")]
+
+def trim_history(history, max_messages):
+    """
+    Drop the oldest messages so at most max_messages remain.
+
+    The kept part always starts at a user message, so an assistant tool
+    call is never separated from its tool results.
+
+    Args:
+        history (list): Chat messages, oldest first
+        max_messages (int): Maximum number of messages to keep
+
+    Returns:
+        list: The kept messages (the same list if nothing was dropped)
+    """
+    if len(history) <= max_messages:
+        return history
+    start = len(history) - max_messages
+    while start < len(history) and history[start]["role"] != "user":
+        start += 1
+    if start == len(history):
+        # The last turn alone is longer than the limit; keep all of it
+        start = max(i for i, message in enumerate(history) if message["role"] == "user")
+    return history[start:]
+
+
+class RestaurantRef:
+    """The few fields of a restaurant the conversation needs to refer back to it."""
+
+    __slots__ = ("id", "name", "location", "cuisine")
+
+    def __init__(self, id, name, location=None, cuisine=None):
+        self.id = id
+        self.name = name
+        self.location = location
+        self.cuisine = cuisine
+
+    @classmethod
+    def from_restaurant(cls, restaurant):
+        """Build a reference from a full restaurant record."""
+        return cls(restaurant["id"], restaurant["name"], restaurant.get("location"), restaurant.get("cuisine"))
+
+    def __repr__(self):
+        return f"RestaurantRef({self.id!r}, {self.name!r})"
+
+
 class ConversationContextManager:
     """
     Manages the conversation context including tracking pending tools,
@@ -21,8 +217,8 @@ class ConversationContextManager:
         self.current_context = {
             "selected_restaurant_id": None,
             "selected_restaurant_name": None,
-            "last_search_results": [],
-            "restaurant_name_to_id_map": {},
+            "last_search_results": (),          # RestaurantRef for each restaurant shown
+            "restaurant_name_to_id_map": OrderedDict(),  # Most recently shown last
             "pending_tool_call": None,  # Track incomplete tool calls
             "missing_parameters": []    # Track which parameters we're waiting for
         }
@@ -46,6 +242,10 @@ class ConversationContextManager:
     def store_search_results(self, restaurants):
         """
         Store search results for future reference.
+
+        Only the ID, name, location and cuisine are kept, and the name to
+        ID map remembers the MAX_REMEMBERED_RESTAURANTS most recently shown
+        restaurants.
         
         Args:
             restaurants (list): List of restaurant objects
@@ -53,11 +253,47 @@ class ConversationContextManager:
         Returns:
             self: For method chaining
         """
-        self.current_context["last_search_results"] = restaurants
+        self.current_context["last_search_results"] = tuple(
+            RestaurantRef.from_restaurant(restaurant) for restaurant in restaurants)
         # Update restaurant name to ID mapping
-        for restaurant in restaurants:
-            self.current_context["restaurant_name_to_id_map"][restaurant["name"].lower()] = restaurant["id"]
+        name_map = self.current_context["restaurant_name_to_id_map"]
+        for ref in self.current_context["last_search_results"]:
+            name = ref.name.lower()
+            name_map[name] = ref.id
+            name_map.move_to_end(name)
+        while len(name_map) > MAX_REMEMBERED_RESTAURANTS:
+            name_map.popitem(last=False)
         return self
+
+    def get_search_results(self):
+        """
+        Get the restaurants from the last search.
+
+        Returns:
+            tuple: RestaurantRef for each restaurant, in the order they were shown
+        """
+        return self.current_context["last_search_results"]
+
+    def get_restaurant_id_by_name(self, name):
+        """
+        Look up a restaurant shown earlier in the conversation by its name.
+
+        Args:
+            name (str): Restaurant name (case-insensitive)
+
+        Returns:
+            str: Restaurant ID or None
+        """
+        return self.current_context["restaurant_name_to_id_map"].get(str(name).lower())
+
+    def memory_usage(self):
+        """
+        Estimate the memory held by this context.
+
+        Returns:
+            int: Approximate size in bytes
+        """
+        return approximate_size(self.current_context)
     
     def get_selected_restaurant_id(self):
         """
@@ -66,4 +302,105 @@ class ConversationContextManager:
         Returns:
             str: Selected restaurant ID or None
         """
-        return self.current_context["selected_restaurant_id"]
\ No newline at end of file
+        return self.current_context["selected_restaurant_id"]
+    
+    def get_search_result_ids(self):
+        """
+        Get the IDs of the restaurants from the last search.
+        
+        Returns:
+            list: Restaurant IDs in the order they were shown
+        """
+        return [ref.id for ref in self.current_context["last_search_results"]]
+
+    def set_pending_tool_call(self, tool_name, args, missing):
+        """
+        Remember a tool call that cannot run until the user answers some questions.
+
+        Args:
+            tool_name (str): Name of the tool
+            args (dict): Arguments collected so far
+            missing (list): Required parameters still without a value
+
+        Returns:
+            self: For method chaining
+        """
+        self.current_context["pending_tool_call"] = {"name": tool_name, "arguments": dict(args)}
+        self.current_context["missing_parameters"] = list(missing)
+        return self
+
+    def get_pending_tool_call(self):
+        """
+        Get the tool call waiting for parameters.
+
+        Returns:
+            dict: {"name", "arguments"} or None
+        """
+        return self.current_context["pending_tool_call"]
+
+    def get_missing_parameters(self):
+        """
+        Get the parameters the pending tool call is waiting for.
+
+        Returns:
+            list: Parameter names
+        """
+        return self.current_context["missing_parameters"]
+
+    def clear_pending_tool_call(self):
+        """
+        Forget the pending tool call.
+
+        Returns:
+            self: For method chaining
+        """
+        self.current_context["pending_tool_call"] = None
+        self.current_context["missing_parameters"] = []
+        return self
+
+    def fill_pending_tool_call(self, message):
+        """
+        Merge the missing parameters found in a follow-up message into the
+        pending tool call.
+
+        Args:
+            message (str): The user's message
+
+        Returns:
+            dict: The parameters that were filled (empty if none were found)
+        """
+        pending = self.current_context["pending_tool_call"]
+        if not pending:
+            return {}
+        filled = extract_parameters(message, self.current_context["missing_parameters"])
+        if filled:
+            pending["arguments"].update(filled)
+            self.current_context["missing_parameters"] = [
+                name for name in self.current_context["missing_parameters"] if name not in filled]
+            logger.info(f"Filled {sorted(filled)} for pending {pending['name']} call")
+        return filled
+
+    def clarification_question(self):
+        """
+        Build the question asking the user for the missing parameters.
+
+        Returns:
+            str: The question, or None if nothing is missing
+        """
+        missing = self.current_context["missing_parameters"]
+        if not missing:
+            return None
+        labels = []
+        for name in missing:
+            label = PARAMETER_LABELS.get(name, name.replace("_", " "))
+            if label not in labels:
+                labels.append(label)
+        if len(labels) == 1:
+            wanted = labels[0]
+        else:
+            wanted = ", ".join(labels[:-1]) + " and " + labels[-1]
+
+        restaurant = self.current_context["selected_restaurant_name"]
+        if restaurant and "restaurant_id" not in missing:
+            return f"Sure, I can help with {restaurant}. Could you tell me {wanted}?"
+        return f"Sure, I can help with that. Could you tell me {wanted}?"
\ No newline at end of file
@@ -0,0 +1,232 @@
+# agent/fuzzy_index.py - Character-trigram index for typo-tolerant name lookup
+
+import heapq
+from collections import Counter
+
+# Only the best candidates by trigram overlap get the (more expensive) edit distance check
+MAX_CANDIDATES = 12
+
+# Partial matches (a name fragment such as "silvr") are worth a little less than full ones
+PARTIAL_MATCH_WEIGHT = 0.9
+
+
+def trigrams(text):
+    """
+    Split text into padded character trigrams.
+
+    Args:
+        text (str): Normalized (lowercased) text
+
+    Returns:
+        frozenset: The distinct trigrams, including word-boundary padding
+    """
+    padded = f"  {text} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def bounded_edit_distance(a, b, max_distance):
+    """
+    Edit distance between two strings (insertions, deletions, substitutions
+    and adjacent transpositions), giving up early once it is known to exceed
+    max_distance.
+
+    Args:
+        a (str): First string
+        b (str): Second string
+        max_distance (int): Largest distance of interest
+
+    Returns:
+        int: The distance, or max_distance + 1 if it is larger than max_distance
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if len(a) > len(b):
+        a, b = b, a
+    before_previous = None
+    previous = list(range(len(a) + 1))
+    for j, char_b in enumerate(b, 1):
+        current = [j] + [0] * len(a)
+        row_min = j
+        for i, char_a in enumerate(a, 1):
+            cost = previous[i - 1] if char_a == char_b else previous[i - 1] + 1
+            if current[i - 1] + 1 < cost:
+                cost = current[i - 1] + 1
+            if previous[i] + 1 < cost:
+                cost = previous[i] + 1
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b and before_previous[i - 2] + 1 < cost:
+                cost = before_previous[i - 2] + 1
+            current[i] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > max_distance:
+            return max_distance + 1
+        before_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+def max_typos(length):
+    """Number of edits tolerated for a string of the given length."""
+    return max(1, length // 4)
+
+
+def _edit_similarity(query, text):
+    """Similarity in [0, 1] from the bounded edit distance, 0 if too far apart."""
+    limit = max_typos(len(query))
+    distance = bounded_edit_distance(query, text, limit)
+    if distance > limit:
+        return 0.0
+    return 1.0 - distance / max(len(query), len(text))
+
+
+def _partial_similarity(query, text):
+    """Best similarity between the query and any run of words in text of the same word count."""
+    query_words = query.split()
+    text_words = text.split()
+    width = len(query_words)
+    if not width or width >= len(text_words):
+        return 0.0
+    best = 0.0
+    for start in range(len(text_words) - width + 1):
+        window = " ".join(text_words[start:start + width])
+        best = max(best, _edit_similarity(query, window))
+    return best * PARTIAL_MATCH_WEIGHT
+
+
+class TrigramIndex:
+    """
+    Inverted index from character trigrams to keys, used to find the
+    entries closest to a possibly misspelled or partial query.
+    """
+
+    def __init__(self):
+        """Initialize an empty index."""
+        self._postings = {}   # trigram -> set of keys
+        self._grams = {}      # key -> frozenset of trigrams
+        self._texts = {}      # key -> indexed text
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, key):
+        return key in self._texts
+
+    def add(self, key, text):
+        """
+        Index text under key, replacing any previous text for that key.
+
+        Args:
+            key (hashable): Identifier returned by search()
+            text (str): Normalized text to index
+        """
+        if key in self._texts:
+            self.remove(key)
+        grams = trigrams(text)
+        self._texts[key] = text
+        self._grams[key] = grams
+        for gram in grams:
+            self._postings.setdefault(gram, set()).add(key)
+
+    def remove(self, key):
+        """
+        Remove a key from the index. Unknown keys are ignored.
+
+        Args:
+            key (hashable): Identifier to remove
+        """
+        grams = self._grams.pop(key, None)
+        if grams is None:
+            return
+        del self._texts[key]
+        for gram in grams:
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    def updated(self, remove=(), add=()):
+        """
+        Build a new index with some keys removed and others added, leaving
+        this one untouched so concurrent readers keep a consistent view.
+
+        Only the postings of the affected trigrams are copied, so the cost
+        depends on the size of the change rather than the size of the index.
+
+        Args:
+            remove (iterable): Keys to remove
+            add (iterable): (key, text) pairs to add or replace
+
+        Returns:
+            TrigramIndex: The updated copy
+        """
+        new = TrigramIndex()
+        new._postings = dict(self._postings)
+        new._grams = dict(self._grams)
+        new._texts = dict(self._texts)
+        copied = set()
+
+        def own(gram):
+            if gram not in copied:
+                new._postings[gram] = set(new._postings.get(gram, ()))
+                copied.add(gram)
+            return new._postings[gram]
+
+        add = list(add)
+        for key in list(remove) + [key for key, _ in add]:
+            grams = new._grams.pop(key, None)
+            if grams is None:
+                continue
+            del new._texts[key]
+            for gram in grams:
+                keys = own(gram)
+                keys.discard(key)
+                if not keys:
+                    del new._postings[gram]
+                    copied.discard(gram)
+        for key, text in add:
+            grams = trigrams(text)
+            new._texts[key] = text
+            new._grams[key] = grams
+            for gram in grams:
+                own(gram).add(key)
+        return new
+
+    def search(self, query, limit=5, min_score=0.0):
+        """
+        Find the indexed texts most similar to the query.
+
+        Candidates are gathered from the trigram postings and ranked by
+        Jaccard overlap; the best of them are re-scored with a bounded edit
+        distance against the whole text and against runs of its words, so
+        both typos ("silvr tabel") and partial names ("silvr") score well.
+
+        Args:
+            query (str): Normalized query text
+            limit (int): Maximum number of results
+            min_score (float): Minimum confidence to include
+
+        Returns:
+            list: (key, text, score) tuples, best first, with score in [0, 1]
+        """
+        query_grams = trigrams(query)
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._postings.get(gram, ()))
+        if not shared:
+            return []
+
+        query_size = len(query_grams)
+        grams = self._grams
+        candidates = heapq.nlargest(
+            MAX_CANDIDATES,
+            ((overlap / (query_size + len(grams[key]) - overlap), key) for key, overlap in shared.items()),
+            key=lambda c: c[0])
+
+        results = []
+        for jaccard, key in candidates:
+            text = self._texts[key]
+            score = max(jaccard, _edit_similarity(query, text) or _partial_similarity(query, text))
+            if score >= min_score:
+                results.append((key, text, round(score, 3)))
+        results.sort(key=lambda r: r[2], reverse=True)
+        return results[:limit]
@@ -5,6 +5,10 @@ import sys
 import logging
 import time
 import random
+import uuid
+import contextvars
+import functools
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import List, Dict, Any, Optional
 
 # Add parent directory to path so we can import from other modules
@@ -13,17 +17,22 @@ sys.path.append(str(Path(__file__).parent.parent))
 from config import GROQ_API_KEYS  # Modified to support multiple API keys
 from agent.prompt import get_system_prompt
 from agent.restaurant_resolver import RestaurantResolver
-from agent.conversation_context import ConversationContextManager
+from agent.conversation_context import ConversationContextManager, missing_parameters, trim_history
 
-from tools.restaurant_tools import (
-    get_cuisines, get_locations, get_features,
-    check_availability, create_reservation, get_reservation, cancel_reservation,
-    recommend_restaurants, modify_reservation, load_json_file
-)
-from config import RESTAURANTS_FILE
+from tools.registry import get_tool
+from tools.reservation_archive import start_retention_job
+from config import (RESTAURANTS_FILE, METRICS_EXPORT_FILE, METRICS_PORT, TOOL_WORKERS, MAX_HISTORY_MESSAGES,
+                    RETENTION_INTERVAL_HOURS)
+from utils.singleflight import SingleFlight, make_key
+from utils.metrics import REGISTRY, start_metrics_server
+from utils.tracing import start_trace, span, current_span
+from utils.profiling import profile_turn, profiled
+from utils.date_parser import parse_date, parse_time
+from utils.helpers import is_valid_date_format, is_valid_time_format, approximate_size
 
 # Tool definitions
 from .tool_definitions import TOOL_DEFINITIONS
+from .validation import compile_validators, validation_error
 
 # Setup logging
 logging.basicConfig(
@@ -38,26 +47,121 @@ MAX_RETRIES = 3
 RETRY_DELAY_BASE = 2  # seconds
 RETRY_JITTER = 1  # seconds
 
+# Arguments holding dates and times, normalized before tools run
+DATE_PARAMETERS = ("date", "reservation_date")
+TIME_PARAMETERS = ("time", "reservation_time")
+
+# Shared across every LLMService instance so concurrent sessions coalesce
+_tool_flight = SingleFlight("tools")
+_api_flight = SingleFlight("llm_api")
+
+# Argument validators, compiled once from the tool schemas
+TOOL_VALIDATORS = compile_validators(TOOL_DEFINITIONS)
+
+# Tools run here so a stuck one cannot hold up process_query past its timeout
+_tool_executor = ThreadPoolExecutor(max_workers=TOOL_WORKERS, thread_name_prefix="tool")
+
+# Metrics
+STAGE_LATENCY = REGISTRY.histogram(
+    "foodiespot_query_stage_duration_seconds",
+    "Time spent in each stage of process_query")
+TOOL_LATENCY = REGISTRY.histogram(
+    "foodiespot_tool_duration_seconds",
+    "Tool execution time by tool")
+TOOL_VALIDATION_ERRORS = REGISTRY.counter(
+    "foodiespot_tool_invalid_arguments_total",
+    "Tool arguments rejected before execution by tool, parameter and error")
+TOOL_TIMEOUTS = REGISTRY.counter(
+    "foodiespot_tool_timeouts_total",
+    "Tool calls abandoned after their timeout by tool")
+TOOL_LATE_RESULTS = REGISTRY.counter(
+    "foodiespot_tool_late_results_total",
+    "Results of abandoned tool calls that were discarded by tool and outcome")
+API_LATENCY = REGISTRY.histogram(
+    "foodiespot_llm_request_duration_seconds",
+    "Latency of individual LLM API HTTP attempts by API key index")
+API_RESPONSES = REGISTRY.counter(
+    "foodiespot_llm_responses_total",
+    "LLM API HTTP responses by API key index and status code")
+API_RETRIES = REGISTRY.counter(
+    "foodiespot_llm_retries_total",
+    "LLM API retries by reason")
+API_RATE_LIMITED = REGISTRY.counter(
+    "foodiespot_llm_rate_limited_total",
+    "LLM API 429 responses by API key index")
+TOKENS_USED = REGISTRY.counter(
+    "foodiespot_llm_tokens_total",
+    "Tokens reported in the LLM API usage field by kind")
+SESSION_MEMORY = REGISTRY.histogram(
+    "foodiespot_session_memory_bytes",
+    "Approximate memory held by a conversation after each query",
+    buckets=(4096, 16384, 65536, 262144, 1048576, 4194304))
+
+
+def _discard_late_result(tool_name, future):
+    """Log and drop the result of a tool call its caller stopped waiting for."""
+    if future.cancelled():
+        return
+    error = future.exception()
+    outcome = "error" if error else "completed"
+    TOOL_LATE_RESULTS.inc(tool=tool_name, outcome=outcome)
+    logger.warning(f"Discarded late result of {tool_name} ({outcome}{': ' + str(error) if error else ''})")
+
+
+def create_http_session(pool_size=16):
+    """
+    Create a pooled HTTP session for the LLM API that can be shared by every
+    conversation in the process.
+    
+    Args:
+        pool_size (int): Maximum number of kept-alive connections per host
+        
+    Returns:
+        requests.Session: The session
+    """
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    return session
+
 
 class LLMService:
     """Service to handle communication with the Groq API using direct REST calls."""
     
-    def __init__(self):
-        """Initialize the AI service with separate components for different concerns."""
+    def __init__(self, restaurant_resolver=None, http_session=None):
+        """
+        Initialize the AI service with separate components for different concerns.
+        
+        Args:
+            restaurant_resolver (RestaurantResolver, optional): Shared resolver;
+                a new one is loaded from disk when omitted
+            http_session (requests.Session, optional): Shared connection pool
+                for API calls; plain requests are used when omitted
+        """
         self.api_keys = GROQ_API_KEYS  # Now a list of API keys
         self.current_key_index = 0
         self.api_url = "https://api.groq.com/openai/v1/chat/completions"
         self.model = "llama3-8b-8192"
         self.system_prompt = get_system_prompt()
         self.tool_definitions = TOOL_DEFINITIONS
+        self.required_parameters = {
+            tool["function"]["name"]: tool["function"]["parameters"].get("required", [])
+            for tool in TOOL_DEFINITIONS
+        }
         self.conversation_history = []
 
-        self.restaurant_resolver = RestaurantResolver()
+        self.restaurant_resolver = restaurant_resolver or RestaurantResolver()
+        self.http = http_session or requests
         self.context_manager = ConversationContextManager()
 
         # Headers will be set dynamically for each request
         self.update_headers()
 
+        if METRICS_PORT:
+            start_metrics_server(METRICS_PORT)
+        if RETENTION_INTERVAL_HOURS:
+            start_retention_job(RETENTION_INTERVAL_HOURS)
+
     def update_headers(self):
         """Update headers with the current API key."""
         self.headers = {
@@ -69,12 +173,17 @@ class LLMService:
         """Rotate to the next available API key."""
         self.current_key_index = (self.current_key_index + 1) % len(self.api_keys)
         logger.info(f"Rotating to API key index {self.current_key_index}")
+        current_span().add_event("rotate_api_key", key_index=self.current_key_index)
         self.update_headers()
 
     def make_api_request(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         """
         Make an API request with retry logic for rate limiting.
         
+        Identical concurrent requests share one response only when the payload
+        is deterministic (temperature 0); sampled completions, with their own
+        tool call IDs, are never shared between sessions.
+        
         Args:
             url (str): The API endpoint URL
             payload (dict): The request payload
@@ -85,46 +194,67 @@ class LLMService:
         Raises:
             Exception: If all retries fail
         """
+        coalesced = payload.get("temperature") == 0
+        with span("llm_request", coalesced=coalesced):
+            if coalesced:
+                return _api_flight.do(make_key(url, payload), self._send_api_request, url, payload)
+            return self._send_api_request(url, payload)
+
+    def _send_api_request(self, url: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a single logical API request, retrying and rotating keys as needed."""
         retries = 0
         tried_keys = set()
+        attempt = 0
         
         while retries < MAX_RETRIES * len(self.api_keys):
+            key_index = self.current_key_index
+            attempt += 1
             try:
-                response = requests.post(
-                    url,
-                    headers=self.headers,
-                    json=payload,
-                    timeout=30  # Add timeout
-                )
+                with span("http_attempt", attempt=attempt, key_index=key_index) as attempt_span, \
+                        API_LATENCY.time(key_index=key_index):
+                    response = self.http.post(
+                        url,
+                        headers=self.headers,
+                        json=payload,
+                        timeout=30  # Add timeout
+                    )
+                    attempt_span.set_attribute("status_code", response.status_code)
                 
                 # Log response code
                 logger.info(f"LLM API Response Status: {response.status_code}")
+                API_RESPONSES.inc(key_index=key_index, status=response.status_code)
                 
                 # Handle rate limiting (429) errors
                 if response.status_code == 429:
+                    API_RATE_LIMITED.inc(key_index=key_index)
                     tried_keys.add(self.current_key_index)
                     
                     # If we've tried all keys, wait and retry
                     if len(tried_keys) == len(self.api_keys):
                         retry_delay = RETRY_DELAY_BASE * (2 ** retries) + random.uniform(0, RETRY_JITTER)
                         logger.warning(f"Rate limited on all API keys. Retrying in {retry_delay:.2f} seconds...")
+                        current_span().add_event("retry_backoff", delay_seconds=round(retry_delay, 3))
                         time.sleep(retry_delay)
                         retries += 1
                     
                     # Try the next API key
+                    API_RETRIES.inc(reason="rate_limited")
                     self.rotate_api_key()
                     continue
                 
                 # Handle other errors
                 response.raise_for_status()
-                return response.json()
+                response_data = response.json()
+                self._record_token_usage(response_data)
+                return response_data
                 
             except requests.exceptions.RequestException as e:
                 # For network errors, retry with backoff
                 retries += 1
+                API_RETRIES.inc(reason="request_error")
                 retry_delay = RETRY_DELAY_BASE * (2 ** retries) + random.uniform(0, RETRY_JITTER)
                 
-                if isinstance(e, requests.exceptions.HTTPError) and e.response.status_code == 429:
+                if isinstance(e, requests.exceptions.HTTPError) and e.response is not None and e.response.status_code == 429:
                     # For rate limiting, try a different key first
                     tried_keys.add(self.current_key_index)
                     if len(tried_keys) < len(self.api_keys):
@@ -132,26 +262,70 @@ class LLMService:
                         retry_delay = 0  # No delay when switching keys
                 
                 logger.warning(f"API request failed: {str(e)}. Retrying in {retry_delay:.2f} seconds...")
-                print("\nError - MESSAGE:", e.response.json(), "\n")
+                current_span().add_event("retry_backoff", delay_seconds=round(retry_delay, 3), error=str(e))
+                if e.response is not None:
+                    logger.error(f"API error response ({e.response.status_code}): {e.response.text}")
                 time.sleep(retry_delay)
                 
                 # If we've exhausted all retries, raise the exception
                 if retries >= MAX_RETRIES * len(self.api_keys):
                     raise Exception(f"Failed after {retries} retries: {str(e)}")
 
-    def process_query(self, user_query):
+    @staticmethod
+    def _record_token_usage(response_data):
+        """Add the token counts from a completion's usage field to the metrics."""
+        usage = response_data.get("usage") or {}
+        request_span = current_span()
+        for kind in ("prompt_tokens", "completion_tokens", "total_tokens"):
+            if isinstance(usage.get(kind), int):
+                TOKENS_USED.inc(usage[kind], kind=kind[:-len("_tokens")])
+                request_span.set_attribute(kind, usage[kind])
+
+    def process_query(self, user_query, profile=False):
         """
         Process a user query through the LLM and execute any tool calls.
+
+        Afterwards the conversation history is trimmed to the last
+        MAX_HISTORY_MESSAGES messages (whole turns at a time).
         
         Args:
             user_query (str): The user's query
+            profile (bool): Profile this query even if it is not sampled
             
         Returns:
             dict: The AI response and any tool results
         """
+        turn_id = uuid.uuid4().hex
+        try:
+            with profile_turn(turn_id, force=profile) as profile_dir, \
+                    start_trace("process_query", trace_id=turn_id, query_chars=len(user_query)), \
+                    STAGE_LATENCY.time(stage="total"):
+                result = self._process_query(user_query)
+            self.conversation_history = trim_history(self.conversation_history, MAX_HISTORY_MESSAGES)
+            SESSION_MEMORY.observe(self.memory_usage()["total_bytes"])
+            result["turn_id"] = turn_id
+            if profile_dir:
+                result["profile_dir"] = profile_dir
+            return result
+        finally:
+            if METRICS_EXPORT_FILE:
+                REGISTRY.write_prometheus(METRICS_EXPORT_FILE)
+
+    @staticmethod
+    def _annotate_payload(payload_span, payload):
+        """Record payload size attributes on a span, only paying for it while tracing."""
+        if payload_span.recording:
+            payload_span.set_attribute("messages", len(payload["messages"]))
+            payload_span.set_attribute("payload_bytes", len(json.dumps(payload)))
+
+    def _process_query(self, user_query):
+        """Run one conversation turn; see process_query()."""
 
         # Extract restaurant ID if mentioned in the query
-        restaurant_id, restaurant_name = self.restaurant_resolver.resolve_restaurant_from_query(user_query)
+        with span("resolve_restaurant") as resolve_span, STAGE_LATENCY.time(stage="resolve_restaurant"):
+            restaurant_id, restaurant_name = self.restaurant_resolver.resolve_restaurant_from_query(
+                user_query, context_ids=self.context_manager.get_search_result_ids())
+            resolve_span.set_attribute("restaurant_id", restaurant_id)
 
         # print("RESOLVED RESTAURANT : ", restaurant_id, restaurant_name, "\n")
 
@@ -163,21 +337,31 @@ class LLMService:
         self.conversation_history.append({"role": "user", "content": user_query})
 
         try:
+            # Answer to a clarification question: fill in the pending tool call locally
+            if self.context_manager.get_pending_tool_call():
+                with span("slot_filling"), STAGE_LATENCY.time(stage="slot_filling"):
+                    result = self._continue_pending_tool_call(user_query)
+                if result is not None:
+                    return result
+
             # Prepare the request payload
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": self.system_prompt},
-                    *self.conversation_history
-                ],
-                "tools": self.tool_definitions,
-                "tool_choice": "auto"
-            }
+            with span("build_payload", completion="first") as payload_span:
+                payload = {
+                    "model": self.model,
+                    "messages": [
+                        {"role": "system", "content": self.system_prompt},
+                        *self.conversation_history
+                    ],
+                    "tools": self.tool_definitions,
+                    "tool_choice": "auto"
+                }
+                self._annotate_payload(payload_span, payload)
 
             # print("\nFirst_PAYLOAD : ", payload, "\n")
             
             # Make the API call with retry logic
-            response_data = self.make_api_request(self.api_url, payload)
+            with STAGE_LATENCY.time(stage="first_completion"):
+                response_data = self.make_api_request(self.api_url, payload)
             
             # print("LLM_RESPONSE : ", response_data, "\n")
             
@@ -193,72 +377,22 @@ class LLMService:
                     function_args = json.loads(tool_call["function"]["arguments"])
 
                     # Preprocess the arguments to correct restaurant identification
-                    function_args = self._preprocess_tool_args(function_name, function_args)
+                    function_args = self._preprocess_tool_args(function_name, function_args, user_query)
 
                     # print("\nTOOL_CALL : ", function_name, function_args, "\n")
-                    
-                    # Execute the appropriate tool
-                    tool_response = self._execute_tool(function_name, function_args)
-                    
-                    # Add the tool call and response to conversation history
-                    self.conversation_history.append({
-                        "role": "assistant",
-                        "content": None,
-                        "tool_calls": [
-                            {
-                                "id": tool_call["id"],
-                                "type": "function",
-                                "function": {
-                                    "name": function_name,
-                                    "arguments": tool_call["function"]["arguments"]
-                                }
-                            }
-                        ]
-                    })
-                    
-                    self.conversation_history.append({
-                        "role": "tool",
-                        "tool_call_id": tool_call["id"],
-                        "content": json.dumps(tool_response)
-                    })
 
-                    # If recommend_restaurants was called, store the results
-                    if function_name == "recommend_restaurants" and tool_response.get("restaurants"):
-                        self.context_manager.store_search_results(tool_response.get("restaurants", []))
+                    # If required parameters are missing, ask for them ourselves and
+                    # fill them in locally from the user's answer
+                    missing = missing_parameters(function_args, self.required_parameters.get(function_name, []))
+                    if missing:
+                        self.context_manager.set_pending_tool_call(function_name, function_args, missing)
+                        return self._ask_for_missing_parameters()
 
+                    tool_response = self._run_tool_call(
+                        tool_call["id"], function_name, function_args, tool_call["function"]["arguments"])
 
-                # Make a second API call to get a response based on the tool results
-                second_payload = {
-                    "model": self.model,
-                    "messages": [
-                        {"role": "system", "content": self.system_prompt},
-                        *self.conversation_history
-                    ],
-                    "max_tokens": 1024
-                }
+                return self._respond_with_tool_results(function_name, function_args, tool_response)
 
-                # print("\n SECOND_PAYLOAD : ", self.conversation_history, "\n")
-                
-                # Make the second API call with retry logic
-                second_response_data = self.make_api_request(self.api_url, second_payload)
-                
-                # Add the final assistant response to history
-                final_response = second_response_data["choices"][0]["message"]["content"]
-                self.conversation_history.append({
-                    "role": "assistant",
-                    "content": final_response
-                })
-                
-                return {
-                    "response": final_response,
-                    "tool_calls": True,
-                    "debug_info": {
-                        "tool_name": function_name,
-                        "tool_args": function_args,
-                        "tool_response": tool_response
-                    }
-                }
-                
             else:
                 # No tool calls, just return the normal response
                 response_text = assistant_message["content"]
@@ -279,9 +413,167 @@ class LLMService:
             logger.error(error_message, exc_info=True)
             return {"response": error_message, "tool_calls": False, "error": True}
         
+    def _run_tool_call(self, tool_call_id, function_name, function_args, arguments_json):
+        """
+        Execute a tool call and record it and its result in the conversation history.
+
+        Args:
+            tool_call_id (str): ID of the tool call
+            function_name (str): Name of the tool
+            function_args (dict): Preprocessed arguments
+            arguments_json (str): Arguments as sent in the tool call
+
+        Returns:
+            dict: The tool response
+        """
+        # Execute the appropriate tool
+        with STAGE_LATENCY.time(stage="tool_execution"):
+            tool_response = self._execute_tool(function_name, function_args)
+
+        # Add the tool call and response to conversation history
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": tool_call_id,
+                    "type": "function",
+                    "function": {
+                        "name": function_name,
+                        "arguments": arguments_json
+                    }
+                }
+            ]
+        })
+
+        self.conversation_history.append({
+            "role": "tool",
+            "tool_call_id": tool_call_id,
+            "content": json.dumps(tool_response)
+        })
+
+        # If recommend_restaurants was called, store the results
+        if function_name == "recommend_restaurants" and tool_response.get("restaurants"):
+            self.context_manager.store_search_results(tool_response.get("restaurants", []))
+
+        return tool_response
+
+    def _respond_with_tool_results(self, function_name, function_args, tool_response):
+        """
+        Ask the LLM to answer the user from the tool results in the history.
+
+        Args:
+            function_name (str): Name of the last tool called
+            function_args (dict): Its arguments
+            tool_response (dict): Its response
+
+        Returns:
+            dict: Response data as returned by process_query()
+        """
+        # Make a second API call to get a response based on the tool results
+        with span("build_payload", completion="second") as payload_span:
+            second_payload = {
+                "model": self.model,
+                "messages": [
+                    {"role": "system", "content": self.system_prompt},
+                    *self.conversation_history
+                ],
+                "max_tokens": 1024
+            }
+            self._annotate_payload(payload_span, second_payload)
+
+        # print("\n SECOND_PAYLOAD : ", self.conversation_history, "\n")
+
+        # Make the second API call with retry logic
+        with STAGE_LATENCY.time(stage="second_completion"):
+            second_response_data = self.make_api_request(self.api_url, second_payload)
+
+        # Add the final assistant response to history
+        final_response = second_response_data["choices"][0]["message"]["content"]
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": final_response
+        })
+
+        return {
+            "response": final_response,
+            "tool_calls": True,
+            "debug_info": {
+                "tool_name": function_name,
+                "tool_args": function_args,
+                "tool_response": tool_response
+            }
+        }
+
+    def _ask_for_missing_parameters(self):
+        """
+        Ask the user for the parameters the pending tool call still needs,
+        without a round trip to the LLM.
+
+        Returns:
+            dict: Response data as returned by process_query()
+        """
+        pending = self.context_manager.get_pending_tool_call()
+        question = self.context_manager.clarification_question()
+        self.conversation_history.append({
+            "role": "assistant",
+            "content": question
+        })
+        logger.info(f"Waiting for {self.context_manager.get_missing_parameters()} to call {pending['name']}")
+        return {
+            "response": question,
+            "tool_calls": False,
+            "debug_info": {
+                "pending_tool": pending["name"],
+                "tool_args": pending["arguments"],
+                "missing_parameters": self.context_manager.get_missing_parameters()
+            }
+        }
+
+    def _continue_pending_tool_call(self, user_query):
+        """
+        Fill the pending tool call from the user's answer and run it once
+        every required parameter is known.
+
+        Args:
+            user_query (str): The user's answer
+
+        Returns:
+            dict: Response data, or None if the message did not answer the
+                question and should go to the LLM instead
+        """
+        pending = self.context_manager.get_pending_tool_call()
+        function_name = pending["name"]
+        waiting_for = len(self.context_manager.get_missing_parameters())
+
+        self.context_manager.fill_pending_tool_call(user_query)
+        function_args = self._preprocess_tool_args(function_name, pending["arguments"], user_query)
+        missing = missing_parameters(function_args, self.required_parameters.get(function_name, []))
+
+        if len(missing) >= waiting_for:
+            # Not an answer (e.g. the user changed their mind); let the LLM take it from here
+            logger.info(f"No parameters for pending {function_name} call found, dropping it")
+            self.context_manager.clear_pending_tool_call()
+            return None
+
+        if missing:
+            self.context_manager.set_pending_tool_call(function_name, function_args, missing)
+            return self._ask_for_missing_parameters()
+
+        self.context_manager.clear_pending_tool_call()
+        tool_call_id = f"call_local_{uuid.uuid4().hex[:12]}"
+        tool_response = self._run_tool_call(tool_call_id, function_name, function_args, json.dumps(function_args))
+        return self._respond_with_tool_results(function_name, function_args, tool_response)
+
     def _execute_tool(self, tool_name, args):
         """
         Execute a tool based on the AI's request.
+
+        Arguments are validated against the tool's schema first; invalid
+        calls are answered with the list of problems without running the
+        tool. The tool then runs on the shared worker pool under its
+        timeout, and identical concurrent calls to read-only tools share
+        one execution.
         
         Args:
             tool_name (str): Name of the tool to execute
@@ -290,73 +582,87 @@ class LLMService:
         Returns:
             dict: Result of the tool execution
         """
-        try:    
-            if tool_name == "get_cuisines":
-                return get_cuisines()
-                
-            elif tool_name == "get_locations":
-                return get_locations()
-                
-            elif tool_name == "get_features":
-                return get_features()
-                
-            elif tool_name == "check_availability":
-                return check_availability(
-                    restaurant_id=args.get("restaurant_id"),
-                    date=args.get("date"),
-                    time=args.get("time"),
-                    party_size=args.get("party_size")
-                )
-                
-            elif tool_name == "create_reservation":
-                return create_reservation(
-                    restaurant_id=args.get("restaurant_id"),
-                    customer_name=args.get("customer_name"),
-                    party_size=args.get("party_size"),
-                    reservation_date=args.get("reservation_date"),
-                    reservation_time=args.get("reservation_time"),
-                    customer_email=args.get("customer_email"),
-                    customer_phone=args.get("customer_phone"),
-                    special_requests=args.get("special_requests")
-                )
-                
-            elif tool_name == "get_reservation":
-                return get_reservation(
-                    reservation_id=args.get("reservation_id")
-                )
-                
-            elif tool_name == "cancel_reservation":
-                return cancel_reservation(
-                    reservation_id=args.get("reservation_id")
-                )
-                
-            elif tool_name == "recommend_restaurants":
-                return recommend_restaurants(
-                    party_size=args.get("party_size"),
-                    date=args.get("date"),
-                    time=args.get("time"),
-                    location=args.get("location"),
-                    cuisine=args.get("cuisine"),
-                    price_range=args.get("price_range"),
-                    features=args.get("features"),
-                    limit=args.get("limit", 5)
-                )
-                
-            else:
+        with span("execute_tool", tool=tool_name) as tool_span, TOOL_LATENCY.time(tool=tool_name):
+            # Check and coerce the arguments before any file is touched
+            validator = TOOL_VALIDATORS.get(tool_name)
+            if validator is None:
                 return {"error": f"Unknown tool: {tool_name}"}
-                
+            args, errors = validator.validate(args)
+            if errors:
+                for error in errors:
+                    TOOL_VALIDATION_ERRORS.inc(tool=tool_name, parameter=error["parameter"], error=error["error"])
+                tool_span.set_attribute("invalid_arguments", len(errors))
+                logger.warning(f"Rejected {tool_name} call: {errors}")
+                return validation_error(tool_name, errors)
+
+            tool = get_tool(tool_name)
+            if tool.read_only:
+                call = functools.partial(
+                    _tool_flight.do, make_key(tool_name, args), self._dispatch_tool, tool_name, args)
+            else:
+                call = functools.partial(self._dispatch_tool, tool_name, args)
+            return self._run_with_timeout(tool, call, tool_span)
+
+    @staticmethod
+    def _run_with_timeout(tool, call, tool_span):
+        """
+        Run a tool call on the worker pool and wait at most the tool's timeout.
+
+        A call that misses its deadline is left to finish in the background
+        and its result is thrown away; write tools are idempotent, so the
+        user retrying cannot book twice.
+
+        Args:
+            tool (Tool): The registered tool
+            call (callable): Runs the tool with its arguments
+            tool_span (Span): Span of the tool execution
+
+        Returns:
+            dict: The tool's result, or a timeout error
+        """
+        # Run in a copy of this context so spans opened by the tool nest under this
+        # one, and profiled so a profiled turn includes the tool's work
+        future = _tool_executor.submit(contextvars.copy_context().run, profiled(call))
+        try:
+            return future.result(timeout=tool.timeout)
+        except FutureTimeoutError:
+            if not future.cancel():
+                future.add_done_callback(functools.partial(_discard_late_result, tool.name))
+            TOOL_TIMEOUTS.inc(tool=tool.name)
+            tool_span.add_event("timeout", seconds=tool.timeout)
+            logger.error(f"Tool {tool.name} did not finish within {tool.timeout:g}s")
+
+            error = {
+                "error": f"{tool.name} did not finish within {tool.timeout:g} seconds.",
+                "timed_out": True
+            }
+            if tool.read_only:
+                error["error"] += " It is safe to try again."
+            else:
+                error["error"] += (" The change may still go through; check the reservation"
+                                   " before trying again.")
+            return error
+
+    def _dispatch_tool(self, tool_name, args):
+        """Run the named tool function with the given arguments."""
+        tool = get_tool(tool_name)
+        if tool is None:
+            return {"error": f"Unknown tool: {tool_name}"}
+        try:
+            return tool(**args)
         except Exception as e:
             logger.error(f"Error executing {tool_name}: {str(e)}", exc_info=True)
             return {"error": f"Error executing {tool_name}: {str(e)}"}
-        
 
-    def _preprocess_tool_args(self, function_name, args):
+    def _preprocess_tool_args(self, function_name, args, user_query=None):
         """
         Preprocess tool arguments to ensure consistent restaurant ID handling.
         
         Args:
             function_name (str): Name of the function being called
             args (dict): Arguments to the function
+            user_query (str, optional): The user's query, used to tell apart
+                restaurants that share a name
             
         Returns:
             dict: Processed arguments with corrected restaurant IDs
@@ -372,25 +678,112 @@ class LLMService:
                 
                 # If it's not in the correct format (not starting with "rest"), it might be a name
                 if not str(restaurant_id).startswith("rest"):
-                    # Check if it's a name we recognize
+                    # Check if it's a name we recognize, tolerating typos
                     restaurant_name = str(restaurant_id).lower()
-                    resolved_id = self.restaurant_resolver.resolve_id_from_name(restaurant_name)
+                    resolved_id = self.restaurant_resolver.resolve_id_from_name(
+                        restaurant_name, query=user_query, context_ids=self.context_manager.get_search_result_ids())
                     
                     if resolved_id:
                         # Replace with the correct ID
                         processed_args["restaurant_id"] = resolved_id
                         logger.info(f"Preprocessed: Replaced restaurant name '{restaurant_name}' with ID '{processed_args['restaurant_id']}'")
-                    elif self.context_manager.get_selected_restaurant_id():
+                    elif self._selected_restaurant_fits(restaurant_name):
                         # Fallback to the selected restaurant ID
                         processed_args["restaurant_id"] = self.context_manager.get_selected_restaurant_id()
                         logger.info(f"Preprocessed: Using selected restaurant ID '{processed_args['restaurant_id']}' for '{restaurant_name}'")
+                    else:
+                        logger.warning(f"Preprocessed: Could not settle which restaurant '{restaurant_name}' refers to")
             # If no restaurant_id is provided but we have one in context, use it
             elif self.context_manager.get_selected_restaurant_id():
                 processed_args["restaurant_id"] = self.context_manager.get_selected_restaurant_id()
                 logger.info(f"Preprocessed: Using restaurant ID '{processed_args['restaurant_id']}' from context")
-        
+
+        # Fix dates and times the LLM did not convert to YYYY-MM-DD / HH:MM
+        required = self.required_parameters.get(function_name, [])
+        for param in DATE_PARAMETERS:
+            self._normalize_arg(processed_args, param, is_valid_date_format, parse_date, user_query, param in required)
+        for param in TIME_PARAMETERS:
+            self._normalize_arg(processed_args, param, is_valid_time_format, parse_time, user_query, param in required)
+
         return processed_args
 
+    @staticmethod
+    def _normalize_arg(args, param, is_valid, parse, user_query=None, required=False):
+        """
+        Rewrite a date or time argument into the format the tools expect.
+
+        A value already in that format is kept as the model gave it; any
+        other value is parsed ("tomorrow", "7pm"). The user's query is only
+        read when the argument is empty, or missing but required, since a
+        date or time in the query may be one the model chose not to use.
+
+        Args:
+            args (dict): Arguments to fix in place
+            param (str): Name of the argument
+            is_valid (callable): Format check the tools apply
+            parse (callable): Parser returning the normalized value or None
+            user_query (str, optional): The user's query
+            required (bool): Whether the tool needs the argument
+        """
+        value = args.get(param)
+        if value in (None, ""):
+            if (param in args or required) and user_query:
+                normalized = parse(user_query)
+                if normalized:
+                    args[param] = normalized
+                    logger.info(f"Preprocessed: Took {param} '{normalized}' from the query")
+            return
+        value = str(value)
+        if is_valid(value):
+            return
+        normalized = parse(value)
+        if normalized:
+            args[param] = normalized
+            logger.info(f"Preprocessed: Normalized {param} '{value}' to '{normalized}'")
+
+    def _selected_restaurant_fits(self, restaurant_name):
+        """
+        Check whether the selected restaurant can stand in for an unresolved name.
+        
+        It can, unless the name is shared by several other restaurants, in
+        which case falling back could book the wrong venue.
+        """
+        selected_id = self.context_manager.get_selected_restaurant_id()
+        if not selected_id:
+            return False
+        same_name_ids = self.restaurant_resolver.name_to_ids_map.get(restaurant_name, [])
+        return not same_name_ids or selected_id in same_name_ids
+
+    @staticmethod
+    def coalescing_stats():
+        """
+        Get counters for requests coalesced by the single-flight layer.
+        
+        Returns:
+            dict: Stats for tool executions and LLM API calls
+        """
+        return {
+            "tools": _tool_flight.stats(),
+            "llm_api": _api_flight.stats()
+        }
+
+    def memory_usage(self):
+        """
+        Estimate the memory held by this conversation.
+
+        Returns:
+            dict: Number of history messages and approximate bytes held by
+                the history, the context and in total
+        """
+        history_bytes = approximate_size(self.conversation_history)
+        context_bytes = self.context_manager.memory_usage()
+        return {
+            "history_messages": len(self.conversation_history),
+            "history_bytes": history_bytes,
+            "context_bytes": context_bytes,
+            "total_bytes": history_bytes + context_bytes
+        }
+
     def reset_conversation(self):
         """Reset the conversation history."""
         self.conversation_history = []
@@ -0,0 +1,124 @@
+# agent/name_matcher.py - Aho-Corasick multi-pattern matcher for restaurant names
+
+class AhoCorasickMatcher:
+    """
+    Finds every occurrence of a fixed set of patterns in a text with a single
+    pass, in O(len(text) + number of matches), regardless of how many
+    patterns there are.
+
+    Patterns are added with add() and the automaton is built lazily on the
+    first search; adding more patterns afterwards triggers a rebuild.
+    """
+
+    def __init__(self, patterns=None):
+        """
+        Initialize the matcher.
+
+        Args:
+            patterns (iterable, optional): (pattern, value) pairs to add
+        """
+        self._goto = [{}]         # node -> {char: child node}
+        self._fail = [0]          # node -> longest proper suffix node
+        self._output = [None]     # node -> index of the pattern ending here
+        self._dict_link = [0]     # node -> next suffix node that ends a pattern (0 = none)
+        self._patterns = []       # pattern index -> (pattern, value)
+        self._built = True
+        for pattern, value in patterns or ():
+            self.add(pattern, value)
+
+    def __len__(self):
+        return len(self._patterns)
+
+    def add(self, pattern, value):
+        """
+        Add a pattern. Re-adding an existing pattern replaces its value.
+
+        Args:
+            pattern (str): Text to look for (matched case-sensitively)
+            value: Value returned with each match
+        """
+        if not pattern:
+            return
+        node = 0
+        for char in pattern:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto[node][char] = child
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+                self._dict_link.append(0)
+            node = child
+        if self._output[node] is None:
+            self._output[node] = len(self._patterns)
+            self._patterns.append((pattern, value))
+        else:
+            self._patterns[self._output[node]] = (pattern, value)
+        self._built = False
+
+    def build(self):
+        """Compute failure and dictionary links (breadth-first over the trie)."""
+        queue = []
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._dict_link[child] = 0
+            queue.append(child)
+        head = 0
+        while head < len(queue):
+            node = queue[head]
+            head += 1
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                state = self._fail[node]
+                while state and char not in self._goto[state]:
+                    state = self._fail[state]
+                fallback = self._goto[state].get(char, 0)
+                self._fail[child] = fallback if fallback != child else 0
+                suffix = self._fail[child]
+                self._dict_link[child] = suffix if self._output[suffix] is not None else self._dict_link[suffix]
+        self._built = True
+
+    def find_all(self, text):
+        """
+        Find every pattern occurrence in the text, including overlapping ones.
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            list: (start, end, pattern, value) tuples ordered by end position
+        """
+        if not self._built:
+            self.build()
+        goto, fail, output, dict_link, patterns = (
+            self._goto, self._fail, self._output, self._dict_link, self._patterns)
+        matches = []
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            match_node = node if output[node] is not None else dict_link[node]
+            while match_node:
+                pattern, value = patterns[output[match_node]]
+                matches.append((end - len(pattern), end, pattern, value))
+                match_node = dict_link[match_node]
+        return matches
+
+    def longest_match(self, text):
+        """
+        Find the longest pattern occurring in the text, preferring the
+        leftmost one when several have the same length.
+
+        Args:
+            text (str): Text to scan
+
+        Returns:
+            tuple: (pattern, value) of the best match, or None if nothing matches
+        """
+        best = None
+        for start, end, pattern, value in self.find_all(text):
+            if best is None or (end - start, -start) > (best[1] - best[0], -best[0]):
+                best = (start, end, pattern, value)
+        return (best[2], best[3]) if best else None
@@ -2,120 +2,412 @@
 
 import re
 import logging
-from config import RESTAURANTS_FILE
-from tools.restaurant_tools import load_json_file
+import threading
+from tools.catalog import get_catalog
+from agent.name_matcher import AhoCorasickMatcher
+from agent.fuzzy_index import TrigramIndex
 
 logger = logging.getLogger('restaurant_resolver')
 
+# Minimum confidence for a fuzzy (typo-tolerant) name match to be trusted
+FUZZY_MATCH_THRESHOLD = 0.75
+# How far the best fuzzy match must lead the runner-up to count as unambiguous
+FUZZY_MATCH_MARGIN = 0.1
+# Names added since the main automaton was built go to a small overlay automaton;
+# once the overlay or the number of removed names passes this, the main one is rebuilt
+MATCHER_COMPACTION_THRESHOLD = 256
+
+
+def _significant_words(name):
+    """Words of a lowercased name long enough to be used for word-overlap matching."""
+    return {word for word in name.split() if len(word) > 3}
+
+
+class _ResolverIndex:
+    """
+    One consistent version of the resolver's lookup structures.
+
+    Published indexes are never modified: catalog changes produce a new index
+    that shares every untouched part with the previous one, and readers keep
+    using whichever index they started with.
+    """
+
+    __slots__ = ("name_to_ids_map", "id_to_restaurant", "word_to_restaurants_map", "fuzzy_index",
+                 "name_matcher", "matcher_names", "overlay_matcher", "overlay_names", "stale_names")
+
+    @classmethod
+    def build(cls, restaurants):
+        """Build every structure from scratch."""
+        index = cls()
+        index.name_to_ids_map = {}
+        index.id_to_restaurant = {}
+        index.word_to_restaurants_map = {}
+
+        # Build name-to-ids mapping for exact matches (names are not unique)
+        for restaurant in restaurants:
+            index.name_to_ids_map.setdefault(restaurant["name"].lower(), []).append(restaurant["id"])
+            index.id_to_restaurant[restaurant["id"]] = restaurant
+
+        # Build a single automaton over all names to find mentions in one pass
+        index.fuzzy_index = TrigramIndex()
+        for name in index.name_to_ids_map:
+            index.fuzzy_index.add(name, name)
+        index._build_matcher()
+
+        # Build word-to-restaurants mapping for fuzzy matches
+        for restaurant in restaurants:
+            for word in _significant_words(restaurant["name"].lower()):
+                index.word_to_restaurants_map.setdefault(word, []).append(restaurant)
+        return index
+
+    def _build_matcher(self):
+        self.name_matcher = AhoCorasickMatcher((name, name) for name in self.name_to_ids_map)
+        self.name_matcher.build()
+        self.matcher_names = frozenset(self.name_to_ids_map)
+        self.overlay_matcher = AhoCorasickMatcher()
+        self.overlay_names = frozenset()
+        self.stale_names = frozenset()
+
+    def with_changes(self, removed, added):
+        """
+        Build the next index from this one by removing and adding restaurants.
+
+        Only the entries for the affected names and words are copied; the
+        main automaton is reused, with new names going to the overlay and
+        removed names filtered out at match time until compaction.
+
+        Args:
+            removed (list): Restaurant records to drop (matched by ID)
+            added (list): Restaurant records to add
+
+        Returns:
+            _ResolverIndex: The new index
+        """
+        index = _ResolverIndex()
+        index.name_to_ids_map = dict(self.name_to_ids_map)
+        index.id_to_restaurant = dict(self.id_to_restaurant)
+        index.word_to_restaurants_map = dict(self.word_to_restaurants_map)
+        touched_names = set()
+        touched_words = set()
+
+        def own_ids(name):
+            if name not in touched_names:
+                index.name_to_ids_map[name] = list(index.name_to_ids_map.get(name, ()))
+                touched_names.add(name)
+            return index.name_to_ids_map[name]
+
+        def own_word(word):
+            if word not in touched_words:
+                index.word_to_restaurants_map[word] = list(index.word_to_restaurants_map.get(word, ()))
+                touched_words.add(word)
+            return index.word_to_restaurants_map[word]
+
+        for restaurant in removed:
+            restaurant_id = restaurant["id"]
+            current = index.id_to_restaurant.pop(restaurant_id, None)
+            if current is None:
+                continue
+            name = current["name"].lower()
+            ids = own_ids(name)
+            if restaurant_id in ids:
+                ids.remove(restaurant_id)
+            for word in _significant_words(name):
+                own_word(word)[:] = [r for r in index.word_to_restaurants_map[word] if r["id"] != restaurant_id]
+
+        for restaurant in added:
+            name = restaurant["name"].lower()
+            index.id_to_restaurant[restaurant["id"]] = restaurant
+            own_ids(name).append(restaurant["id"])
+            for word in _significant_words(name):
+                own_word(word).append(restaurant)
+
+        for name in touched_names:
+            if not index.name_to_ids_map[name]:
+                del index.name_to_ids_map[name]
+        for word in touched_words:
+            if not index.word_to_restaurants_map[word]:
+                del index.word_to_restaurants_map[word]
+
+        new_names = [name for name in touched_names
+                     if name in index.name_to_ids_map and name not in self.name_to_ids_map]
+        gone_names = [name for name in touched_names
+                      if name not in index.name_to_ids_map and name in self.name_to_ids_map]
+        index.fuzzy_index = self.fuzzy_index.updated(remove=gone_names, add=[(name, name) for name in new_names])
+
+        overlay_names = {name for name in self.overlay_names | set(new_names)
+                         if name in index.name_to_ids_map and name not in self.matcher_names}
+        stale_names = {name for name in self.stale_names | set(gone_names)
+                       if name in self.matcher_names and name not in index.name_to_ids_map}
+        if len(overlay_names) > MATCHER_COMPACTION_THRESHOLD or len(stale_names) > MATCHER_COMPACTION_THRESHOLD:
+            index._build_matcher()
+        else:
+            index.name_matcher = self.name_matcher
+            index.matcher_names = self.matcher_names
+            index.overlay_names = frozenset(overlay_names)
+            index.stale_names = frozenset(stale_names)
+            if index.overlay_names == self.overlay_names:
+                index.overlay_matcher = self.overlay_matcher
+            else:
+                index.overlay_matcher = AhoCorasickMatcher((name, name) for name in index.overlay_names)
+                index.overlay_matcher.build()
+        return index
+
+    def longest_name_in(self, query):
+        """The longest (then leftmost) current restaurant name mentioned in the query, or None."""
+        best = None
+        for matcher in (self.name_matcher, self.overlay_matcher):
+            if not len(matcher):
+                continue
+            for start, end, name, _ in matcher.find_all(query):
+                if name not in self.name_to_ids_map:
+                    continue  # Removed since the automaton was built
+                if best is None or (end - start, -start) > (best[1] - best[0], -best[0]):
+                    best = (start, end, name)
+        return best[2] if best else None
+
+
 class RestaurantResolver:
     """
     Handles resolution of restaurant names to IDs and detection of restaurant
     mentions in user queries.
+
+    Several restaurants can share a name, so names map to lists of IDs; when a
+    name is ambiguous, locations or cuisines mentioned in the query and the
+    restaurants from the last search are used to pick one.
+
+    When built from the catalog, the resolver subscribes to catalog changes
+    and applies added, removed and renamed restaurants to its indexes
+    incrementally. Each lookup works on one index snapshot, so an update
+    never exposes a half-applied change.
+    The catalog holds the subscription weakly, so a resolver that is no
+    longer used is freed without unsubscribing.
     """
     
-    def __init__(self):
-        """Initialize the restaurant resolver with preloaded data."""
-        self.restaurants = []
-        self.name_to_id_map = {}
-        self.word_to_restaurants_map = {}
-        self._load_restaurant_data()
-        
-    def _load_restaurant_data(self):
+    def __init__(self, restaurants=None, catalog=None):
+        """
+        Initialize the restaurant resolver with preloaded data.
+        
+        Args:
+            restaurants (list, optional): Fixed restaurant records to index;
+                when omitted the resolver follows the shared catalog
+            catalog (RestaurantCatalog, optional): Catalog to follow instead
+                of the shared one
+        """
+        self._catalog = None
+        self._update_lock = threading.Lock()
+        self.catalog_version = None
+        self._index = _ResolverIndex.build([])
+        self._load_restaurant_data(restaurants, catalog)
+        
+    def _load_restaurant_data(self, restaurants=None, catalog=None):
         """Load restaurant data once at initialization for efficient lookups."""
         try:
-            self.restaurants = load_json_file(RESTAURANTS_FILE)
-            if self.restaurants:
-                # Build name-to-id mapping for exact matches
-                for restaurant in self.restaurants:
-                    self.name_to_id_map[restaurant["name"].lower()] = restaurant["id"]
-                
-                # Build word-to-restaurants mapping for fuzzy matches
-                for restaurant in self.restaurants:
-                    name_words = restaurant["name"].lower().split()
-                    for word in name_words:
-                        if len(word) > 3:  # Only consider significant words (longer than 3 chars)
-                            if word not in self.word_to_restaurants_map:
-                                self.word_to_restaurants_map[word] = []
-                            self.word_to_restaurants_map[word].append(restaurant)
-                
-                logger.info(f"Loaded {len(self.name_to_id_map)} restaurant name mappings")
+            if restaurants is None:
+                self._catalog = catalog or get_catalog()
+                self.catalog_version, restaurants = self._catalog.subscribe(self._on_catalog_change)
+            self._index = _ResolverIndex.build(restaurants)
+            logger.info(f"Loaded {len(self._index.name_to_ids_map)} restaurant names for {len(self._index.id_to_restaurant)} restaurants")
         except Exception as e:
             logger.error(f"Error loading restaurant data: {str(e)}", exc_info=True)
+
+    def _on_catalog_change(self, delta):
+        """Apply a catalog delta to the indexes and publish the new snapshot."""
+        with self._update_lock:
+            if self.catalog_version is not None and delta["version"] != self.catalog_version + 1:
+                # A delta was missed; only a rebuild is guaranteed to be correct
+                logger.warning(f"Catalog jumped from version {self.catalog_version} to {delta['version']}, rebuilding indexes")
+                index = _ResolverIndex.build(self._catalog.restaurants())
+            else:
+                removed = delta["removed"] + [old for old, _ in delta["updated"]]
+                added = delta["added"] + [new for _, new in delta["updated"]]
+                index = self._index.with_changes(removed, added)
+            self._index = index
+            self.catalog_version = delta["version"]
+            logger.info(f"Applied catalog version {delta['version']}: {len(delta['added'])} added, "
+                        f"{len(delta['removed'])} removed, {len(delta['updated'])} updated")
+
+    def _current_index(self):
+        """Pick up outside catalog edits (rate-limited) and return the current snapshot."""
+        if self._catalog is not None:
+            self._catalog.poll()
+        return self._index
+
+    @property
+    def restaurants(self):
+        return list(self._index.id_to_restaurant.values())
+
+    @property
+    def name_to_ids_map(self):
+        return self._index.name_to_ids_map
+
+    @property
+    def id_to_restaurant(self):
+        return self._index.id_to_restaurant
+
+    @property
+    def word_to_restaurants_map(self):
+        return self._index.word_to_restaurants_map
+
+    @property
+    def fuzzy_index(self):
+        return self._index.fuzzy_index
+
+    def disambiguate(self, restaurant_ids, query=None, context_ids=None, index=None):
+        """
+        Narrow down restaurants that share a name using cheap local signals.
+        
+        A location named in the query is the strongest signal, then being
+        among the restaurants the user was just shown, then the cuisine.
+        
+        Args:
+            restaurant_ids (list): Candidate restaurant IDs
+            query (str, optional): The user's query
+            context_ids (iterable, optional): IDs from the last search results
+            index (_ResolverIndex, optional): Snapshot to read; the current one by default
+            
+        Returns:
+            list: The best candidates; a single ID when the tie is broken
+        """
+        if len(restaurant_ids) <= 1:
+            return list(restaurant_ids)
+        
+        id_to_restaurant = (index or self._index).id_to_restaurant
+        query = (query or "").lower()
+        context_ids = set(context_ids or ())
+        scores = {}
+        for restaurant_id in restaurant_ids:
+            restaurant = id_to_restaurant[restaurant_id]
+            score = 0
+            if query and restaurant.get("location", "").lower() in query:
+                score += 3
+            if restaurant_id in context_ids:
+                score += 2
+            if query and restaurant.get("cuisine", "").lower() in query:
+                score += 1
+            scores[restaurant_id] = score
+        
+        best_score = max(scores.values())
+        return [restaurant_id for restaurant_id in restaurant_ids if scores[restaurant_id] == best_score]
+
+    def _pick(self, index, restaurant_ids, query, context_ids):
+        """Return the single restaurant left after disambiguation, or None if still ambiguous."""
+        candidates = self.disambiguate(restaurant_ids, query, context_ids, index)
+        if len(candidates) == 1:
+            return candidates[0]
+        if candidates:
+            logger.info(f"Ambiguous restaurant match between {candidates}")
+        return None
+
+    @staticmethod
+    def _word_overlap_ids(index, text):
+        """IDs of the restaurants sharing the most (at least 2) significant words with the text."""
+        potential_matches = {}
+        
+        for word in text.split():
+            if len(word) > 3 and word in index.word_to_restaurants_map:  # Only consider significant words
+                for restaurant in index.word_to_restaurants_map[word]:
+                    restaurant_id = restaurant["id"]
+                    potential_matches[restaurant_id] = potential_matches.get(restaurant_id, 0) + 1
+        
+        if not potential_matches:
+            return []
+        best_score = max(potential_matches.values())
+        if best_score < 2:  # Require at least 2 word matches for confidence
+            return []
+        return [restaurant_id for restaurant_id, score in potential_matches.items() if score == best_score]
     
-    def resolve_restaurant_from_query(self, query):
+    def resolve_restaurant_from_query(self, query, context_ids=None):
         """
         Extract and resolve restaurant name from a query to its ID.
         
         Args:
             query (str): User query potentially containing restaurant name
+            context_ids (iterable, optional): IDs from the last search results,
+                used to tell apart restaurants with the same name
             
         Returns:
             tuple: (restaurant_id, restaurant_name) if found, otherwise (None, None)
         """
-        if not self.restaurants:
+        index = self._current_index()
+        if not index.id_to_restaurant:
             return None, None
         
-        # Try exact name matches first (most reliable)
-        for name, id in self.name_to_id_map.items():
-            if name in query.lower():
-                for restaurant in self.restaurants:
-                    if restaurant["id"] == id:
-                        return id, restaurant["name"]
-        
-        # Try word-by-word matching with confidence scoring
-        query_words = query.lower().split()
-        potential_matches = {}
-        
-        for word in query_words:
-            if len(word) > 3 and word in self.word_to_restaurants_map:  # Only consider significant words
-                for restaurant in self.word_to_restaurants_map[word]:
-                    restaurant_id = restaurant["id"]
-                    if restaurant_id not in potential_matches:
-                        potential_matches[restaurant_id] = {"score": 1, "restaurant": restaurant}
-                    else:
-                        potential_matches[restaurant_id]["score"] += 1
-        
-        # Find the best match with a minimum threshold
-        if potential_matches:
-            best_match_id = max(potential_matches, key=lambda id: potential_matches[id]["score"])
-            if potential_matches[best_match_id]["score"] >= 2:  # Require at least 2 word matches for confidence
-                restaurant = potential_matches[best_match_id]["restaurant"]
-                return restaurant["id"], restaurant["name"]
+        query = query.lower()
+
+        # Try exact name matches first (most reliable), preferring the longest mention
+        name = index.longest_name_in(query)
+        if name:
+            restaurant_id = self._pick(index, index.name_to_ids_map[name], query, context_ids)
+        else:
+            # Try word-by-word matching with confidence scoring
+            restaurant_id = self._pick(index, self._word_overlap_ids(index, query), query, context_ids)
         
+        if restaurant_id:
+            return restaurant_id, index.id_to_restaurant[restaurant_id]["name"]
         return None, None
     
-    def resolve_id_from_name(self, restaurant_name):
+    def resolve_id_from_name(self, restaurant_name, query=None, context_ids=None):
         """
         Lookup restaurant ID from name with exact and fuzzy matching.
         
         Args:
             restaurant_name (str): Name of the restaurant
+            query (str, optional): The user's query, for disambiguation
+            context_ids (iterable, optional): IDs from the last search results
             
         Returns:
-            str: Restaurant ID if found, otherwise None
+            str: Restaurant ID if found and unambiguous, otherwise None
         """
+        index = self._current_index()
+
         # Check for exact match first
         restaurant_name = restaurant_name.lower()
-        if restaurant_name in self.name_to_id_map:
-            return self.name_to_id_map[restaurant_name]
+        if restaurant_name in index.name_to_ids_map:
+            return self._pick(index, index.name_to_ids_map[restaurant_name], query, context_ids)
         
-        # Try fuzzy matching
-        name_words = restaurant_name.split()
-        potential_matches = {}
+        # Try word overlap, then typo-tolerant matching
+        overlap_ids = self._word_overlap_ids(index, restaurant_name)
+        if overlap_ids:
+            return self._pick(index, overlap_ids, query, context_ids)
         
-        for word in name_words:
-            if len(word) > 3 and word in self.word_to_restaurants_map:
-                for restaurant in self.word_to_restaurants_map[word]:
-                    restaurant_id = restaurant["id"]
-                    if restaurant_id not in potential_matches:
-                        potential_matches[restaurant_id] = {"score": 1, "name": restaurant["name"]}
-                    else:
-                        potential_matches[restaurant_id]["score"] += 1
-        
-        # Find the best match with a minimum threshold
-        if potential_matches:
-            best_match_id = max(potential_matches, key=lambda id: potential_matches[id]["score"])
-            if potential_matches[best_match_id]["score"] >= 2:  # Require at least 2 word matches
-                return best_match_id
-        
-        return None
\ No newline at end of file
+        restaurant_id, _, _ = self._match_name(index, restaurant_name, FUZZY_MATCH_THRESHOLD, query, context_ids)
+        return restaurant_id
+
+    def match_name(self, restaurant_name, min_confidence=FUZZY_MATCH_THRESHOLD, query=None, context_ids=None):
+        """
+        Resolve a possibly misspelled or partial restaurant name using the
+        trigram index.
+        
+        Args:
+            restaurant_name (str): Name as typed by the user or the LLM
+            min_confidence (float): Minimum confidence to accept a match
+            query (str, optional): The user's query, for disambiguation
+            context_ids (iterable, optional): IDs from the last search results
+            
+        Returns:
+            tuple: (restaurant_id, restaurant_name, confidence) for a confident,
+                unambiguous match, otherwise (None, None, best confidence)
+        """
+        return self._match_name(self._current_index(), restaurant_name, min_confidence, query, context_ids)
+
+    def _match_name(self, index, restaurant_name, min_confidence, query, context_ids):
+        name = " ".join(restaurant_name.lower().split())
+        if not name:
+            return None, None, 0.0
+        
+        confidence = 1.0
+        if name not in index.name_to_ids_map:
+            candidates = index.fuzzy_index.search(name, limit=2)
+            if not candidates:
+                return None, None, 0.0
+            
+            best_name, _, confidence = candidates[0]
+            runner_up = candidates[1][2] if len(candidates) > 1 else 0.0
+            if confidence < min_confidence or confidence - runner_up < FUZZY_MATCH_MARGIN:
+                return None, None, confidence
+            name = best_name
+        
+        restaurant_id = self._pick(index, index.name_to_ids_map[name], query, context_ids)
+        if not restaurant_id:
+            return None, None, confidence
+        return restaurant_id, index.id_to_restaurant[restaurant_id]["name"], confidence
\ No newline at end of file
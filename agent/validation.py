@@ -0,0 +1,235 @@
+# agent/validation.py - Tool argument validators compiled from the tool JSON schemas
+
+import calendar
+import re
+
+DATE_PATTERN = re.compile(r"^(\d{4})-(\d{1,2})-(\d{1,2})$")
+TIME_PATTERN = re.compile(r"^([01]?\d|2[0-3]):([0-5]\d)$")
+
+# Formats are read from the schema's "format" or, failing that, from the
+# format hint the description gives the LLM
+FORMAT_HINTS = {
+    "YYYY-MM-DD": "date",
+    "HH:MM": "time"
+}
+
+TRUE_STRINGS = {"true", "yes", "1"}
+FALSE_STRINGS = {"false", "no", "0"}
+
+
+def _to_string(value):
+    if isinstance(value, (dict, list)):
+        raise ValueError("must be a string")
+    return str(value).strip()
+
+
+def _to_integer(value):
+    if isinstance(value, bool):
+        raise ValueError("must be a whole number")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        text = value.strip()
+        if re.fullmatch(r"[+-]?\d+(?:\.0*)?", text):
+            return int(float(text))
+    raise ValueError("must be a whole number")
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        raise ValueError("must be a number")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError("must be a number")
+
+
+def _to_boolean(value):
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_STRINGS:
+        return True
+    if text in FALSE_STRINGS:
+        return False
+    raise ValueError("must be true or false")
+
+
+def _to_array(value):
+    if isinstance(value, list):
+        return value
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    raise ValueError("must be a list")
+
+
+COERCERS = {
+    "string": _to_string,
+    "integer": _to_integer,
+    "number": _to_number,
+    "boolean": _to_boolean,
+    "array": _to_array
+}
+
+
+def _check_date(value):
+    match = DATE_PATTERN.match(value)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+        if 1 <= month <= 12 and 1 <= day <= calendar.monthrange(year, month)[1]:
+            return f"{year:04d}-{month:02d}-{day:02d}"
+    raise ValueError("must be a date in YYYY-MM-DD format")
+
+
+def _check_time(value):
+    match = TIME_PATTERN.match(value)
+    if match:
+        return f"{int(match.group(1)):02d}:{match.group(2)}"
+    raise ValueError("must be a time in HH:MM 24-hour format")
+
+
+FORMAT_CHECKS = {
+    "date": _check_date,
+    "time": _check_time
+}
+
+
+def infer_format(schema):
+    """
+    Work out which string format a parameter expects.
+
+    Args:
+        schema (dict): JSON schema of the parameter
+
+    Returns:
+        str: "date", "time" or None
+    """
+    if schema.get("format") in FORMAT_CHECKS:
+        return schema["format"]
+    description = schema.get("description", "")
+    for hint, name in FORMAT_HINTS.items():
+        if hint in description:
+            return name
+    return None
+
+
+class ArgumentValidator:
+    """
+    Checks and coerces the arguments of one tool against its JSON schema.
+
+    The schema is read once, when the validator is built, into a list of
+    per-parameter steps, so validating a call is a single pass over the
+    declared parameters.
+    """
+
+    def __init__(self, tool_name, parameters):
+        """
+        Compile the validator.
+
+        Args:
+            tool_name (str): Name of the tool
+            parameters (dict): The tool's "parameters" JSON schema
+        """
+        self.tool_name = tool_name
+        self.required = tuple(parameters.get("required", []))
+        self._steps = []
+        for name, schema in parameters.get("properties", {}).items():
+            self._steps.append((
+                name,
+                schema.get("type", "string"),
+                COERCERS.get(schema.get("type", "string"), _to_string),
+                FORMAT_CHECKS.get(infer_format(schema)),
+                schema.get("minimum"),
+                schema.get("maximum"),
+                frozenset(schema["enum"]) if "enum" in schema else None,
+                name in self.required
+            ))
+
+    def validate(self, args):
+        """
+        Validate and coerce arguments.
+
+        Missing optional parameters and null values are left out; parameters
+        the schema does not declare are dropped.
+
+        Args:
+            args (dict): Arguments from the tool call
+
+        Returns:
+            tuple: (clean arguments, list of errors) where each error is a
+                dict with "parameter", "error" (missing, type, format,
+                range or choice) and "message"
+        """
+        args = args or {}
+        clean = {}
+        errors = []
+        for name, type_name, coerce, check, minimum, maximum, choices, required in self._steps:
+            value = args.get(name)
+            if value is None or (value == "" and type_name != "string"):
+                if required:
+                    errors.append(_error(name, "missing", "is required"))
+                continue
+            try:
+                value = coerce(value)
+            except ValueError as e:
+                errors.append(_error(name, "type", str(e)))
+                continue
+            if value == "" and required:
+                errors.append(_error(name, "missing", "is required"))
+                continue
+            if check is not None:
+                try:
+                    value = check(value)
+                except ValueError as e:
+                    errors.append(_error(name, "format", str(e)))
+                    continue
+            if minimum is not None and value < minimum:
+                errors.append(_error(name, "range", f"must be at least {minimum}"))
+                continue
+            if maximum is not None and value > maximum:
+                errors.append(_error(name, "range", f"must be at most {maximum}"))
+                continue
+            if choices is not None and value not in choices and str(value).lower() in choices:
+                value = str(value).lower()
+            if choices is not None and value not in choices:
+                errors.append(_error(name, "choice", f"must be one of {', '.join(sorted(choices))}"))
+                continue
+            clean[name] = value
+        return clean, errors
+
+
+def _error(parameter, code, message):
+    return {"parameter": parameter, "error": code, "message": f"{parameter} {message}"}
+
+
+def compile_validators(tool_definitions):
+    """
+    Build a validator for every tool definition.
+
+    Args:
+        tool_definitions (list): Tool definitions in the chat completions format
+
+    Returns:
+        dict: Tool name -> ArgumentValidator
+    """
+    return {
+        tool["function"]["name"]: ArgumentValidator(tool["function"]["name"], tool["function"].get("parameters", {}))
+        for tool in tool_definitions
+    }
+
+
+def validation_error(tool_name, errors):
+    """
+    Build the tool response for arguments that failed validation.
+
+    Args:
+        tool_name (str): Name of the tool
+        errors (list): Errors from ArgumentValidator.validate()
+
+    Returns:
+        dict: Response with an "error" summary and the "invalid_arguments"
+    """
+    summary = "; ".join(error["message"] for error in errors)
+    return {"error": f"Invalid arguments for {tool_name}: {summary}", "invalid_arguments": errors}
@@ -2,12 +2,10 @@
 
 import streamlit as st
 import time
-from agent.llm_service import LLMService
+from agent.llm_service import LLMService, create_http_session
+from agent.restaurant_resolver import RestaurantResolver
 from config import APP_TITLE, DEBUG_MODE
 
-# Initialize the AI service
-ai_service = LLMService()
-
 # Set page configuration
 st.set_page_config(
     page_title=APP_TITLE,
@@ -15,6 +13,20 @@ st.set_page_config(
     layout="wide"
 )
 
+
+@st.cache_resource
+def get_shared_resources():
+    """Build the heavy, read-only pieces once per process and share them across sessions."""
+    return RestaurantResolver(), create_http_session()
+
+
+# Each browser session keeps its own lightweight AI service (conversation state)
+# across reruns, built on top of the shared resolver and HTTP pool
+if "ai_service" not in st.session_state:
+    restaurant_resolver, http_session = get_shared_resources()
+    st.session_state.ai_service = LLMService(restaurant_resolver=restaurant_resolver, http_session=http_session)
+ai_service = st.session_state.ai_service
+
 # Application title and description
 st.title(f"🍽️ {APP_TITLE}")
 st.markdown("""
@@ -59,7 +71,7 @@ if user_input:
         message_placeholder.markdown("Thinking...")
         
         # Process the query
-        response = ai_service.process_query(user_input)
+        response = ai_service.process_query(user_input, profile=st.session_state.get("profile_queries", False))
         
         # Display debug information if in debug mode
         if DEBUG_MODE and response.get("tool_calls"):
@@ -69,6 +81,9 @@ if user_input:
                     "tool_args": response.get("debug_info", {}).get("tool_args"),
                     "tool_response": response.get("debug_info", {}).get("tool_response")
                 })
+
+        if response.get("profile_dir"):
+            st.caption(f"Profile for turn {response['turn_id']} written to {response['profile_dir']}")
         
         # Update the message placeholder with the actual response
         message_placeholder.markdown(response["response"])
@@ -93,6 +108,9 @@ with st.sidebar:
         st.session_state.debug_mode = True
     else:
         st.session_state.debug_mode = False
+
+    # Profile every query while enabled (results go to PROFILE_DIR/<turn id>)
+    st.checkbox("Profile Queries", key="profile_queries")
     
     st.divider()
     
@@ -0,0 +1,74 @@
+# benchmarks/bench_resolver.py - Benchmark restaurant name resolution on a large synthetic catalog
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path so we can import from other modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from generate_restaurants import generate_restaurants
+from agent.restaurant_resolver import RestaurantResolver
+
+
+def misspell(name, rng):
+    """Swap two adjacent letters in one word of the name."""
+    words = name.split()
+    index = max(range(len(words)), key=lambda i: len(words[i]))
+    word = words[index]
+    if len(word) > 3:
+        pos = rng.randrange(1, len(word) - 2)
+        word = word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+    words[index] = word
+    return " ".join(words)
+
+
+def bench(label, func, inputs):
+    """Run func over inputs and print the mean latency and the share of truthy results."""
+    start = time.perf_counter()
+    hits = sum(1 for value in inputs if func(value))
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / len(inputs) * 1e6:>10.1f} us/op   {hits / len(inputs):>6.1%} hit")
+
+
+def main(count=100000, queries=2000, seed=42):
+    random.seed(seed)
+    rng = random.Random(seed)
+
+    start = time.perf_counter()
+    restaurants = generate_restaurants(count)
+    print(f"Generated {len(restaurants)} restaurants in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    resolver = RestaurantResolver(restaurants)
+    print(f"Built resolver indexes in {time.perf_counter() - start:.2f}s "
+          f"({len(resolver.name_to_ids_map)} distinct names, "
+          f"{sum(len(ids) > 1 for ids in resolver.name_to_ids_map.values())} shared)")
+    print()
+
+    sample = rng.sample(restaurants, queries)
+    mention_queries = [f"can I get a table at {r['name']} tonight?" for r in sample]
+    located_queries = [f"book {r['name']} in {r['location']} for 4" for r in sample]
+    typo_names = [misspell(r["name"], rng) for r in sample]
+    context_ids = [r["id"] for r in sample[:10]]
+
+    bench("query mention, no disambiguation signal",
+          lambda q: resolver.resolve_restaurant_from_query(q)[0], mention_queries)
+    bench("query mention + location",
+          lambda q: resolver.resolve_restaurant_from_query(q)[0], located_queries)
+    bench("query mention + last search results",
+          lambda q: resolver.resolve_restaurant_from_query(q, context_ids=context_ids)[0],
+          [f"book {r['name']}" for r in sample[:10]] * (queries // 10))
+    bench("exact name lookup",
+          lambda n: resolver.resolve_id_from_name(n), [r["name"] for r in sample])
+    bench("misspelled name -> correct name (fuzzy)",
+          lambda pair: resolver.fuzzy_index.search(pair[0].lower(), 1)[0][0] == pair[1].lower(),
+          list(zip(typo_names, (r["name"] for r in sample))))
+    bench("no mention",
+          lambda q: resolver.resolve_restaurant_from_query(q)[0],
+          ["what cuisines do you have near the river?"] * queries)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
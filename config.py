@@ -24,4 +24,35 @@ DEBUG_MODE = True  # Set to False for production
 
 # Data Settings
 RESTAURANTS_FILE = "data/restaurants.json"
-RESERVATIONS_FILE = "data/reservations.json"
\ No newline at end of file
+RESERVATIONS_FILE = "data/reservations.json"
+RESERVATION_BACKEND = os.getenv("RESERVATION_BACKEND", "json")  # "json" (RESERVATIONS_FILE) or "partitioned" (RESERVATIONS_DIR)
+RESERVATIONS_DIR = os.getenv("RESERVATIONS_DIR", "data/reservations")  # Monthly partitions and their manifest
+RESERVATION_GROUP_COMMIT_MS = float(os.getenv("RESERVATION_GROUP_COMMIT_MS", "0"))  # json backend: batch writes in a write-ahead log; 0 = off
+RESERVATION_WAL_CHECKPOINT_BYTES = int(os.getenv("RESERVATION_WAL_CHECKPOINT_BYTES", str(1024 * 1024)))  # Fold the log into the file past this size
+AVAILABILITY_HORIZON_DAYS = int(os.getenv("AVAILABILITY_HORIZON_DAYS", "90"))  # Days ahead kept in the availability view
+AVAILABILITY_CHECK_MINUTES = float(os.getenv("AVAILABILITY_CHECK_MINUTES", "60"))  # Recount the availability view from the store this often; 0 = off
+MAX_COMBINED_TABLES = int(os.getenv("MAX_COMBINED_TABLES", "3"))  # Tables that may be pushed together for one party
+BOOKING_DURATION_MINUTES = int(os.getenv("BOOKING_DURATION_MINUTES", "120"))  # How long a booking holds its tables
+SLOT_MINUTES = int(os.getenv("SLOT_MINUTES", "15"))  # Width of the time slots tables are counted in
+RESERVATION_ARCHIVE_DIR = os.getenv("RESERVATION_ARCHIVE_DIR", "data/archive")  # Compressed monthly segments of archived reservations
+RESERVATION_RETENTION_DAYS = int(os.getenv("RESERVATION_RETENTION_DAYS", "1"))  # Bookings dated more than this many days ago are archived
+CANCELLED_RETENTION_DAYS = int(os.getenv("CANCELLED_RETENTION_DAYS", "7"))  # Cancelled bookings are archived this long after their last change
+RETENTION_INTERVAL_HOURS = float(os.getenv("RETENTION_INTERVAL_HOURS", "0"))  # Run the archival job in the background this often; 0 = off
+
+# Session Settings
+MAX_HISTORY_MESSAGES = int(os.getenv("MAX_HISTORY_MESSAGES", "40"))  # Older messages are dropped, whole turns at a time
+MAX_REMEMBERED_RESTAURANTS = int(os.getenv("MAX_REMEMBERED_RESTAURANTS", "64"))  # Restaurant names remembered per session
+
+# Observability Settings
+METRICS_EXPORT_FILE = os.getenv("METRICS_EXPORT_FILE")  # Prometheus text file, rewritten after every query
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0")) or None  # Serve /metrics on localhost when set
+TRACE_FILE = os.getenv("TRACE_FILE")  # JSON Lines trace output; tracing is off when unset
+
+# Profiling Settings
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")  # One sub-directory per profiled turn
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))  # Fraction of queries to profile
+PROFILE_TRACEMALLOC = os.getenv("PROFILE_TRACEMALLOC", "0") == "1"  # Also capture allocation snapshots
+
+# Tool Execution Settings
+TOOL_TIMEOUT_SECONDS = float(os.getenv("TOOL_TIMEOUT_SECONDS", "10"))  # Deadline for tools without their own timeout
+TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "8"))  # Threads running tool calls, shared by all sessions
\ No newline at end of file
@@ -6,6 +6,8 @@ from pathlib import Path
 import datetime
 import json
 import os
+import threading
+from unittest import mock
 
 # Add parent directory to path to import required modules
 sys.path.append(str(Path(__file__).parent.parent))
@@ -21,9 +23,13 @@ from tools.restaurant_tools import (
     create_reservation,
     get_reservation, 
     cancel_reservation, 
-    modify_reservation
+    modify_reservation,
+    get_customer_reservations,
+    _check_availability
 )
 
+from tools.reservation_store import get_store
+
 # Import configuration
 from config import RESTAURANTS_FILE, RESERVATIONS_FILE
 
@@ -223,6 +229,39 @@ class TestRestaurantTools(unittest.TestCase):
         result = check_availability("rest1", "2025-05-15", "invalid-time", 2)
         self.assertFalse(result["available"])
     
+    def test_availability_counts_existing_bookings(self):
+        """Test that booked tables are no longer offered"""
+        date = (datetime.date.today() + datetime.timedelta(days=3)).isoformat()
+        first = create_reservation("rest2", "Full Slot A", 8, date, "21:00")
+        create_reservation("rest2", "Full Slot B", 7, date, "21:00")
+        
+        # With both large tables booked, smaller tables are pushed together
+        result = check_availability("rest2", date, "21:00", 6)
+        self.assertTrue(result["available"])
+        self.assertEqual(result["tables"], {"medium": 1, "small": 1})
+        result = check_availability("rest2", date, "21:00", 20)
+        self.assertFalse(result["available"])
+        self.assertIn("No tables left", result["error"])
+        
+        # A booking can still be changed in place, keeping its own table
+        result = modify_reservation(first["reservation"]["id"], party_size=6)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["reservation"]["tables"], {"large": 1})
+        
+        # Cancelling frees the table again
+        cancel_reservation(first["reservation"]["id"])
+        result = check_availability("rest2", date, "21:00", 6)
+        self.assertEqual((result["table_type"], result["tables_remaining"]), ("large", 1))
+    
+    def test_large_party_gets_combined_tables(self):
+        """Test that a party bigger than any table is seated at several"""
+        date = (datetime.date.today() + datetime.timedelta(days=4)).isoformat()
+        result = create_reservation("rest2", "Big Group", 12, date, "20:00")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["reservation"]["tables"], {"medium": 1, "large": 1})
+        self.assertEqual(result["reservation"]["table_type"], "large")
+        self.assertEqual(check_availability("rest2", date, "20:00", 8)["tables_remaining"], 1)
+    
     def test_recommend_restaurants(self):
         """Test restaurant recommendations"""
         # Test basic recommendations
@@ -285,6 +324,28 @@ class TestRestaurantTools(unittest.TestCase):
         self.assertFalse(result["success"])
         self.assertIn("not open", result["error"])
     
+    def test_create_reservation_is_idempotent(self):
+        """Test that repeating a booking returns the first reservation"""
+        booking = dict(
+            restaurant_id="rest2",
+            customer_name="Retry Person",
+            party_size=2,
+            reservation_date="2025-08-10",
+            reservation_time="19:00"
+        )
+        first = create_reservation(**booking)
+        self.assertTrue(first["success"])
+        
+        # Same booking, differently written name
+        second = create_reservation(**dict(booking, customer_name="  retry   person"))
+        self.assertTrue(second["success"])
+        self.assertTrue(second["already_exists"])
+        self.assertEqual(second["reservation"]["id"], first["reservation"]["id"])
+        
+        # A different time is a different booking
+        third = create_reservation(**dict(booking, reservation_time="20:00"))
+        self.assertNotEqual(third["reservation"]["id"], first["reservation"]["id"])
+    
     def test_get_reservation(self):
         """Test retrieving a reservation"""
         # Test retrieving an existing reservation
@@ -296,6 +357,17 @@ class TestRestaurantTools(unittest.TestCase):
         result = get_reservation("nonexistent")
         self.assertFalse(result["success"])
     
+    def test_get_customer_reservations(self):
+        """Test retrieving reservations by customer name"""
+        # Test that the name is matched case-insensitively
+        result = get_customer_reservations("john doe")
+        self.assertTrue(result["success"])
+        self.assertIn("res1", [r["id"] for r in result["reservations"]])
+        
+        # Test a customer without reservations
+        result = get_customer_reservations("Nobody Here")
+        self.assertFalse(result["success"])
+    
     def test_cancel_reservation(self):
         """Test cancelling a reservation"""
         # First create a reservation to cancel
@@ -352,6 +424,103 @@ class TestRestaurantTools(unittest.TestCase):
         # Test modifying to invalid time
         result = modify_reservation(reservation_id, reservation_time="invalid")
         self.assertFalse(result["success"])
+    
+    def test_concurrent_modifications_do_not_overwrite(self):
+        """Test that racing changes to one reservation are all kept"""
+        create_result = create_reservation(
+            restaurant_id="rest1",
+            customer_name="Race Test",
+            party_size=2,
+            reservation_date="2025-07-02",
+            reservation_time="19:00"
+        )
+        reservation_id = create_result["reservation"]["id"]
+        self.assertEqual(create_result["reservation"]["version"], 1)
+        
+        # Both modifications read version 1; the second must be re-applied on top of the first
+        real_get = get_store().get
+        first_reads = []
+        
+        def stale_get(rid):
+            record = real_get(rid)
+            if not first_reads:
+                first_reads.append(True)
+                modify_reservation(reservation_id, special_requests="Window seat")
+            return record
+        
+        with mock.patch.object(get_store(), "get", side_effect=stale_get):
+            result = modify_reservation(reservation_id, status="pending")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["reservation"]["status"], "pending")
+        self.assertEqual(result["reservation"]["special_requests"], "Window seat")
+        self.assertEqual(result["reservation"]["version"], 3)
+        
+        # A caller that names the version it read is told about the conflict instead
+        result = modify_reservation(reservation_id, party_size=3, expected_version=1)
+        self.assertFalse(result["success"])
+        self.assertTrue(result["conflict"])
+        self.assertEqual(get_reservation(reservation_id)["reservation"]["party_size"], 2)
+    
+    def test_concurrent_modifications_cannot_share_the_last_table(self):
+        """Test that two reservations moved into a slot with one free table do not both get it"""
+        # Fill every table at 15:00, then free one
+        slot = {"restaurant_id": "rest1", "party_size": 2, "reservation_date": "2025-07-03", "reservation_time": "15:00"}
+        booked = []
+        while True:
+            result = create_reservation(customer_name=f"Filler {len(booked)}", **slot)
+            if not result["success"]:
+                break
+            booked.append(result["reservation"]["id"])
+        self.assertLess(len(booked), 20)
+        cancel_reservation(booked[0])
+        
+        movers = [create_reservation(**dict(slot, customer_name=f"Mover {i}", reservation_time="11:00"))
+                  for i in range(2)]
+        
+        # The second change runs between the first one's availability check and its save
+        results = []
+        second = threading.Thread(target=lambda: results.append(
+            modify_reservation(movers[1]["reservation"]["id"], reservation_time="15:00")))
+        
+        def check_then_race(*args, **kwargs):
+            availability = _check_availability(*args, **kwargs)
+            if second.ident is None:
+                second.start()
+                # Unless the first change holds the lock, the second one finishes well within this
+                second.join(timeout=0.5)
+            return availability
+        
+        with mock.patch("tools.restaurant_tools._check_availability", side_effect=check_then_race):
+            results.append(modify_reservation(movers[0]["reservation"]["id"], reservation_time="15:00"))
+            second.join()
+        
+        self.assertEqual(sorted(result["success"] for result in results), [False, True])
+        self.assertFalse(check_availability("rest1", "2025-07-03", "15:00", 2)["available"])
+    
+    def test_reactivating_a_cancelled_reservation_needs_a_free_table(self):
+        """Test that a cancelled reservation taken up again is checked against the tables left"""
+        # Fill every table at 16:00, cancel one booking and give its table to someone else
+        slot = {"restaurant_id": "rest1", "party_size": 2, "reservation_date": "2025-07-04", "reservation_time": "16:00"}
+        booked = []
+        while True:
+            result = create_reservation(customer_name=f"Filler {len(booked)}", **slot)
+            if not result["success"]:
+                break
+            booked.append(result["reservation"]["id"])
+        self.assertLess(len(booked), 20)
+        cancel_reservation(booked[0])
+        self.assertTrue(create_reservation(customer_name="Late Booker", **slot)["success"])
+        
+        result = modify_reservation(booked[0], status="confirmed")
+        self.assertFalse(result["success"])
+        self.assertEqual(get_reservation(booked[0])["reservation"]["status"], "cancelled")
+        
+        # Moved to a free time, a bigger party is given combined tables
+        self.assertTrue(modify_reservation(booked[0], party_size=12)["success"])
+        result = modify_reservation(booked[0], status="confirmed", reservation_time="11:00")
+        self.assertTrue(result["success"])
+        self.assertEqual(result["reservation"]["party_size"], 12)
+        self.assertGreater(sum(result["reservation"]["tables"].values()), 1)
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
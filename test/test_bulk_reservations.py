@@ -0,0 +1,140 @@
+# test_bulk_reservations.py - Test batch reservation import and export
+
+import unittest
+import sys
+import os
+import json
+import datetime
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.bulk_reservations import create_reservations, export_reservations, read_rows
+from tools.reservation_store import JsonReservationStore
+from utils.helpers import load_json_file
+from config import RESTAURANTS_FILE
+
+
+class TestBulkReservations(unittest.TestCase):
+    """Test suite for the batch create API"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.restaurant = load_json_file(RESTAURANTS_FILE)[0]
+        cls.small_tables = cls.restaurant["tables"]["small"]["count"]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "reservations.json")
+        self.store = JsonReservationStore(self.path)
+
+    def row(self, name, party_size="2", time=None, **extra):
+        """Build an import row for the first restaurant."""
+        row = {"restaurant_id": self.restaurant["id"], "customer_name": name, "party_size": party_size,
+               "reservation_date": "2030-06-14", "reservation_time": time or self.restaurant["hours"]["open"]}
+        row.update(extra)
+        return row
+
+    def test_bad_rows_are_reported_without_aborting(self):
+        """Test that invalid rows are listed by number and the rest are saved"""
+        rows = [
+            self.row("Alex"),
+            self.row("Sam", party_size="lots"),
+            self.row("Kim", restaurant_id="nowhere"),
+            {"_error": "Invalid JSON: Expecting value"},
+            self.row("Lee", party_size="3", customer_email=""),
+        ]
+        result = create_reservations(rows, store=self.store)
+        self.assertTrue(result["success"])
+        self.assertEqual(result["created"], 2)
+        self.assertEqual([error["row"] for error in result["errors"]], [2, 3, 4])
+        self.assertIn("party_size", result["errors"][0]["error"])
+        saved = load_json_file(self.path)
+        self.assertEqual([r["customer_name"] for r in saved], ["Alex", "Lee"])
+        self.assertNotIn("customer_email", saved[1])
+
+    def test_capacity_counts_earlier_rows_of_the_batch(self):
+        """Test that a slot fills up within one batch"""
+        rows = [self.row(f"Guest {i}") for i in range(self.small_tables + 1)]
+        result = create_reservations(rows, store=self.store)
+        self.assertEqual(result["created"], self.small_tables)
+        self.assertEqual(len(result["errors"]), 1)
+        self.assertIn("No tables left for a party of 2", result["errors"][0]["error"])
+
+    @mock.patch("tools.occupancy.BOOKING_DURATION_MINUTES", 120)
+    def test_overlapping_times_share_tables(self):
+        """Test that a booking shortly after a full slot is refused, and one after the tables free up is not"""
+        opening = datetime.datetime.strptime(self.restaurant["hours"]["open"], "%H:%M")
+        later = lambda minutes: (opening + datetime.timedelta(minutes=minutes)).strftime("%H:%M")
+        rows = [self.row(f"Guest {i}") for i in range(self.small_tables)]
+        rows += [self.row("Sam", time=later(30)), self.row("Kim", time=later(120))]
+        result = create_reservations(rows, store=self.store)
+        self.assertEqual(result["created"], self.small_tables + 1)
+        self.assertEqual([error["row"] for error in result["errors"]], [self.small_tables + 1])
+
+    def test_import_is_idempotent(self):
+        """Test that running an import twice does not double-book"""
+        rows = [self.row("Alex"), self.row("Sam")]
+        create_reservations(rows, store=self.store)
+        result = create_reservations(rows, store=self.store)
+        self.assertEqual((result["created"], result["duplicates"]), (0, 2))
+        self.assertEqual(len(load_json_file(self.path)), 2)
+
+    def test_dry_run_writes_nothing(self):
+        """Test that a dry run checks rows but does not save"""
+        result = create_reservations([self.row("Alex")], dry_run=True, store=self.store)
+        self.assertEqual(result["created"], 1)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_rows_are_read_before_the_lock_is_taken(self):
+        """Test that parsing and validation happen outside the store lock, and dry runs take no lock"""
+        held = []
+        real_locked = self.store.locked
+
+        @contextmanager
+        def locked():
+            held.append(True)
+            with real_locked() as store:
+                yield store
+            held.pop()
+
+        def rows():
+            for name in ("Alex", "Sam"):
+                self.assertEqual(held, [])
+                yield self.row(name)
+
+        with mock.patch.object(self.store, "locked", side_effect=locked) as lock:
+            self.assertEqual(create_reservations(rows(), dry_run=True, store=self.store)["created"], 2)
+            self.assertEqual(lock.call_count, 0)
+            self.assertEqual(create_reservations(rows(), store=self.store)["created"], 2)
+            self.assertEqual(lock.call_count, 1)
+
+    def test_csv_and_jsonl_round_trip(self):
+        """Test exporting and reading back both formats"""
+        create_reservations([self.row("Alex"), self.row("Sam", party_size="4")], store=self.store)
+        for name in ("export.csv", "export.jsonl"):
+            path = os.path.join(self.directory.name, name)
+            self.assertEqual(export_reservations(path, store=self.store), 2)
+            rows = list(read_rows(path))
+            self.assertEqual([row["customer_name"] for row in rows], ["Alex", "Sam"])
+            self.assertEqual(str(rows[1]["party_size"]), "4")
+
+    def test_large_import_is_fast(self):
+        """Test that many rows are imported with one write in well under a minute"""
+        hours = [f"{hour:02d}:{minute:02d}" for hour in range(10, 21) for minute in (0, 30)]
+        rows = [self.row(f"Guest {i}", time=hours[i % len(hours)],
+                         reservation_date=f"2030-{1 + i % 12:02d}-{1 + i % 28:02d}") for i in range(20000)]
+        started = time.perf_counter()
+        result = create_reservations(rows, store=self.store)
+        self.assertLess(time.perf_counter() - started, 30)
+        self.assertEqual(result["created"] + len(result["errors"]), 20000)
+
+
+if __name__ == "__main__":
+    unittest.main()
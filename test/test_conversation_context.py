@@ -0,0 +1,203 @@
+# test_conversation_context.py - Test slot-filling and bounded per-session context
+
+import unittest
+import sys
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent.conversation_context import (
+    ConversationContextManager, RestaurantRef, extract_parameters, missing_parameters, trim_history
+)
+from agent.llm_service import LLMService
+from agent.restaurant_resolver import RestaurantResolver
+
+
+def completion(content=None, tool_calls=None):
+    """Build a chat completion response like the API returns."""
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = tool_calls
+    return {"choices": [{"message": message}]}
+
+
+class TestParameterExtraction(unittest.TestCase):
+    """Test suite for pulling parameters out of follow-up messages"""
+
+    def test_extracts_date_time_and_party_size(self):
+        """Test a message answering several questions at once"""
+        values = extract_parameters("2025-06-14 at 7:30 pm for 4 people", ["date", "time", "party_size"])
+        self.assertEqual(values, {"date": "2025-06-14", "time": "19:30", "party_size": 4})
+
+    def test_uses_the_tool_parameter_names(self):
+        """Test that reservation_date/reservation_time are filled like date/time"""
+        tomorrow = (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+        values = extract_parameters("tomorrow at 8pm", ["reservation_date", "reservation_time"])
+        self.assertEqual(values, {"reservation_date": tomorrow, "reservation_time": "20:00"})
+
+    def test_bare_number_only_when_party_size_is_the_only_question(self):
+        """Test that "4" answers a party size question but not a date/time one"""
+        self.assertEqual(extract_parameters("4", ["party_size"]), {"party_size": 4})
+        self.assertEqual(extract_parameters("four", ["party_size"]), {"party_size": 4})
+        self.assertEqual(extract_parameters("4", ["party_size", "time"]), {})
+
+    def test_time_is_not_read_as_party_size(self):
+        """Test that "for 7 pm" is a time, not a party of seven"""
+        self.assertEqual(extract_parameters("for 7 pm", ["party_size", "time"]), {"time": "19:00"})
+
+    def test_customer_name(self):
+        """Test names given with and without an introduction"""
+        self.assertEqual(extract_parameters("my name is rahul sharma", ["customer_name", "party_size"]),
+                         {"customer_name": "Rahul Sharma"})
+        self.assertEqual(extract_parameters("Priya", ["customer_name"]), {"customer_name": "Priya"})
+        self.assertEqual(extract_parameters("what cuisines do you have?", ["customer_name"]), {})
+
+    def test_reservation_id(self):
+        """Test that reservation IDs are found but the word "reservation" is not"""
+        self.assertEqual(extract_parameters("it's res20250601120000123456", ["reservation_id"]),
+                         {"reservation_id": "res20250601120000123456"})
+        self.assertEqual(extract_parameters("cancel my reservation", ["reservation_id"]), {})
+
+    def test_missing_parameters(self):
+        """Test that empty values count as missing"""
+        self.assertEqual(missing_parameters({"restaurant_id": "rest1", "date": ""}, ["restaurant_id", "date", "time"]),
+                         ["date", "time"])
+
+
+class TestPendingToolCall(unittest.TestCase):
+    """Test suite for the pending tool call in the context manager"""
+
+    def test_fill_until_complete(self):
+        """Test that answers are merged one question at a time"""
+        context = ConversationContextManager()
+        context.set_pending_tool_call("check_availability", {"restaurant_id": "rest1"}, ["date", "time", "party_size"])
+
+        self.assertEqual(context.fill_pending_tool_call("2025-06-14 at 19:00"), {"date": "2025-06-14", "time": "19:00"})
+        self.assertEqual(context.get_missing_parameters(), ["party_size"])
+        self.assertIn("number of people", context.clarification_question())
+
+        context.fill_pending_tool_call("6")
+        self.assertEqual(context.get_missing_parameters(), [])
+        self.assertEqual(context.get_pending_tool_call()["arguments"],
+                         {"restaurant_id": "rest1", "date": "2025-06-14", "time": "19:00", "party_size": 6})
+
+    def test_reset_clears_pending_call(self):
+        """Test that a new conversation forgets the pending call"""
+        context = ConversationContextManager()
+        context.set_pending_tool_call("get_reservation", {}, ["reservation_id"])
+        context.reset()
+        self.assertIsNone(context.get_pending_tool_call())
+        self.assertEqual(context.get_missing_parameters(), [])
+
+
+class TestBoundedContext(unittest.TestCase):
+    """Test suite for keeping per-session state small"""
+
+    def test_search_results_keep_only_references(self):
+        """Test that full restaurant records are not kept"""
+        context = ConversationContextManager()
+        context.store_search_results([{
+            "id": "rest1", "name": "Silver Table", "location": "Downtown", "cuisine": "Italian",
+            "description": "x" * 1000, "tables": {"small": {"count": 4, "capacity": 2}}
+        }])
+        ref, = context.get_search_results()
+        self.assertIsInstance(ref, RestaurantRef)
+        self.assertEqual((ref.id, ref.name, ref.location), ("rest1", "Silver Table", "Downtown"))
+        self.assertFalse(hasattr(ref, "__dict__"))
+        self.assertEqual(context.get_search_result_ids(), ["rest1"])
+        self.assertLess(context.memory_usage(), 2000)
+
+    def test_name_map_is_bounded(self):
+        """Test that the least recently shown names are forgotten"""
+        context = ConversationContextManager()
+        with mock.patch("agent.conversation_context.MAX_REMEMBERED_RESTAURANTS", 3):
+            context.store_search_results([{"id": f"rest{i}", "name": f"Place {i}"} for i in range(3)])
+            context.store_search_results([{"id": "rest0", "name": "Place 0"}, {"id": "rest9", "name": "Place 9"}])
+        self.assertEqual(context.get_restaurant_id_by_name("place 0"), "rest0")
+        self.assertEqual(context.get_restaurant_id_by_name("Place 9"), "rest9")
+        self.assertIsNone(context.get_restaurant_id_by_name("Place 1"))
+
+    def test_trim_history_keeps_tool_calls_with_their_results(self):
+        """Test that trimming starts at a user message"""
+        history = [
+            {"role": "user", "content": "hi"},
+            {"role": "assistant", "content": "hello"},
+            {"role": "user", "content": "find pizza"},
+            {"role": "assistant", "content": None, "tool_calls": [{"id": "call_1"}]},
+            {"role": "tool", "tool_call_id": "call_1", "content": "{}"},
+            {"role": "assistant", "content": "Here you go"},
+            {"role": "user", "content": "thanks"},
+            {"role": "assistant", "content": "bye"},
+        ]
+        self.assertIs(trim_history(history, 10), history)
+        self.assertEqual(trim_history(history, 5), history[6:])
+        self.assertEqual(trim_history(history, 6), history[2:])
+        # A single turn longer than the limit is kept whole
+        self.assertEqual(trim_history(history[2:6], 2), history[2:6])
+
+
+class TestSlotFillingFlow(unittest.TestCase):
+    """Test suite for clarification turns that skip the LLM"""
+
+    def setUp(self):
+        resolver = RestaurantResolver([
+            {"id": "rest1", "name": "Silver Table", "location": "Downtown", "cuisine": "Italian"}
+        ])
+        self.service = LLMService(restaurant_resolver=resolver)
+        self.api = mock.patch.object(self.service, "make_api_request").start()
+        self.tool = mock.patch.object(self.service, "_execute_tool", return_value={"available": True}).start()
+        self.addCleanup(mock.patch.stopall)
+
+    def test_answer_runs_the_tool_without_first_completion(self):
+        """Test that answering the question runs the tool and needs only one completion"""
+        self.api.return_value = completion(tool_calls=[{
+            "id": "call_1",
+            "type": "function",
+            "function": {"name": "check_availability", "arguments": json.dumps({"restaurant_id": "Silver Table"})}
+        }])
+        first = self.service.process_query("Is Silver Table free?")
+        self.assertEqual(self.api.call_count, 1)
+        self.assertFalse(self.tool.called)
+        self.assertEqual(first["debug_info"]["missing_parameters"], ["date", "time", "party_size"])
+
+        self.api.return_value = completion(content="Silver Table has a table for you.")
+        second = self.service.process_query("2025-06-14 at 7pm for 2 people")
+        self.assertEqual(self.api.call_count, 2)
+        self.tool.assert_called_once_with("check_availability", {
+            "restaurant_id": "rest1", "date": "2025-06-14", "time": "19:00", "party_size": 2})
+        self.assertTrue(second["tool_calls"])
+        self.assertIsNone(self.service.context_manager.get_pending_tool_call())
+
+        # The synthesized tool call is paired with its result in the history
+        tool_call_message, tool_message = self.service.conversation_history[-3:-1]
+        self.assertEqual(tool_call_message["tool_calls"][0]["id"], tool_message["tool_call_id"])
+
+    def test_history_is_bounded(self):
+        """Test that long conversations keep only the latest turns"""
+        self.api.return_value = completion(content="Sure.")
+        with mock.patch("agent.llm_service.MAX_HISTORY_MESSAGES", 6):
+            for i in range(10):
+                self.service.process_query(f"question {i}")
+        history = self.service.conversation_history
+        self.assertEqual(len(history), 6)
+        self.assertEqual(history[0], {"role": "user", "content": "question 7"})
+        self.assertEqual(self.service.memory_usage()["history_messages"], 6)
+
+    def test_unrelated_message_goes_to_the_llm(self):
+        """Test that a message that does not answer the question drops the pending call"""
+        self.service.context_manager.set_pending_tool_call(
+            "check_availability", {"restaurant_id": "rest1"}, ["date", "time", "party_size"])
+        self.api.return_value = completion(content="We serve Italian food.")
+
+        result = self.service.process_query("What cuisines do you have?")
+        self.assertEqual(result["response"], "We serve Italian food.")
+        self.assertEqual(self.api.call_count, 1)
+        self.assertIsNone(self.service.context_manager.get_pending_tool_call())
+
+
+if __name__ == "__main__":
+    unittest.main()
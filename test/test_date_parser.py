@@ -0,0 +1,143 @@
+# test_date_parser.py - Test natural-language date/time normalization
+
+import unittest
+import sys
+import datetime
+from pathlib import Path
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.date_parser import parse_date, parse_time
+from agent.llm_service import LLMService
+from agent.restaurant_resolver import RestaurantResolver
+
+# A Wednesday
+TODAY = datetime.date(2025, 6, 11)
+
+
+class TestParseDate(unittest.TestCase):
+    """Test suite for parse_date"""
+
+    def test_absolute_dates(self):
+        """Test numeric and month-name dates"""
+        self.assertEqual(parse_date("2025-06-14", TODAY), "2025-06-14")
+        self.assertEqual(parse_date("2025-6-5", TODAY), "2025-06-05")
+        self.assertEqual(parse_date("14/06/2025", TODAY), "2025-06-14")
+        self.assertEqual(parse_date("June 14th", TODAY), "2025-06-14")
+        self.assertEqual(parse_date("14th of June 2026", TODAY), "2026-06-14")
+
+    def test_past_day_and_month_roll_over_to_next_year(self):
+        """Test that a date without a year is never in the past"""
+        self.assertEqual(parse_date("Jan 3", TODAY), "2026-01-03")
+
+    def test_relative_dates(self):
+        """Test dates counted from today"""
+        self.assertEqual(parse_date("tonight", TODAY), "2025-06-11")
+        self.assertEqual(parse_date("tomorrow", TODAY), "2025-06-12")
+        self.assertEqual(parse_date("day after tomorrow", TODAY), "2025-06-13")
+        self.assertEqual(parse_date("in 3 days", TODAY), "2025-06-14")
+        self.assertEqual(parse_date("in a week", TODAY), "2025-06-18")
+
+    def test_weekdays(self):
+        """Test that "next" skips today but a plain weekday does not"""
+        self.assertEqual(parse_date("friday", TODAY), "2025-06-13")
+        self.assertEqual(parse_date("next Friday", TODAY), "2025-06-13")
+        self.assertEqual(parse_date("wednesday", TODAY), "2025-06-11")
+        self.assertEqual(parse_date("next wednesday", TODAY), "2025-06-18")
+
+    def test_invalid_and_missing_dates(self):
+        """Test that impossible dates and ordinary words give None"""
+        self.assertIsNone(parse_date("2025-02-30", TODAY))
+        self.assertIsNone(parse_date("May I book a table for 4 people?", TODAY))
+        self.assertIsNone(parse_date("", TODAY))
+
+
+class TestParseTime(unittest.TestCase):
+    """Test suite for parse_time"""
+
+    def test_clock_times(self):
+        """Test 24-hour and am/pm times"""
+        self.assertEqual(parse_time("19:00"), "19:00")
+        self.assertEqual(parse_time("7:30 pm"), "19:30")
+        self.assertEqual(parse_time("7.30pm"), "19:30")
+        self.assertEqual(parse_time("7pm"), "19:00")
+        self.assertEqual(parse_time("12 am"), "00:00")
+        self.assertEqual(parse_time("noon"), "12:00")
+
+    def test_bare_hours_are_read_as_evening(self):
+        """Test the dining-hours reading of hours without am/pm"""
+        self.assertEqual(parse_time("at 7"), "19:00")
+        self.assertEqual(parse_time("8 o'clock"), "20:00")
+        self.assertEqual(parse_time("half past 7"), "19:30")
+        self.assertEqual(parse_time("at 11"), "11:00")
+
+    def test_hours_with_minutes_follow_the_same_rule(self):
+        """Test that minutes do not change how an hour without am/pm is read"""
+        self.assertEqual(parse_time("7:30"), "19:30")
+        self.assertEqual(parse_time("at 7:30"), "19:30")
+        self.assertEqual(parse_time("9:45"), "21:45")
+        self.assertEqual(parse_time("11:30"), "11:30")
+        self.assertEqual(parse_time("12:15"), "12:15")
+        self.assertEqual(parse_time("07:30"), "07:30")
+        self.assertEqual(parse_time("7:30 am"), "07:30")
+        for hour in range(1, 12):
+            self.assertEqual(parse_time(f"at {hour}")[:2], parse_time(f"{hour}:00")[:2])
+
+    def test_party_sizes_are_not_times(self):
+        """Test that counts of people are not mistaken for times"""
+        self.assertIsNone(parse_time("for 4"))
+        self.assertIsNone(parse_time("at 7 people"))
+
+
+class TestArgumentNormalization(unittest.TestCase):
+    """Test suite for date/time fixing in _preprocess_tool_args"""
+
+    def setUp(self):
+        self.service = LLMService(restaurant_resolver=RestaurantResolver([
+            {"id": "rest1", "name": "Silver Table", "location": "Downtown", "cuisine": "Italian"}
+        ]))
+
+    def test_malformed_arguments_are_fixed(self):
+        """Test that relative and 12-hour values are converted"""
+        tomorrow = (datetime.date.today() + datetime.timedelta(days=1)).strftime("%Y-%m-%d")
+        args = self.service._preprocess_tool_args("create_reservation", {
+            "restaurant_id": "rest1", "reservation_date": "tomorrow", "reservation_time": "8 PM"})
+        self.assertEqual(args["reservation_date"], tomorrow)
+        self.assertEqual(args["reservation_time"], "20:00")
+
+    def test_empty_or_missing_required_argument_falls_back_to_query(self):
+        """Test that the user's own words are used only when the model gave nothing"""
+        args = self.service._preprocess_tool_args(
+            "check_availability", {"restaurant_id": "rest1", "date": "", "party_size": 2},
+            user_query="Book Silver Table on 2025-07-04 at 7pm")
+        self.assertEqual((args["date"], args["time"]), ("2025-07-04", "19:00"))
+
+        # An optional argument the model left out stays out
+        args = self.service._preprocess_tool_args(
+            "modify_reservation", {"reservation_id": "res1", "reservation_time": "20:00"},
+            user_query="Move it from 2025-07-04 7pm to 8pm")
+        self.assertEqual(args, {"reservation_id": "res1", "reservation_time": "20:00"})
+
+    def test_unreadable_argument_is_not_replaced_by_the_query(self):
+        """Test that a date or time in the query is not swapped in for an argument the parser cannot read"""
+        args = self.service._preprocess_tool_args(
+            "check_availability", {"restaurant_id": "rest1", "date": "the requested date", "time": "19:00"},
+            user_query="Book Silver Table on 2025-07-04 at 7pm")
+        self.assertEqual(args["date"], "the requested date")
+
+    def test_valid_times_are_not_reread_as_dining_hours(self):
+        """Test that a valid morning time from the model is not moved to the evening"""
+        for value in ("09:00", "9:00"):
+            args = self.service._preprocess_tool_args(
+                "check_availability", {"restaurant_id": "rest1", "date": "2025-06-14", "time": value})
+            self.assertEqual(args["time"], value)
+
+    def test_valid_arguments_are_kept(self):
+        """Test that well-formed values pass through unchanged"""
+        args = {"restaurant_id": "rest1", "date": "2025-06-14", "time": "19:00", "party_size": 2}
+        self.assertEqual(self.service._preprocess_tool_args("check_availability", args), args)
+
+
+if __name__ == "__main__":
+    unittest.main()
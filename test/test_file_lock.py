@@ -0,0 +1,104 @@
+# test_file_lock.py - Test atomic saves and file locking
+
+import unittest
+import sys
+import json
+import os
+import subprocess
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.helpers import load_json_file, save_json_file
+from utils.file_lock import fcntl, file_lock, LockTimeout, LOCK_CONTENDED
+
+HOLD_LOCK_SCRIPT = """
+import fcntl, os, sys, time
+fd = os.open(sys.argv[1] + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+fcntl.flock(fd, fcntl.LOCK_EX)
+print("locked", flush=True)
+time.sleep(float(sys.argv[2]))
+"""
+
+
+class TestAtomicSave(unittest.TestCase):
+    """Test suite for save_json_file"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "reservations.json")
+
+    def test_failed_save_keeps_previous_contents(self):
+        """Test that an error while writing leaves the old file and no temp file"""
+        self.assertTrue(save_json_file(self.path, [{"id": "res1"}]))
+        self.assertFalse(save_json_file(self.path, [{"id": object()}]))
+        self.assertEqual(load_json_file(self.path), [{"id": "res1"}])
+        self.assertEqual(os.listdir(self.directory.name), ["reservations.json"])
+
+    def test_save_replaces_the_file(self):
+        """Test that each save swaps in a new file"""
+        save_json_file(self.path, [1])
+        first_inode = os.stat(self.path).st_ino
+        save_json_file(self.path, [1, 2])
+        self.assertEqual(load_json_file(self.path), [1, 2])
+        self.assertNotEqual(os.stat(self.path).st_ino, first_inode)
+
+
+class TestFileLock(unittest.TestCase):
+    """Test suite for file_lock"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "reservations.json")
+        save_json_file(self.path, {"count": 0})
+
+    def test_concurrent_read_modify_write_loses_nothing(self):
+        """Test that locked increments from many threads all land"""
+        def increment():
+            for _ in range(20):
+                with file_lock(self.path):
+                    data = load_json_file(self.path)
+                    data["count"] += 1
+                    save_json_file(self.path, data)
+
+        threads = [threading.Thread(target=increment) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(load_json_file(self.path)["count"], 100)
+
+    def test_lock_is_reentrant(self):
+        """Test that a thread can take a lock it already holds"""
+        with file_lock(self.path):
+            with file_lock(self.path, timeout=0.1):
+                pass
+
+    @unittest.skipIf(fcntl is None, "needs fcntl")
+    def test_other_process_holding_the_lock(self):
+        """Test bounded waiting and contention counting against another process"""
+        holder = subprocess.Popen([sys.executable, "-c", HOLD_LOCK_SCRIPT, self.path, "0.5"],
+                                  stdout=subprocess.PIPE, text=True)
+        self.addCleanup(holder.wait)
+        self.assertEqual(holder.stdout.readline().strip(), "locked")
+
+        started = time.monotonic()
+        with self.assertRaises(LockTimeout):
+            with file_lock(self.path, timeout=0.1):
+                pass
+        self.assertLess(time.monotonic() - started, 0.4)
+
+        contended = LOCK_CONTENDED.value(file="reservations.json")
+        with file_lock(self.path, timeout=5):
+            pass
+        self.assertEqual(LOCK_CONTENDED.value(file="reservations.json"), contended + 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+# test_helpers.py - Test the ID generator
+
+import unittest
+import sys
+import datetime
+import subprocess
+import threading
+from pathlib import Path
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.helpers import generate_id, id_timestamp
+
+GENERATE_IDS_SCRIPT = """
+import sys
+sys.path.insert(0, sys.argv[1])
+from utils.helpers import generate_id
+print("\\n".join(generate_id("res") for _ in range(2000)))
+"""
+
+
+class TestGenerateId(unittest.TestCase):
+    """Test suite for generate_id"""
+
+    def test_ids_sort_in_creation_order(self):
+        """Test that IDs from one process are strictly increasing"""
+        ids = [generate_id("res") for _ in range(5000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+        self.assertTrue(all(len(i) == 36 and i.startswith("res") for i in ids))
+
+    def test_ids_sort_after_legacy_ids(self):
+        """Test that new IDs sort after the timestamp IDs already stored"""
+        legacy = ["res20250311100703299034", "res20250311110357059049", "res20251231235959999999"]
+        new = [generate_id("res") for _ in range(3)]
+        mixed = [new[1], legacy[2], new[0], legacy[0], new[2], legacy[1]]
+        self.assertEqual(sorted(mixed), legacy + new)
+
+    def test_concurrent_threads_do_not_collide(self):
+        """Test that IDs generated from many threads are unique"""
+        results = []
+
+        def generate():
+            results.extend(generate_id("res") for _ in range(2000))
+
+        threads = [threading.Thread(target=generate) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(results)), 16000)
+
+    def test_processes_do_not_collide(self):
+        """Test that IDs generated by separate processes are unique"""
+        root = str(Path(__file__).parent.parent)
+        outputs = [
+            subprocess.run([sys.executable, "-c", GENERATE_IDS_SCRIPT, root],
+                           capture_output=True, text=True, check=True).stdout.split()
+            for _ in range(3)
+        ]
+        ids = [i for output in outputs for i in output]
+        self.assertEqual(len(set(ids)), 6000)
+
+    def test_timestamp_round_trip(self):
+        """Test that the creation time can be read back from the ID"""
+        before = datetime.datetime.now(datetime.timezone.utc)
+        created = id_timestamp(generate_id("res"), "res")
+        self.assertLess(abs((created - before).total_seconds()), 1)
+        self.assertIsNone(id_timestamp("res20250101120000", "res"))
+        self.assertIsNone(id_timestamp("res20250311100703299034", "res"))
+
+
+if __name__ == "__main__":
+    unittest.main()
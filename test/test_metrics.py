@@ -0,0 +1,85 @@
+# test_metrics.py - Test the metrics registry and its Prometheus export
+
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test suite for MetricsRegistry"""
+
+    def setUp(self):
+        self.registry = MetricsRegistry()
+
+    def test_counter_exposition(self):
+        """Test that counter series are rendered sorted, with their help and type"""
+        counter = self.registry.counter("foodiespot_calls_total", "Calls by tool")
+        counter.inc(tool="search")
+        counter.inc(2, tool="book")
+        counter.inc(0.5, tool="search")
+        self.assertEqual(self.registry.render_prometheus(), (
+            "# HELP foodiespot_calls_total Calls by tool\n"
+            "# TYPE foodiespot_calls_total counter\n"
+            'foodiespot_calls_total{tool="book"} 2\n'
+            'foodiespot_calls_total{tool="search"} 1.5\n'))
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test bucket counts, the +Inf bucket, sum and count"""
+        histogram = self.registry.histogram("foodiespot_latency_seconds", "Latency", buckets=(0.1, 1))
+        for value in (0.05, 0.5, 2):
+            histogram.observe(value)
+        lines = self.registry.render_prometheus().splitlines()[2:]
+        self.assertEqual(lines, [
+            'foodiespot_latency_seconds_bucket{le="0.1"} 1',
+            'foodiespot_latency_seconds_bucket{le="1"} 2',
+            'foodiespot_latency_seconds_bucket{le="+Inf"} 3',
+            "foodiespot_latency_seconds_sum 2.55",
+            "foodiespot_latency_seconds_count 3",
+        ])
+
+    def test_escaping(self):
+        """Test that label values and help text are escaped"""
+        counter = self.registry.counter("foodiespot_errors_total", "Errors\nby message \\ kind")
+        counter.inc(message='say "hi"\\\n')
+        self.assertEqual(self.registry.render_prometheus().splitlines(), [
+            "# HELP foodiespot_errors_total Errors\\nby message \\\\ kind",
+            "# TYPE foodiespot_errors_total counter",
+            'foodiespot_errors_total{message="say \\"hi\\"\\\\\\n"} 1',
+        ])
+
+    def test_name_is_bound_to_one_type(self):
+        """Test that a name cannot be registered as two kinds of metric"""
+        self.assertIs(self.registry.counter("foodiespot_x", "X"), self.registry.counter("foodiespot_x", "X"))
+        with self.assertRaises(ValueError):
+            self.registry.histogram("foodiespot_x", "X")
+
+    def test_concurrent_exports(self):
+        """Test that exports running at the same time each publish a whole file"""
+        self.registry.counter("foodiespot_calls_total", "Calls").inc()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = os.path.join(directory.name, "metrics.prom")
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.registry.write_prometheus(path)))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, [True] * 8)
+        self.assertEqual(os.listdir(directory.name), ["metrics.prom"])
+        with open(path) as f:
+            self.assertEqual(f.read(), self.registry.render_prometheus())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+# test_occupancy.py - Test the incrementally maintained availability view
+
+import unittest
+import sys
+import os
+import datetime
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.occupancy import AvailabilityView, Occupancy, booking_slots
+from tools.reservation_store import JsonReservationStore
+from utils.helpers import save_json_file
+
+RESTAURANT = {"id": "rest1", "tables": {"small": {"count": 2, "capacity": 2}, "medium": {"count": 0, "capacity": 4}}}
+
+
+def reservation(reservation_id, date, time="19:00", table_type="small", status="confirmed"):
+    """Build a minimal reservation record."""
+    return {"id": reservation_id, "restaurant_id": "rest1", "customer_name": "Alex Doe", "party_size": 2,
+            "reservation_date": date, "reservation_time": time, "table_type": table_type, "status": status}
+
+
+class TestAvailabilityView(unittest.TestCase):
+    """Test suite for AvailabilityView"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "reservations.json")
+        self.store = JsonReservationStore(self.path)
+        self.view = AvailabilityView(self.store, horizon_days=30)
+        self.tomorrow = (datetime.date.today() + datetime.timedelta(days=1)).isoformat()
+
+    def test_events_update_the_counts(self):
+        """Test that bookings, changes and cancellations adjust the view without a rebuild"""
+        self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "19:00", "small"), 2)
+        with mock.patch.object(self.view, "rebuild", wraps=self.view.rebuild) as rebuild:
+            self.store.put(reservation("res1", self.tomorrow))
+            self.store.put(reservation("res2", self.tomorrow))
+            self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "19:00", "small"), 0)
+
+            moved = self.store.get("res1")
+            moved["reservation_time"] = "21:00"
+            self.store.put(moved)
+            self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "19:00", "small"), 1)
+            self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "21:00", "small"), 1)
+
+            self.store.put(dict(self.store.get("res2"), status="cancelled"))
+            self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "19:00", "small"), 2)
+        rebuild.assert_not_called()
+        self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "19:00", "medium"), 0)
+
+    @mock.patch("tools.occupancy.BOOKING_DURATION_MINUTES", 120)
+    @mock.patch("tools.occupancy.SLOT_MINUTES", 15)
+    def test_overlapping_bookings_share_tables(self):
+        """Test that a booking holds its tables for its whole duration, not just its start time"""
+        self.assertEqual(booking_slots("19:10"), ["19:00", "19:15", "19:30", "19:45", "20:00", "20:15",
+                                                  "20:30", "20:45", "21:00"])
+        self.store.put_many([reservation("res1", self.tomorrow, "19:00"), reservation("res2", self.tomorrow, "20:30")])
+        self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "19:15", "small"), 0)
+        self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "17:30", "small"), 1)
+        self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "21:00", "small"), 1)
+        self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "22:30", "small"), 2)
+        # Moving a booking frees its own tables, wherever the new time overlaps it
+        self.assertEqual(self.view.remaining(RESTAURANT, self.tomorrow, "19:15", "small",
+                                             release=self.store.get("res1")), 1)
+        # Far-off dates are counted the same way
+        later = (datetime.date.today() + datetime.timedelta(days=60)).isoformat()
+        self.store.put(reservation("res3", later, "19:00"))
+        self.assertEqual(Occupancy(self.store.for_date(later)).taken("rest1", later, "20:45", "small"), 1)
+        self.assertEqual(self.view.taken("rest1", later, "20:45", "small"), 1)
+        self.assertEqual(self.view.taken("rest1", later, "21:00", "small"), 0)
+
+    def test_dates_outside_the_horizon_are_counted_from_the_store(self):
+        """Test that far-off and past dates are still answered"""
+        later = (datetime.date.today() + datetime.timedelta(days=60)).isoformat()
+        self.store.put_many([reservation("res1", later), reservation("res2", "2020-01-01")])
+        self.assertEqual(self.view.taken("rest1", later, "19:00", "small"), 1)
+        self.assertEqual(self.view.taken("rest1", "2020-01-01", "19:00", "small"), 1)
+        self.assertNotIn(("rest1", later, "19:00", "small"), self.view.counts())
+
+    def test_changes_by_other_processes_trigger_a_rebuild(self):
+        """Test that the view follows the file when someone else rewrites it"""
+        self.store.put(reservation("res1", self.tomorrow))
+        self.assertEqual(self.view.taken("rest1", self.tomorrow, "19:00", "small"), 1)
+        save_json_file(self.path, [reservation("res1", self.tomorrow), reservation("res9", self.tomorrow)])
+        self.assertEqual(self.view.taken("rest1", self.tomorrow, "19:00", "small"), 2)
+
+    def test_rebuild_repairs_drift(self):
+        """Test that a rebuild reports and fixes wrong counters"""
+        self.store.put(reservation("res1", self.tomorrow))
+        self.view.taken("rest1", self.tomorrow, "19:00", "small")
+        self.view._occupancy.remove(reservation("res1", self.tomorrow))
+        self.assertEqual(self.view.rebuild(), len(booking_slots("19:00")))
+        self.assertEqual(self.view.taken("rest1", self.tomorrow, "19:00", "small"), 1)
+        self.assertEqual(self.view.rebuild(), 0)
+
+
+    def test_periodic_check_repairs_drift_in_process(self):
+        """Test that the running view recounts itself once the check interval has passed"""
+        view = AvailabilityView(self.store, horizon_days=30, check_minutes=5)
+        self.store.put(reservation("res1", self.tomorrow))
+        with mock.patch("tools.occupancy.monotonic", return_value=1000.0):
+            self.assertEqual(view.taken("rest1", self.tomorrow, "19:00", "small"), 1)
+            view._occupancy.remove(reservation("res1", self.tomorrow))
+            self.assertEqual(view.taken("rest1", self.tomorrow, "19:00", "small"), 0)
+        with mock.patch("tools.occupancy.monotonic", return_value=1000.0 + 5 * 60):
+            with self.assertLogs("occupancy", "WARNING"):
+                self.assertEqual(view.taken("rest1", self.tomorrow, "19:00", "small"), 1)
+
+if __name__ == "__main__":
+    unittest.main()
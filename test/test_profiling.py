@@ -0,0 +1,75 @@
+# test_profiling.py - Test on-demand query profiling
+
+import unittest
+import sys
+import os
+import contextvars
+import pstats
+import tempfile
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.profiling import profile_turn, profiled, should_profile
+
+
+def busy_work():
+    """Something recognisable to find in a profile."""
+    return sum(i * i for i in range(1000))
+
+
+def worker_work():
+    """Something recognisable to run on another thread."""
+    return busy_work() + 1
+
+
+class TestProfileTurn(unittest.TestCase):
+    """Test suite for profile_turn"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_writes_stats_for_the_turn(self):
+        """Test that a forced profile dumps loadable stats covering the block"""
+        with profile_turn("turn1", force=True, trace_memory=False, output_dir=self.directory.name) as turn_dir:
+            busy_work()
+        self.assertEqual(turn_dir, os.path.join(self.directory.name, "turn1"))
+        self.assertEqual(os.listdir(turn_dir), ["profile.pstats"])
+        functions = {name for _, _, name in pstats.Stats(os.path.join(turn_dir, "profile.pstats")).stats}
+        self.assertIn("busy_work", functions)
+
+    def test_work_on_worker_threads_is_included(self):
+        """Test that profiled() calls on a thread pool are merged into the turn's profile"""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with profile_turn("turn3", force=True, trace_memory=False, output_dir=self.directory.name) as turn_dir:
+                future = executor.submit(contextvars.copy_context().run, profiled(worker_work))
+                self.assertEqual(future.result(), busy_work() + 1)
+            # Outside a profiled turn the wrapper only calls through
+            self.assertEqual(executor.submit(profiled(worker_work)).result(), busy_work() + 1)
+        functions = {name for _, _, name in pstats.Stats(os.path.join(turn_dir, "profile.pstats")).stats}
+        self.assertIn("worker_work", functions)
+
+    def test_memory_snapshot(self):
+        """Test that allocation tracing is dumped too and stopped again afterwards"""
+        with profile_turn("turn2", force=True, trace_memory=True, output_dir=self.directory.name) as turn_dir:
+            busy_work()
+        self.assertEqual(sorted(os.listdir(turn_dir)), ["allocations.tracemalloc", "profile.pstats"])
+        tracemalloc.Snapshot.load(os.path.join(turn_dir, "allocations.tracemalloc"))
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_unsampled_and_overlapping_turns_are_not_profiled(self):
+        """Test that only one turn is profiled at a time and sampling can skip turns"""
+        self.assertFalse(should_profile(sample_rate=0))
+        self.assertTrue(should_profile(force=True, sample_rate=0))
+        with profile_turn("outer", force=True, trace_memory=False, output_dir=self.directory.name):
+            with profile_turn("inner", force=True, trace_memory=False, output_dir=self.directory.name) as inner:
+                self.assertIsNone(inner)
+        self.assertEqual(os.listdir(self.directory.name), ["outer"])
+
+
+if __name__ == "__main__":
+    unittest.main()
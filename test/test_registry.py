@@ -0,0 +1,73 @@
+# test_registry.py - Test the tool registry and dispatch
+
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+import tools.restaurant_tools as restaurant_tools
+from tools.registry import get_tool, register_tool, registered_tools, tool_definitions
+from agent.tool_definitions import TOOL_DEFINITIONS
+from agent.llm_service import LLMService
+from agent.restaurant_resolver import RestaurantResolver
+
+
+class TestToolRegistry(unittest.TestCase):
+    """Test suite for the registry"""
+
+    def test_definitions_come_from_registered_tools(self):
+        """Test that every definition sent to the LLM has a function behind it"""
+        self.assertEqual(TOOL_DEFINITIONS, tool_definitions())
+        for definition in TOOL_DEFINITIONS:
+            tool = get_tool(definition["function"]["name"])
+            self.assertIsNotNone(tool)
+            self.assertIs(getattr(restaurant_tools, tool.name), tool.function)
+
+    def test_previously_missing_tools_are_registered(self):
+        """Test that modify_reservation and get_customer_reservations are callable"""
+        self.assertIsNotNone(get_tool("modify_reservation"))
+        self.assertIsNotNone(get_tool("get_customer_reservations"))
+
+    def test_policies(self):
+        """Test the read/write classification of the tools"""
+        writes = {tool.name for tool in registered_tools() if not tool.read_only}
+        self.assertEqual(writes, {"create_reservation", "cancel_reservation", "modify_reservation"})
+        self.assertTrue(get_tool("get_cuisines").read_only)
+
+    def test_duplicate_names_are_rejected(self):
+        """Test that a second function cannot take an existing tool name"""
+        with self.assertRaises(ValueError):
+            register_tool("Clash", name="get_cuisines")(lambda: [])
+
+
+class TestToolDispatch(unittest.TestCase):
+    """Test suite for dispatch through LLMService"""
+
+    def setUp(self):
+        self.service = LLMService(restaurant_resolver=RestaurantResolver([]))
+
+    def test_dispatch_calls_the_registered_function(self):
+        """Test that arguments are passed as keywords"""
+        tool = get_tool("modify_reservation")
+        with mock.patch.object(tool, "function", return_value={"success": True}) as function:
+            result = self.service._execute_tool("modify_reservation", {"reservation_id": "res1", "party_size": "3"})
+        function.assert_called_once_with(reservation_id="res1", party_size=3)
+        self.assertEqual(result, {"success": True})
+
+    def test_tool_exceptions_become_errors(self):
+        """Test that a failing tool is reported instead of raised"""
+        tool = get_tool("get_reservation")
+        with mock.patch.object(tool, "function", side_effect=RuntimeError("disk on fire")):
+            result = self.service._execute_tool("get_reservation", {"reservation_id": "res1"})
+        self.assertIn("disk on fire", result["error"])
+
+    def test_unknown_tool(self):
+        """Test that an unknown tool name is reported"""
+        self.assertEqual(self.service._execute_tool("launch_rocket", {}), {"error": "Unknown tool: launch_rocket"})
+
+
+if __name__ == "__main__":
+    unittest.main()
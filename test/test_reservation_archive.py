@@ -0,0 +1,88 @@
+# test_reservation_archive.py - Test the reservation retention job and archive
+
+import unittest
+import sys
+import os
+import datetime
+import gzip
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.reservation_archive import ReservationArchive, archive_reservations
+from tools.reservation_store import JsonReservationStore
+from tools.restaurant_tools import get_reservation
+
+NOW = datetime.datetime(2025, 6, 14, 12, 0)
+
+
+def reservation(reservation_id, date, status="confirmed", updated_at="2025-06-01T10:00:00", customer_name="Alex Doe"):
+    """Build a minimal reservation record."""
+    return {"id": reservation_id, "restaurant_id": "rest1", "customer_name": customer_name, "party_size": 2,
+            "reservation_date": date, "reservation_time": "19:00", "table_type": "small", "status": status,
+            "updated_at": updated_at}
+
+
+class TestReservationArchive(unittest.TestCase):
+    """Test suite for archiving reservations out of the hot store"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.store = JsonReservationStore(os.path.join(self.directory.name, "reservations.json"))
+        self.archive = ReservationArchive(os.path.join(self.directory.name, "archive"))
+        self.store.put_many([
+            reservation("old", "2025-05-20"),
+            reservation("yesterday", "2025-06-13"),
+            reservation("upcoming", "2025-06-20"),
+            reservation("cancelled-long-ago", "2025-07-01", status="cancelled"),
+            reservation("cancelled-today", "2025-07-01", status="cancelled", updated_at="2025-06-14T09:00:00"),
+        ])
+
+    def test_moves_past_and_cancelled_reservations(self):
+        """Test that only reservations outside the retention window leave the store"""
+        result = archive_reservations(self.store, self.archive, now=NOW)
+        self.assertEqual(result["archived"], {"past": 1, "cancelled": 1})
+        self.assertEqual(sorted(r["id"] for r in self.store.all()), ["cancelled-today", "upcoming", "yesterday"])
+        self.assertEqual(self.archive.months(), ["2025-05", "2025-07"])
+
+    def test_dry_run_moves_nothing(self):
+        """Test that a dry run only counts"""
+        result = archive_reservations(self.store, self.archive, now=NOW, dry_run=True)
+        self.assertEqual((result["archived"]["past"], result["kept"]), (1, 3))
+        self.assertEqual(len(self.store.all()), 5)
+        self.assertEqual(self.archive.months(), [])
+
+    def test_cold_lookups(self):
+        """Test finding archived reservations by ID and customer, and via get_reservation"""
+        archive_reservations(self.store, self.archive, now=NOW)
+        self.assertEqual(self.archive.get("old")["reservation_date"], "2025-05-20")
+        self.assertIsNone(self.archive.get("upcoming"))
+        self.assertEqual(sorted(r["id"] for r in self.archive.by_customer(" alex doe")), ["cancelled-long-ago", "old"])
+        with mock.patch("tools.restaurant_tools.get_archive", return_value=self.archive):
+            result = get_reservation("old")
+        self.assertTrue(result["archived"])
+
+    def test_interrupted_runs_are_tolerated(self):
+        """Test that a record archived twice is returned once and a torn segment end is ignored"""
+        self.archive.append([reservation("old", "2025-05-20")])
+        archive_reservations(self.store, self.archive, now=NOW)
+        with open(self.archive.segment_path("2025-05"), "ab") as f:
+            f.write(b"\x1f\x8b\x08\x00partial")
+        self.assertEqual([r["id"] for r in self.archive.records(["2025-05"])], ["old"])
+
+
+    def test_appending_after_a_torn_member(self):
+        """Test that records appended after an interrupted run can still be read"""
+        self.archive.append([reservation("a", "2025-05-20")])
+        with open(self.archive.segment_path("2025-05"), "ab") as f:
+            f.write(gzip.compress(b'{"id":"b"}\n')[:-6])
+        self.archive.append([reservation("c", "2025-05-21")])
+        self.assertEqual(self.archive.get("c")["reservation_date"], "2025-05-21")
+        self.assertEqual([r["id"] for r in self.archive.records(["2025-05"])], ["a", "c"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+# test_reservation_store.py - Test the reservation storage backends
+
+import unittest
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.reservation_store import (
+    JsonReservationStore, PartitionedReservationStore, ReservationIndex, VersionConflict, migrate
+)
+from utils.helpers import save_json_file
+
+
+def reservation(reservation_id, date, restaurant_id="rest1", customer_name="Alex Doe"):
+    """Build a minimal reservation record."""
+    return {
+        "id": reservation_id, "restaurant_id": restaurant_id, "customer_name": customer_name,
+        "party_size": 2, "reservation_date": date, "reservation_time": "19:00", "status": "confirmed"
+    }
+
+
+class TestReservationIndex(unittest.TestCase):
+    """Test suite for the in-memory indexes"""
+
+    def setUp(self):
+        self.index = ReservationIndex([
+            dict(reservation("res1", "2025-06-14"), reservation_time="20:00"),
+            dict(reservation("res2", "2025-06-14"), reservation_time="18:30"),
+            dict(reservation("res3", "2025-06-14", customer_name="Sam"), reservation_time="19:00"),
+            reservation("res4", "2025-06-14", restaurant_id="rest2"),
+        ])
+
+    def test_time_range_queries(self):
+        """Test that range queries return records sorted by time"""
+        self.assertEqual([r["id"] for r in self.index.between("rest1", "2025-06-14")], ["res2", "res3", "res1"])
+        self.assertEqual([r["id"] for r in self.index.between("rest1", "2025-06-14", "19:00", "20:00")], ["res3"])
+        self.assertEqual([r["id"] for r in self.index.on_date("2025-06-14")], ["res2", "res3", "res1", "res4"])
+
+    def test_updates_move_entries(self):
+        """Test that replacing and removing a record keeps every index consistent"""
+        self.index.add(dict(reservation("res1", "2025-06-15", customer_name="Sam"), reservation_time="12:00"))
+        self.assertEqual([r["id"] for r in self.index.between("rest1", "2025-06-14")], ["res2", "res3"])
+        self.assertEqual([r["id"] for r in self.index.customer(" sam ")], ["res3", "res1"])
+        self.index.discard("res4")
+        self.index.discard("res4")
+        self.assertEqual(self.index.on_date("2025-06-14", "rest2"), [])
+        self.assertEqual(sorted(self.index.by_date), ["2025-06-14", "2025-06-15"])
+
+
+class TestJsonReservationStore(unittest.TestCase):
+    """Test suite for the single-file backend"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "reservations.json")
+        self.store = JsonReservationStore(self.path)
+
+    def test_put_get_and_replace(self):
+        """Test that put inserts and then replaces by ID"""
+        self.assertIsNone(self.store.get("res1"))
+        self.assertTrue(self.store.put(reservation("res1", "2025-06-14")))
+        updated = self.store.get("res1")
+        updated["status"] = "cancelled"
+        self.assertEqual(self.store.get("res1")["status"], "confirmed")  # Reads are copies
+        self.store.put(updated)
+        with open(self.path) as f:
+            self.assertEqual([r["status"] for r in json.load(f)], ["cancelled"])
+
+    def test_compare_and_put(self):
+        """Test that a write based on a stale version is rejected"""
+        self.store.put(reservation("res1", "2025-06-14"))
+        first = self.store.get("res1")
+        second = self.store.get("res1")
+        saved = self.store.compare_and_put(dict(first, status="pending"), 0)
+        self.assertEqual(saved["version"], 1)
+        with self.assertRaises(VersionConflict):
+            self.store.compare_and_put(dict(second, status="cancelled"), 0)
+        with self.assertRaises(VersionConflict):
+            self.store.compare_and_put(reservation("res9", "2025-06-14"), 0)
+        self.assertEqual(self.store.get("res1")["status"], "pending")
+
+    def test_sees_changes_made_by_others(self):
+        """Test that the cache is reloaded when the file changes underneath"""
+        self.store.put(reservation("res1", "2025-06-14"))
+        save_json_file(self.path, [reservation("res2", "2025-06-14", customer_name="alex  DOE")])
+        self.assertIsNone(self.store.get("res1"))
+        self.assertEqual([r["id"] for r in self.store.by_customer("Alex Doe")], ["res2"])
+
+
+class TestPartitionedReservationStore(unittest.TestCase):
+    """Test suite for the monthly partitioned backend"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.store = PartitionedReservationStore(self.directory.name)
+        self.store.put_many([
+            reservation("res1", "2025-05-30"),
+            reservation("res2", "2025-06-14"),
+            reservation("res3", "2025-06-14", restaurant_id="rest2"),
+        ])
+
+    def test_records_are_split_by_month_with_a_manifest(self):
+        """Test the files written and the manifest counts"""
+        with open(os.path.join(self.directory.name, "manifest.json")) as f:
+            manifest = json.load(f)
+        self.assertEqual({month: entry["count"] for month, entry in manifest["partitions"].items()},
+                         {"2025-05": 1, "2025-06": 2})
+        self.assertEqual(sorted(os.listdir(os.path.join(self.directory.name, "partitions"))),
+                         ["2025-05.ids.json", "2025-05.json", "2025-06.ids.json", "2025-06.json"])
+        self.assertNotIn("ids", manifest)
+
+    def test_date_lookup_reads_only_its_partition(self):
+        """Test that looking up a date loads just that month"""
+        store = PartitionedReservationStore(self.directory.name)
+        with mock.patch("tools.reservation_store.load_json_file", wraps=store_load) as load:
+            self.assertEqual([r["id"] for r in store.for_date("2025-06-14", "rest1")], ["res2"])
+        loaded = [os.path.basename(call.args[0]) for call in load.call_args_list]
+        self.assertEqual(loaded, ["manifest.json", "2025-06.json"])
+
+    def test_id_lookup_reads_only_its_partition(self):
+        """Test that the ID files lead a lookup to one month's partition"""
+        store = PartitionedReservationStore(self.directory.name)
+        with mock.patch("tools.reservation_store.load_json_file", wraps=store_load) as load:
+            self.assertEqual(store.get("res2")["reservation_date"], "2025-06-14")
+            self.assertIsNone(store.get("res9"))
+            self.assertIsNone(store.get("res8"))
+        loaded = [os.path.basename(call.args[0]) for call in load.call_args_list]
+        self.assertEqual(loaded, ["manifest.json", "2025-06.ids.json", "2025-06.json", "2025-05.ids.json"])
+
+    def test_writes_rewrite_only_the_months_they_touch(self):
+        """Test that a booking rewrites its month and the manifest, whose size does not grow with bookings"""
+        manifest_path = os.path.join(self.directory.name, "manifest.json")
+        size = os.path.getsize(manifest_path)
+        with mock.patch("tools.reservation_store.save_json_file", wraps=save_json_file) as save:
+            self.store.put_many([reservation(f"new{i}", "2025-06-20") for i in range(20)])
+        saved = sorted(os.path.basename(call.args[0]) for call in save.call_args_list)
+        self.assertEqual(saved, ["2025-06.ids.json", "2025-06.json", "manifest.json"])
+        self.assertLessEqual(os.path.getsize(manifest_path), size + 1)
+        other = PartitionedReservationStore(self.directory.name)
+        self.assertEqual(other.get("new7")["reservation_date"], "2025-06-20")
+
+    def test_partitions_without_id_files(self):
+        """Test that partitions written before the ID files still find records and gain them"""
+        for month in ("2025-05", "2025-06"):
+            os.remove(os.path.join(self.directory.name, "partitions", f"{month}.ids.json"))
+        store = PartitionedReservationStore(self.directory.name)
+        self.assertEqual(store.get("res1")["reservation_date"], "2025-05-30")
+        store.remove_many(["res3"])
+        with open(os.path.join(self.directory.name, "partitions", "2025-06.ids.json")) as f:
+            self.assertEqual(json.load(f), ["res2"])
+
+    def test_changing_the_date_moves_the_record(self):
+        """Test that a reservation moved to another month leaves its old partition"""
+        moved = self.store.get("res1")
+        moved["reservation_date"] = "2025-07-01"
+        self.store.put(moved)
+        self.assertEqual(self.store.months(), ["2025-06", "2025-07"])
+        self.assertEqual(self.store.get("res1")["reservation_date"], "2025-07-01")
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "partitions", "2025-05.json")))
+
+    def test_archive_past_partitions(self):
+        """Test that archived months leave the hot set"""
+        self.assertEqual(self.store.archive_partitions("2025-06"), ["2025-05"])
+        self.assertEqual(self.store.months(), ["2025-06"])
+        self.assertIsNone(self.store.get("res1"))
+        self.assertTrue(os.path.exists(os.path.join(self.directory.name, "archive", "2025-05.json")))
+
+    def test_archive_is_undone_when_the_manifest_cannot_be_saved(self):
+        """Test that a failed manifest write leaves the partitions hot"""
+        with mock.patch("tools.reservation_store.save_json_file", return_value=False):
+            self.assertIsNone(self.store.archive_partitions("2025-06"))
+        self.assertEqual(self.store.months(), ["2025-05", "2025-06"])
+        self.assertEqual(self.store.get("res1")["id"], "res1")
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "archive", "2025-05.json")))
+
+    def test_migrate_from_json(self):
+        """Test copying the single file into partitions"""
+        path = os.path.join(self.directory.name, "reservations.json")
+        save_json_file(path, [reservation("res9", "2025-08-02")])
+        target = PartitionedReservationStore(os.path.join(self.directory.name, "migrated"))
+        self.assertEqual(migrate(JsonReservationStore(path), target), 1)
+        self.assertEqual(target.months(), ["2025-08"])
+
+
+def store_load(path):
+    """Load a JSON file the way the store does, for wrapping in a mock."""
+    with open(path) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    unittest.main()
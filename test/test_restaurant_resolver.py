@@ -0,0 +1,248 @@
+# test_restaurant_resolver.py - Test restaurant name resolution
+
+import unittest
+import sys
+import gc
+import json
+import os
+import random
+import tempfile
+import weakref
+from pathlib import Path
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent.name_matcher import AhoCorasickMatcher
+from agent.fuzzy_index import TrigramIndex, bounded_edit_distance
+from agent.restaurant_resolver import RestaurantResolver, _ResolverIndex
+from tools.catalog import RestaurantCatalog
+
+
+def make_restaurant(restaurant_id, name, location="Downtown", cuisine="Italian"):
+    """Build a minimal restaurant record for resolver tests"""
+    return {"id": restaurant_id, "name": name, "location": location, "cuisine": cuisine}
+
+
+class TestAhoCorasickMatcher(unittest.TestCase):
+    """Test suite for the multi-pattern name matcher"""
+
+    def test_find_all_reports_overlapping_matches(self):
+        """Test that every occurrence is found in one pass"""
+        matcher = AhoCorasickMatcher([("he", 1), ("she", 2), ("his", 3), ("hers", 4)])
+        matches = [(start, end, pattern) for start, end, pattern, _ in matcher.find_all("ushers")]
+        self.assertEqual(matches, [(1, 4, "she"), (2, 4, "he"), (2, 6, "hers")])
+
+    def test_longest_match_wins(self):
+        """Test that the longest mention is preferred over its prefixes"""
+        matcher = AhoCorasickMatcher([("silver thai", "a"), ("silver thai bar & grill", "b"), ("bar", "c")])
+        self.assertEqual(matcher.longest_match("book silver thai bar & grill at 7"), ("silver thai bar & grill", "b"))
+        self.assertEqual(matcher.longest_match("book silver thai tonight"), ("silver thai", "a"))
+        self.assertIsNone(matcher.longest_match("nothing to see"))
+
+    def test_patterns_added_after_search(self):
+        """Test that the automaton is rebuilt when patterns are added later"""
+        matcher = AhoCorasickMatcher([("blue garden", 1)])
+        self.assertIsNone(matcher.longest_match("royal palace"))
+        matcher.add("royal palace", 2)
+        self.assertEqual(matcher.longest_match("royal palace"), ("royal palace", 2))
+
+
+class TestTrigramIndex(unittest.TestCase):
+    """Test suite for the typo-tolerant trigram index"""
+
+    def test_bounded_edit_distance(self):
+        """Test distances, transpositions and the early cut-off"""
+        self.assertEqual(bounded_edit_distance("kitten", "sitting", 5), 3)
+        self.assertEqual(bounded_edit_distance("tabel", "table", 2), 1)
+        self.assertEqual(bounded_edit_distance("garden", "garden", 0), 0)
+        self.assertEqual(bounded_edit_distance("bistro", "steakhouse", 2), 3)
+
+    def test_search_ranks_closest_first(self):
+        """Test that misspelled and partial names find the right entry"""
+        index = TrigramIndex()
+        for name in ["silver table", "silver trattoria", "royal palace", "blue garden"]:
+            index.add(name, name)
+        self.assertEqual(index.search("silvr tabel")[0][0], "silver table")
+        self.assertEqual(index.search("royl palce")[0][0], "royal palace")
+        self.assertEqual(index.search("gardn")[0][0], "blue garden")
+        self.assertEqual(index.search("zzzz"), [])
+
+    def test_remove(self):
+        """Test that removed entries are no longer returned"""
+        index = TrigramIndex()
+        index.add("blue garden", "blue garden")
+        index.remove("blue garden")
+        self.assertEqual(index.search("blue garden"), [])
+        self.assertEqual(len(index), 0)
+
+
+class TestRestaurantResolver(unittest.TestCase):
+    """Test suite for RestaurantResolver"""
+
+    def setUp(self):
+        self.resolver = RestaurantResolver([
+            make_restaurant("rest001", "Silver Thai"),
+            make_restaurant("rest002", "Silver Thai Bar & Grill"),
+            make_restaurant("rest003", "Royal Palace"),
+            make_restaurant("rest004", "Golden Dragon Kitchen"),
+        ])
+
+    def test_resolve_exact_mention(self):
+        """Test resolving a name mentioned in a query"""
+        self.assertEqual(self.resolver.resolve_restaurant_from_query("Table at ROYAL PALACE please"),
+                         ("rest003", "Royal Palace"))
+
+    def test_resolve_prefers_longest_name(self):
+        """Test that a longer name wins over a name it contains"""
+        self.assertEqual(self.resolver.resolve_restaurant_from_query("Is Silver Thai Bar & Grill open?"),
+                         ("rest002", "Silver Thai Bar & Grill"))
+
+    def test_resolve_by_word_overlap(self):
+        """Test the word-overlap fallback"""
+        self.assertEqual(self.resolver.resolve_restaurant_from_query("golden dragon for four"),
+                         ("rest004", "Golden Dragon Kitchen"))
+
+    def test_resolve_id_from_misspelled_name(self):
+        """Test that typos are resolved locally with a confidence score"""
+        self.assertEqual(self.resolver.resolve_id_from_name("Royl Palce"), "rest003")
+        restaurant_id, name, confidence = self.resolver.match_name("golden dragn kitchen")
+        self.assertEqual((restaurant_id, name), ("rest004", "Golden Dragon Kitchen"))
+        self.assertGreaterEqual(confidence, 0.75)
+
+    def test_ambiguous_fuzzy_match_is_rejected(self):
+        """Test that a fragment shared by several names does not resolve"""
+        restaurant_id, _, _ = self.resolver.match_name("silver")
+        self.assertIsNone(restaurant_id)
+
+    def test_duplicate_names_keep_every_id(self):
+        """Test that restaurants sharing a name are all indexed"""
+        resolver = RestaurantResolver([
+            make_restaurant("rest010", "Rustic Trattoria", location="Downtown"),
+            make_restaurant("rest011", "Rustic Trattoria", location="Uptown"),
+        ])
+        self.assertEqual(resolver.name_to_ids_map["rustic trattoria"], ["rest010", "rest011"])
+
+    def test_duplicate_names_disambiguated_by_location(self):
+        """Test that a location in the query picks between same-named restaurants"""
+        resolver = RestaurantResolver([
+            make_restaurant("rest010", "Rustic Trattoria", location="Downtown"),
+            make_restaurant("rest011", "Rustic Trattoria", location="Uptown"),
+        ])
+        self.assertEqual(resolver.resolve_restaurant_from_query("Rustic Trattoria in uptown for 2"),
+                         ("rest011", "Rustic Trattoria"))
+        self.assertEqual(resolver.resolve_id_from_name("Rustic Trattoria", query="the downtown one"), "rest010")
+
+    def test_duplicate_names_disambiguated_by_search_results(self):
+        """Test that the last search results break the tie"""
+        resolver = RestaurantResolver([
+            make_restaurant("rest010", "Rustic Trattoria", location="Downtown"),
+            make_restaurant("rest011", "Rustic Trattoria", location="Uptown"),
+        ])
+        self.assertEqual(resolver.resolve_restaurant_from_query("book rustic trattoria", context_ids=["rest011"]),
+                         ("rest011", "Rustic Trattoria"))
+
+    def test_unresolved_duplicate_is_not_guessed(self):
+        """Test that an ambiguous name without signals resolves to nothing"""
+        resolver = RestaurantResolver([
+            make_restaurant("rest010", "Rustic Trattoria", location="Downtown"),
+            make_restaurant("rest011", "Rustic Trattoria", location="Uptown"),
+        ])
+        self.assertEqual(resolver.resolve_restaurant_from_query("book rustic trattoria"), (None, None))
+        self.assertIsNone(resolver.resolve_id_from_name("rustic trattoria"))
+
+    def test_no_match(self):
+        """Test that unrelated queries resolve to nothing"""
+        self.assertEqual(self.resolver.resolve_restaurant_from_query("find me a restaurant"), (None, None))
+
+
+class TestIncrementalResolverUpdates(unittest.TestCase):
+    """Test suite for applying catalog changes to the resolver"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.catalog_file = os.path.join(self.temp_dir.name, "restaurants.json")
+        with open(self.catalog_file, 'w') as f:
+            json.dump([
+                make_restaurant("rest001", "Royal Palace"),
+                make_restaurant("rest002", "Blue Garden", location="Uptown"),
+            ], f)
+        self.catalog = RestaurantCatalog(self.catalog_file)
+        self.resolver = RestaurantResolver(catalog=self.catalog)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_add_rename_and_remove(self):
+        """Test that catalog edits show up without rebuilding the resolver"""
+        self.catalog.upsert_restaurant(make_restaurant("rest003", "Silver Table"))
+        self.assertEqual(self.resolver.resolve_restaurant_from_query("book silver table"), ("rest003", "Silver Table"))
+
+        self.catalog.upsert_restaurant(make_restaurant("rest001", "Imperial Palace"))
+        self.assertEqual(self.resolver.resolve_restaurant_from_query("book royal palace"), (None, None))
+        self.assertEqual(self.resolver.resolve_id_from_name("imperial palace"), "rest001")
+
+        self.catalog.remove_restaurant("rest002")
+        self.assertIsNone(self.resolver.resolve_id_from_name("blue garden"))
+        self.assertEqual(self.resolver.catalog_version, self.catalog.version)
+
+    def test_readers_keep_their_snapshot(self):
+        """Test that an index taken before an update is left untouched"""
+        before = self.resolver._index
+        self.catalog.upsert_restaurant(make_restaurant("rest002", "Green Garden"))
+        self.assertIn("blue garden", before.name_to_ids_map)
+        self.assertEqual(before.longest_name_in("blue garden please"), "blue garden")
+        self.assertIsNone(self.resolver._index.longest_name_in("blue garden please"))
+
+    def test_outside_file_edit_is_picked_up(self):
+        """Test that poll() notices another process editing the file"""
+        with open(self.catalog_file, 'w') as f:
+            json.dump([make_restaurant("rest001", "Royal Palace"), make_restaurant("rest009", "Vintage House")], f)
+        os.utime(self.catalog_file, ns=(0, 0))
+        self.catalog.poll(force=True)
+        self.assertEqual(self.resolver.resolve_id_from_name("vintage house"), "rest009")
+        self.assertIsNone(self.resolver.resolve_id_from_name("blue garden"))
+
+    def test_dropped_resolvers_are_not_kept_alive(self):
+        """Test that a resolver nobody uses any more is freed and no longer updated"""
+        resolver = weakref.ref(RestaurantResolver(catalog=self.catalog))
+        gc.collect()
+        self.assertIsNone(resolver())
+        self.catalog.upsert_restaurant(make_restaurant("rest003", "Silver Table"))
+        self.assertEqual(self.resolver.resolve_id_from_name("silver table"), "rest003")
+        self.assertEqual(len(self.catalog._subscribers), 1)
+
+        # Plain functions and explicit unsubscribing still work
+        deltas = []
+        self.catalog.subscribe(deltas.append)
+        self.catalog.upsert_restaurant(make_restaurant("rest004", "Grill House"))
+        self.catalog.unsubscribe(deltas.append)
+        self.catalog.remove_restaurant("rest004")
+        self.assertEqual([delta["added"][0]["id"] for delta in deltas], ["rest004"])
+
+    def test_incremental_matches_full_rebuild(self):
+        """Test that a random sequence of deltas gives the same indexes as a rebuild"""
+        rng = random.Random(7)
+        words = ["Royal", "Blue", "Garden", "Palace", "Table", "Silver", "Grill", "House"]
+        for step in range(200):
+            restaurant_id = f"rest{rng.randrange(40):03d}"
+            if rng.random() < 0.3:
+                self.catalog.remove_restaurant(restaurant_id)
+            else:
+                name = f"{rng.choice(words)} {rng.choice(words)}"
+                self.catalog.upsert_restaurant(make_restaurant(restaurant_id, name))
+
+        rebuilt = _ResolverIndex.build(self.catalog.restaurants())
+        index = self.resolver._index
+        self.assertEqual({k: sorted(v) for k, v in index.name_to_ids_map.items()},
+                         {k: sorted(v) for k, v in rebuilt.name_to_ids_map.items()})
+        self.assertEqual(index.id_to_restaurant, rebuilt.id_to_restaurant)
+        self.assertEqual({k: sorted(r["id"] for r in v) for k, v in index.word_to_restaurants_map.items()},
+                         {k: sorted(r["id"] for r in v) for k, v in rebuilt.word_to_restaurants_map.items()})
+        self.assertEqual(len(index.fuzzy_index), len(rebuilt.fuzzy_index))
+        for name in rebuilt.name_to_ids_map:
+            self.assertEqual(index.longest_name_in(f"a table at {name}"), name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+# test_shared_resources.py - Test that heavy resources are shared per process and services kept per session
+
+import unittest
+import sys
+import importlib.util
+from pathlib import Path
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent.llm_service import LLMService, create_http_session
+from agent.restaurant_resolver import RestaurantResolver
+
+APP_FILE = Path(__file__).parent.parent / "app.py"
+
+
+class TestSessionServices(unittest.TestCase):
+    """Test suite for LLMService instances built on shared resources"""
+
+    def test_sessions_share_resources_but_not_state(self):
+        """Test that two sessions use one resolver and HTTP pool but keep their own history"""
+        resolver, http_session = RestaurantResolver([]), create_http_session()
+        first = LLMService(restaurant_resolver=resolver, http_session=http_session)
+        second = LLMService(restaurant_resolver=resolver, http_session=http_session)
+
+        self.assertIs(first.restaurant_resolver, second.restaurant_resolver)
+        self.assertIs(first.http, second.http)
+        first.conversation_history.append({"role": "user", "content": "Table for two"})
+        self.assertEqual(second.conversation_history, [])
+        self.assertIsNot(first.context_manager, second.context_manager)
+
+
+@unittest.skipUnless(importlib.util.find_spec("streamlit"), "streamlit is not installed")
+class TestAppSessions(unittest.TestCase):
+    """Test suite for the Streamlit app's per-session service"""
+
+    def run_app(self):
+        from streamlit.testing.v1 import AppTest
+        app = AppTest.from_file(str(APP_FILE), default_timeout=30)
+        app.run()
+        self.assertFalse(app.exception)
+        return app
+
+    def test_shared_resources_are_built_once_per_process(self):
+        """Test that sessions get their own service on top of the same cached resources"""
+        first, second = self.run_app(), self.run_app()
+        first_service, second_service = first.session_state["ai_service"], second.session_state["ai_service"]
+
+        self.assertIsNot(first_service, second_service)
+        self.assertIs(first_service.restaurant_resolver, second_service.restaurant_resolver)
+        self.assertIs(first_service.http, second_service.http)
+
+        # Reruns of a session keep its service
+        first.run()
+        self.assertIs(first.session_state["ai_service"], first_service)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+# test_singleflight.py - Test coalescing of identical concurrent calls
+
+import unittest
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent.llm_service import LLMService
+from agent.restaurant_resolver import RestaurantResolver
+from utils.singleflight import SingleFlight, make_key
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test suite for the single-flight layer"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test that overlapping calls with the same key run once"""
+        flight = SingleFlight("test")
+        executions = []
+        started = threading.Event()
+
+        def slow_lookup():
+            executions.append(1)
+            started.set()
+            time.sleep(0.1)
+            return {"cuisines": ["Italian"]}
+
+        results = []
+        key = make_key("get_cuisines", {})
+
+        def caller():
+            results.append(flight.do(key, slow_lookup))
+
+        leader = threading.Thread(target=caller)
+        leader.start()
+        started.wait()
+        followers = [threading.Thread(target=caller) for _ in range(4)]
+        for t in followers:
+            t.start()
+        for t in [leader] + followers:
+            t.join()
+
+        self.assertEqual(len(executions), 1)
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(r == {"cuisines": ["Italian"]} for r in results))
+        # Followers get their own copy of the shared result
+        self.assertEqual(len({id(r) for r in results}), 5)
+
+        stats = flight.stats()
+        self.assertEqual(stats["executions"], 1)
+        self.assertEqual(stats["coalesced"], 4)
+        self.assertEqual(stats["in_flight"], 0)
+
+    def test_sequential_calls_are_not_cached(self):
+        """Test that calls which do not overlap each execute"""
+        flight = SingleFlight("test")
+        counter = []
+        flight.do("k", lambda: counter.append(1))
+        flight.do("k", lambda: counter.append(1))
+        self.assertEqual(len(counter), 2)
+        self.assertEqual(flight.stats()["coalesced"], 0)
+
+    def test_error_is_propagated(self):
+        """Test that the leader's exception is raised to the caller"""
+        flight = SingleFlight("test")
+
+        def failing():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            flight.do("k", failing)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_make_key_ignores_argument_order(self):
+        """Test that keys are independent of dict ordering"""
+        self.assertEqual(
+            make_key("recommend_restaurants", {"cuisine": "Thai", "party_size": 2}),
+            make_key("recommend_restaurants", {"party_size": 2, "cuisine": "Thai"})
+        )
+
+
+
+class TestCompletionCoalescing(unittest.TestCase):
+    """Test suite for sharing chat completions between sessions"""
+
+    def concurrent_sends(self, payload):
+        """Send the same payload from two sessions at once and count the API calls."""
+        barrier = threading.Barrier(2)
+        sends = []
+
+        def send(url, payload):
+            sends.append(payload)
+            time.sleep(0.1)
+            return {"choices": [{"message": {"content": "Hello"}}]}
+
+        def session():
+            service = LLMService(restaurant_resolver=RestaurantResolver([]))
+            with mock.patch.object(service, "_send_api_request", side_effect=send):
+                barrier.wait()
+                service.make_api_request("https://api.example.test", payload)
+
+        threads = [threading.Thread(target=session) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return len(sends)
+
+    def test_sampled_completions_are_not_shared(self):
+        """Test that each session gets its own sampled completion"""
+        self.assertEqual(self.concurrent_sends({"messages": [{"role": "user", "content": "Hi"}]}), 2)
+
+    def test_deterministic_completions_are_shared(self):
+        """Test that identical temperature 0 requests make one call"""
+        payload = {"messages": [{"role": "user", "content": "Hi"}], "temperature": 0}
+        self.assertEqual(self.concurrent_sends(payload), 1)
+
+if __name__ == "__main__":
+    unittest.main()
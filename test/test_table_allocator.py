@@ -0,0 +1,62 @@
+# test_table_allocator.py - Test the table assignment solver
+
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.table_allocator import allocate, can_seat, main_table_type, table_capacities
+
+CAPACITIES = {"small": 2, "medium": 4, "large": 8}
+
+
+class TestTableAllocator(unittest.TestCase):
+    """Test suite for choosing and combining tables"""
+
+    def test_single_table_of_the_natural_type(self):
+        """Test that a party that fits one table gets the smallest that fits"""
+        free = {"small": 3, "medium": 3, "large": 3}
+        self.assertEqual(allocate(2, free, CAPACITIES), {"small": 1})
+        self.assertEqual(allocate(3, free, CAPACITIES), {"medium": 1})
+        self.assertEqual(allocate(7, free, CAPACITIES), {"large": 1})
+
+    def test_smaller_tables_are_combined_but_bigger_never_used(self):
+        """Test that a full table type is replaced by smaller tables, not bigger ones"""
+        self.assertEqual(allocate(6, {"small": 2, "medium": 1, "large": 0}, CAPACITIES), {"small": 1, "medium": 1})
+        self.assertEqual(allocate(4, {"small": 2, "medium": 0, "large": 3}, CAPACITIES), {"small": 2})
+        self.assertIsNone(allocate(2, {"small": 0, "medium": 3, "large": 3}, CAPACITIES))
+
+    def test_party_bigger_than_every_table(self):
+        """Test that the fewest tables with the fewest empty seats win"""
+        free = {"small": 3, "medium": 3, "large": 3}
+        self.assertEqual(allocate(10, free, CAPACITIES), {"small": 1, "large": 1})
+        self.assertEqual(allocate(16, free, CAPACITIES), {"large": 2})
+        self.assertEqual(main_table_type({"small": 1, "large": 1}, CAPACITIES), "large")
+
+    def test_combined_tables_are_limited(self):
+        """Test that no more than MAX_COMBINED_TABLES tables are pushed together"""
+        free = {"small": 3, "medium": 3, "large": 3}
+        self.assertIsNone(allocate(25, free, CAPACITIES))
+        self.assertTrue(can_seat(24, free, CAPACITIES))
+        with mock.patch("tools.table_allocator.MAX_COMBINED_TABLES", 2):
+            self.assertFalse(can_seat(20, {"small": 3, "medium": 3, "large": 4}, CAPACITIES))
+
+    def test_changing_the_limit_is_not_hidden_by_the_cache(self):
+        """Test that an answer cached under one MAX_COMBINED_TABLES is not reused under another"""
+        free = {"small": 1, "large": 2}
+        self.assertTrue(can_seat(18, free, CAPACITIES))
+        with mock.patch("tools.table_allocator.MAX_COMBINED_TABLES", 2):
+            self.assertFalse(can_seat(18, free, CAPACITIES))
+        self.assertTrue(can_seat(18, free, CAPACITIES))
+
+    def test_table_capacities(self):
+        """Test reading the seats per table from a restaurant record"""
+        restaurant = {"tables": {"small": {"count": 4, "capacity": 2}, "large": {"count": 1, "capacity": 6}}}
+        self.assertEqual(table_capacities(restaurant), {"small": 2, "large": 6})
+
+
+if __name__ == "__main__":
+    unittest.main()
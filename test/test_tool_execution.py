@@ -0,0 +1,83 @@
+# test_tool_execution.py - Test tool timeouts on the worker pool
+
+import unittest
+import sys
+import contextvars
+import threading
+import time
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from tools.registry import get_tool
+from agent.llm_service import LLMService, TOOL_LATE_RESULTS, TOOL_TIMEOUTS
+from agent.restaurant_resolver import RestaurantResolver
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+class TestToolTimeouts(unittest.TestCase):
+    """Test suite for per-tool deadlines"""
+
+    def setUp(self):
+        self.service = LLMService(restaurant_resolver=RestaurantResolver([]))
+        self.release = threading.Event()
+        self.finished = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def _blocking_tool(self, result):
+        def blocked(**kwargs):
+            self.release.wait(5)
+            self.finished.set()
+            return result
+        return blocked
+
+    def test_slow_tool_times_out_with_structured_error(self):
+        """Test that the caller gets an error once the deadline passes"""
+        tool = get_tool("get_reservation")
+        with mock.patch.object(tool, "timeout", 0.05), \
+                mock.patch.object(tool, "function", self._blocking_tool({"success": True})):
+            started = time.monotonic()
+            result = self.service._execute_tool("get_reservation", {"reservation_id": "res1"})
+            elapsed = time.monotonic() - started
+
+        self.assertTrue(result["timed_out"])
+        self.assertIn("safe to try again", result["error"])
+        self.assertLess(elapsed, 1)
+
+    def test_late_result_is_discarded(self):
+        """Test that a write finishing after its deadline is counted and dropped"""
+        tool = get_tool("cancel_reservation")
+        late_before = TOOL_LATE_RESULTS.value(tool="cancel_reservation", outcome="completed")
+        timeouts_before = TOOL_TIMEOUTS.value(tool="cancel_reservation")
+        with mock.patch.object(tool, "timeout", 0.05), \
+                mock.patch.object(tool, "function", self._blocking_tool({"success": True})):
+            result = self.service._execute_tool("cancel_reservation", {"reservation_id": "res1"})
+            self.assertIn("check the reservation", result["error"])
+            self.release.set()
+            self.assertTrue(self.finished.wait(2))
+            # The done callback runs right after the function returns
+            deadline = time.monotonic() + 2
+            while TOOL_LATE_RESULTS.value(tool="cancel_reservation", outcome="completed") == late_before:
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.01)
+
+        self.assertEqual(TOOL_TIMEOUTS.value(tool="cancel_reservation"), timeouts_before + 1)
+
+    def test_tool_sees_the_callers_context(self):
+        """Test that context variables are carried into the worker thread"""
+        seen = []
+        tool = get_tool("get_cuisines")
+        token = request_id.set("turn-42")
+        try:
+            with mock.patch.object(tool, "function", lambda: seen.append(request_id.get()) or []):
+                self.service._execute_tool("get_cuisines", {})
+        finally:
+            request_id.reset(token)
+        self.assertEqual(seen, ["turn-42"])
+
+
+if __name__ == "__main__":
+    unittest.main()
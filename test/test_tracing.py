@@ -0,0 +1,111 @@
+# test_tracing.py - Test trace spans and their Chrome trace conversion
+
+import unittest
+import sys
+import os
+import json
+import contextvars
+import tempfile
+import threading
+from pathlib import Path
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.tracing import Tracer, NOOP_SPAN, current_span, to_chrome_trace
+
+
+class TestTracer(unittest.TestCase):
+    """Test suite for Tracer"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "traces.jsonl")
+        self.tracer = Tracer(self.path)
+
+    def spans(self):
+        """Read the written spans, keyed by name."""
+        with open(self.path) as f:
+            return {record["name"]: record for record in map(json.loads, f)}
+
+    def test_spans_nest_under_the_current_span(self):
+        """Test parent IDs, attributes, events and the trace written when the root ends"""
+        with self.tracer.start_trace("turn", trace_id="t1", query_chars=5):
+            with self.tracer.span("llm_request") as request:
+                request.set_attribute("tokens", 12)
+                self.assertIs(current_span(), request)
+                with self.tracer.span("http_attempt", attempt=1) as attempt:
+                    attempt.add_event("retry_backoff", delay_seconds=0.5)
+            self.assertFalse(os.path.exists(self.path))
+
+        spans = self.spans()
+        self.assertEqual({record["trace_id"] for record in spans.values()}, {"t1"})
+        self.assertIsNone(spans["turn"]["parent_id"])
+        self.assertEqual(spans["llm_request"]["parent_id"], spans["turn"]["span_id"])
+        self.assertEqual(spans["http_attempt"]["parent_id"], spans["llm_request"]["span_id"])
+        self.assertEqual(spans["llm_request"]["attributes"], {"tokens": 12})
+        self.assertEqual(spans["http_attempt"]["events"][0]["attributes"], {"delay_seconds": 0.5})
+        self.assertIs(current_span(), NOOP_SPAN)
+
+    def test_context_is_carried_into_other_threads(self):
+        """Test that a span opened in a copied context has the caller's span as parent"""
+        with self.tracer.start_trace("turn") as root:
+            context = contextvars.copy_context()
+
+            def tool():
+                with self.tracer.span("tool"):
+                    pass
+
+            thread = threading.Thread(target=context.run, args=(tool,))
+            thread.start()
+            thread.join()
+            # A thread without the copied context is outside the trace
+            thread = threading.Thread(target=tool)
+            thread.start()
+            thread.join()
+
+        spans = self.spans()
+        self.assertEqual(len(spans), 2)
+        self.assertEqual(spans["tool"]["parent_id"], root.span_id)
+        self.assertNotEqual(spans["tool"]["tid"], spans["turn"]["tid"])
+
+    def test_errors_mark_the_span(self):
+        """Test that an exception sets the span status and still writes the trace"""
+        with self.assertRaises(ValueError):
+            with self.tracer.start_trace("turn"):
+                with self.tracer.span("tool"):
+                    raise ValueError("bad input")
+        spans = self.spans()
+        self.assertEqual(spans["tool"]["status"], "error")
+        self.assertEqual(spans["tool"]["attributes"]["error"], "ValueError: bad input")
+
+    def test_disabled_tracer_does_nothing(self):
+        """Test that no file is written without a trace file"""
+        tracer = Tracer(None)
+        with tracer.start_trace("turn") as root, tracer.span("tool") as child:
+            self.assertIs(root, NOOP_SPAN)
+            self.assertIs(child, NOOP_SPAN)
+
+    def test_chrome_trace_conversion(self):
+        """Test that spans become complete events and span events become instant events"""
+        with self.tracer.start_trace("turn", trace_id="t1"):
+            with self.tracer.span("tool", name_len=3) as tool:
+                tool.add_event("cache_hit")
+        output = os.path.join(self.directory.name, "chrome.json")
+        self.assertEqual(to_chrome_trace(self.path, output), 2)
+
+        with open(output) as f:
+            events = json.load(f)["traceEvents"]
+        spans = self.spans()
+        complete = {event["name"]: event for event in events if event["ph"] == "X"}
+        self.assertEqual(complete["tool"]["ts"], spans["tool"]["start_us"])
+        self.assertEqual(complete["tool"]["dur"], spans["tool"]["duration_us"])
+        self.assertEqual(complete["tool"]["args"]["parent_id"], spans["turn"]["span_id"])
+        self.assertEqual(complete["tool"]["args"]["name_len"], 3)
+        instant = [event for event in events if event["ph"] == "i"]
+        self.assertEqual([(event["name"], event["cat"]) for event in instant], [("cache_hit", "t1")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# test_validation.py - Test tool argument validation compiled from the schemas
+
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from agent.tool_definitions import TOOL_DEFINITIONS
+from agent.validation import compile_validators, infer_format, validation_error
+from agent.llm_service import LLMService
+from agent.restaurant_resolver import RestaurantResolver
+
+
+class TestArgumentValidator(unittest.TestCase):
+    """Test suite for the compiled validators"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.validators = compile_validators(TOOL_DEFINITIONS)
+
+    def test_every_tool_has_a_validator(self):
+        """Test that a validator is compiled for each definition"""
+        names = {tool["function"]["name"] for tool in TOOL_DEFINITIONS}
+        self.assertEqual(set(self.validators), names)
+
+    def test_formats_are_inferred_from_descriptions(self):
+        """Test the YYYY-MM-DD / HH:MM hints"""
+        self.assertEqual(infer_format({"description": "Date for reservation (YYYY-MM-DD format)"}), "date")
+        self.assertEqual(infer_format({"description": "Time (HH:MM format, 24-hour)"}), "time")
+        self.assertIsNone(infer_format({"description": "Preferred area"}))
+
+    def test_valid_arguments_are_coerced(self):
+        """Test that string numbers and unpadded values are cleaned up"""
+        clean, errors = self.validators["check_availability"].validate({
+            "restaurant_id": "rest1", "date": "2025-6-5", "time": "7:30", "party_size": "4"})
+        self.assertEqual(errors, [])
+        self.assertEqual(clean, {"restaurant_id": "rest1", "date": "2025-06-05", "time": "07:30", "party_size": 4})
+
+    def test_errors_are_structured(self):
+        """Test that every problem is reported with its parameter and kind"""
+        clean, errors = self.validators["check_availability"].validate({
+            "restaurant_id": "rest1", "date": "2025-02-30", "time": "25:00", "party_size": "a few"})
+        self.assertEqual({(e["parameter"], e["error"]) for e in errors},
+                         {("date", "format"), ("time", "format"), ("party_size", "type")})
+
+        _, errors = self.validators["create_reservation"].validate({"restaurant_id": "rest1", "party_size": 0})
+        self.assertEqual({(e["parameter"], e["error"]) for e in errors}, {
+            ("customer_name", "missing"), ("reservation_date", "missing"),
+            ("reservation_time", "missing"), ("party_size", "range")})
+
+    def test_optional_nulls_and_unknown_parameters_are_dropped(self):
+        """Test that null optionals and undeclared parameters do not reach the tool"""
+        clean, errors = self.validators["recommend_restaurants"].validate({
+            "cuisine": "Italian", "location": None, "mood": "happy"})
+        self.assertEqual(errors, [])
+        self.assertEqual(clean, {"cuisine": "Italian"})
+
+    def test_enum_is_case_insensitive(self):
+        """Test that enum values are matched regardless of case"""
+        clean, errors = self.validators["modify_reservation"].validate({"reservation_id": "res1", "status": "Cancelled"})
+        self.assertEqual(errors, [])
+        self.assertEqual(clean["status"], "cancelled")
+
+    def test_validation_error_response(self):
+        """Test the tool response built from the errors"""
+        _, errors = self.validators["get_reservation"].validate({})
+        response = validation_error("get_reservation", errors)
+        self.assertIn("reservation_id is required", response["error"])
+        self.assertEqual(response["invalid_arguments"], errors)
+
+
+class TestExecuteToolValidation(unittest.TestCase):
+    """Test suite for validation inside _execute_tool"""
+
+    def setUp(self):
+        self.service = LLMService(restaurant_resolver=RestaurantResolver([]))
+
+    def test_invalid_call_never_reaches_the_tool(self):
+        """Test that a rejected call does not run the tool"""
+        with mock.patch.object(self.service, "_dispatch_tool") as dispatch:
+            response = self.service._execute_tool("check_availability", {"restaurant_id": "rest1", "date": "soon"})
+        dispatch.assert_not_called()
+        self.assertIn("invalid_arguments", response)
+
+    def test_tool_receives_clean_arguments(self):
+        """Test that the tool is called with the coerced arguments"""
+        with mock.patch.object(self.service, "_dispatch_tool", return_value={"available": True}) as dispatch:
+            self.service._execute_tool("check_availability", {
+                "restaurant_id": "rest1", "date": "2025-06-14", "time": "19:00", "party_size": "2"})
+        dispatch.assert_called_once_with("check_availability", {
+            "restaurant_id": "rest1", "date": "2025-06-14", "time": "19:00", "party_size": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+# test_write_ahead_log.py - Test the group-commit write-ahead log and write-behind store
+
+import unittest
+import sys
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path to import required modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.write_ahead_log import WriteAheadLog
+from utils.helpers import load_json_file
+from tools.reservation_store import JsonReservationStore
+
+
+def reservation(reservation_id, date="2030-06-14"):
+    """Build a minimal reservation record."""
+    return {"id": reservation_id, "restaurant_id": "rest1", "customer_name": "Alex Doe", "party_size": 2,
+            "reservation_date": date, "reservation_time": "19:00", "status": "confirmed"}
+
+
+class TestWriteAheadLog(unittest.TestCase):
+    """Test suite for WriteAheadLog"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "test.wal")
+
+    def test_concurrent_commits_share_fsyncs(self):
+        """Test that writers committing together need fewer fsyncs than entries"""
+        log = WriteAheadLog(self.path, window=0.01)
+        self.addCleanup(log.close)
+        barrier = threading.Barrier(16)
+
+        def write(i):
+            barrier.wait()
+            log.commit(log.append({"n": i}))
+
+        with mock.patch("utils.write_ahead_log.os.fsync", wraps=os.fsync) as fsync:
+            threads = [threading.Thread(target=write, args=(i,)) for i in range(16)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertLess(fsync.call_count, 16)
+        self.assertEqual(sorted(entry["n"] for entry in log.read()), list(range(16)))
+
+    def test_torn_last_entry_is_ignored(self):
+        """Test that a partly written last line does not stop replay"""
+        with open(self.path, "w") as f:
+            f.write('{"n": 1}\n{"n": 2}\n{"n": ')
+        self.assertEqual(WriteAheadLog(self.path).read(), [{"n": 1}, {"n": 2}])
+
+    def test_append_after_a_torn_entry(self):
+        """Test that an entry appended after a crash mid-append can be read back"""
+        with open(self.path, "w") as f:
+            f.write('{"n": 1}\n{"n": ')
+        log = WriteAheadLog(self.path)
+        self.addCleanup(log.close)
+        log.commit(log.append({"n": 3}))
+        log.commit(log.append({"n": 4}))
+        self.assertEqual(log.read(), [{"n": 1}, {"n": 3}, {"n": 4}])
+
+
+class TestWriteBehindStore(unittest.TestCase):
+    """Test suite for the json store with group commit"""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "reservations.json")
+        self.store = JsonReservationStore(self.path, group_commit_ms=1)
+        self.addCleanup(self.store.close)
+
+    def test_writes_go_to_the_log_and_replay_on_load(self):
+        """Test that acknowledged writes survive without the file being rewritten"""
+        self.store.put(reservation("res1"))
+        with self.store.locked():
+            changed = self.store.get("res1")
+            changed["status"] = "cancelled"
+            self.store.put(changed)
+        self.assertFalse(os.path.exists(self.path))
+
+        reopened = JsonReservationStore(self.path, group_commit_ms=1)
+        self.addCleanup(reopened.close)
+        self.assertEqual(reopened.get("res1")["status"], "cancelled")
+
+    def test_torn_tail_append_and_reload(self):
+        """Test that bookings made after a torn log entry survive a reload"""
+        self.store.put(reservation("res1"))
+        with open(self.path + ".wal", "ab") as f:
+            f.write(b'{"op":"put","rec')
+        self.store.put(reservation("res2"))
+        self.store.put(reservation("res3"))
+
+        reopened = JsonReservationStore(self.path, group_commit_ms=1)
+        self.addCleanup(reopened.close)
+        self.assertEqual(sorted(r["id"] for r in reopened.all()), ["res1", "res2", "res3"])
+        self.assertTrue(reopened.flush())
+
+    def test_flush_folds_the_log_into_the_file(self):
+        """Test that flushing writes the file and empties the log"""
+        self.store.put_many([reservation("res1"), reservation("res2")])
+        self.assertTrue(self.store.flush())
+        self.assertEqual([r["id"] for r in load_json_file(self.path)], ["res1", "res2"])
+        self.assertEqual(os.path.getsize(self.path + ".wal"), 0)
+        self.assertEqual(len(JsonReservationStore(self.path).all()), 2)
+
+    def test_log_is_checkpointed_when_large(self):
+        """Test that the log is folded in once it passes the size limit"""
+        with mock.patch("tools.reservation_store.RESERVATION_WAL_CHECKPOINT_BYTES", 500):
+            for i in range(5):
+                self.store.put(reservation(f"res{i}"))
+        self.assertTrue(os.path.exists(self.path))
+        self.assertLess(os.path.getsize(self.path + ".wal"), 500)
+        self.assertLess(len(JsonReservationStore(self.path).all()), 5)  # The file alone lags the log
+        reopened = JsonReservationStore(self.path, group_commit_ms=1)
+        self.addCleanup(reopened.close)
+        self.assertEqual(len(reopened.all()), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
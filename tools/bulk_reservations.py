@@ -0,0 +1,236 @@
+# tools/bulk_reservations.py - Batch reservation import and export
+
+import argparse
+import csv
+import datetime
+import json
+import logging
+import os
+from contextlib import nullcontext
+from pathlib import Path
+import sys
+
+# Add parent directory to path so we can import from other modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import RESTAURANTS_FILE
+from utils.helpers import load_json_file
+from utils.file_lock import LockTimeout
+from agent.validation import ArgumentValidator, validation_error
+from tools.registry import get_tool
+from tools.restaurant_tools import reservation_key, new_reservation_record, seating_error
+from tools.reservation_store import get_store
+from tools.occupancy import Occupancy
+from tools.table_allocator import allocate, main_table_type, table_capacities
+
+logger = logging.getLogger('bulk_reservations')
+
+# Columns written by export_reservations() for CSV files, in order
+EXPORT_FIELDS = [
+    "id", "restaurant_id", "restaurant_name", "customer_name", "party_size",
+    "reservation_date", "reservation_time", "table_type", "status",
+    "customer_email", "customer_phone", "special_requests", "created_at", "updated_at"
+]
+
+
+def _file_format(path, file_format=None):
+    file_format = file_format or os.path.splitext(str(path))[1].lstrip(".").lower()
+    if file_format == "json":
+        file_format = "jsonl"
+    if file_format not in ("csv", "jsonl"):
+        raise ValueError(f"Unsupported file format for {path}; use .csv or .jsonl")
+    return file_format
+
+
+def read_rows(path, file_format=None):
+    """
+    Stream booking rows from a CSV (with a header row) or JSON Lines file.
+
+    Columns are named like the create_reservation parameters. A JSON line
+    that cannot be parsed is yielded as an error instead of stopping the read.
+
+    Args:
+        path (str): File to read
+        file_format (str, optional): "csv" or "jsonl"; defaults to the extension
+
+    Yields:
+        dict: One row; unparseable lines are {"_error": message}
+    """
+    file_format = _file_format(path, file_format)
+    with open(path, newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"_error": f"Invalid JSON: {e.msg}"}
+                continue
+            yield row if isinstance(row, dict) else {"_error": "Each line must be a JSON object"}
+
+
+def create_reservations(rows, dry_run=False, store=None):
+    """
+    Create many reservations with one availability pass and a single write.
+
+    Every row is validated like a create_reservation call and checked
+    against the restaurant hours, without holding the store lock; the lock
+    is then held only to check the rows against the tables already taken,
+    including those taken by earlier rows of the same batch, and to save.
+    A dry run takes no lock. Rows that fail are
+    reported and skipped; the rest are saved together. Rows matching an
+    existing booking are skipped as duplicates, so a partly failed import
+    can simply be run again.
+
+    Args:
+        rows (iterable): Dicts of create_reservation arguments
+        dry_run (bool): Check the rows without saving anything
+        store (ReservationStore, optional): Store to write; defaults to get_store()
+
+    Returns:
+        dict: "success", the number of rows "created" and "duplicates", and
+            "errors" as a list of {"row": row number (from 1), "error": message}
+    """
+    store = store or get_store()
+    restaurants = {restaurant["id"]: restaurant for restaurant in load_json_file(RESTAURANTS_FILE) or []}
+    validator = ArgumentValidator("create_reservation", get_tool("create_reservation").parameters)
+    now = datetime.datetime.now().isoformat()
+    errors = []
+
+    # Parse and validate every row before taking the lock, so chat bookings
+    # only wait for the availability pass and the write
+    candidates = []
+    for number, row in enumerate(rows, start=1):
+        if "_error" in row:
+            errors.append({"row": number, "error": row["_error"]})
+            continue
+        args, problems = validator.validate(row)
+        if problems:
+            errors.append({"row": number, "error": validation_error("create_reservation", problems)["error"]})
+            continue
+
+        restaurant = restaurants.get(args["restaurant_id"])
+        if restaurant is None:
+            errors.append({"row": number, "error": f"Restaurant with ID {args['restaurant_id']} not found."})
+            continue
+        time = args["reservation_time"]
+        if time < restaurant["hours"]["open"] or time > restaurant["hours"]["close"]:
+            errors.append({"row": number, "error": f"Restaurant is not open at {time}."})
+            continue
+        candidates.append((number, args, restaurant))
+
+    try:
+        # A dry run writes nothing, so it checks against a snapshot without the lock
+        with nullcontext() if dry_run else store.locked():
+            existing = store.all()
+            occupancy = Occupancy(existing)
+            booked = {
+                reservation_key(r["restaurant_id"], r.get("customer_name"), r["party_size"],
+                                r["reservation_date"], r["reservation_time"])
+                for r in existing if r.get("status") != "cancelled"
+            }
+            created = []
+            duplicates = 0
+
+            for number, args, restaurant in candidates:
+                date, time = args["reservation_date"], args["reservation_time"]
+                key = reservation_key(restaurant["id"], args["customer_name"], args["party_size"], date, time)
+                if key in booked:
+                    duplicates += 1
+                    continue
+                capacities = table_capacities(restaurant)
+                tables = allocate(args["party_size"], occupancy.free_tables(restaurant, date, time), capacities)
+                if tables is None:
+                    errors.append({"row": number, "error": seating_error(restaurant, args["party_size"], date, time)})
+                    continue
+
+                reservation = new_reservation_record(
+                    restaurant["id"], restaurant["name"], args["customer_name"], args["party_size"], date, time,
+                    args.get("customer_email"), args.get("customer_phone"), args.get("special_requests"), now=now,
+                    table_type=main_table_type(tables, capacities), tables=tables)
+                created.append(reservation)
+                occupancy.add(reservation)
+                booked.add(key)
+
+            errors.sort(key=lambda error: error["row"])
+            if created and not dry_run and not store.put_many(created):
+                return {"success": False, "error": "Failed to save the reservations.", "created": 0,
+                        "duplicates": duplicates, "errors": errors}
+    except LockTimeout:
+        return {"success": False, "error": "The reservation system is busy. Please try again in a moment."}
+
+    logger.info(f"Imported {len(created)} reservations ({duplicates} duplicates, {len(errors)} errors)"
+                + (" [dry run]" if dry_run else ""))
+    return {"success": True, "created": len(created), "duplicates": duplicates, "errors": errors}
+
+
+def export_reservations(path, file_format=None, store=None):
+    """
+    Write every reservation to a CSV or JSON Lines file, soonest first.
+
+    Args:
+        path (str): File to write
+        file_format (str, optional): "csv" or "jsonl"; defaults to the extension
+        store (ReservationStore, optional): Store to read; defaults to get_store()
+
+    Returns:
+        int: Number of reservations written
+    """
+    file_format = _file_format(path, file_format)
+    reservations = (store or get_store()).all()
+    reservations.sort(key=lambda r: (r["reservation_date"], r["reservation_time"], r["id"]))
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        if file_format == "csv":
+            writer = csv.DictWriter(file, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(reservations)
+        else:
+            for reservation in reservations:
+                file.write(json.dumps(reservation) + "\n")
+    return len(reservations)
+
+
+def main(argv=None):
+    """Command line entry point: python -m tools.bulk_reservations ..."""
+    parser = argparse.ArgumentParser(description="Import or export reservations in bulk")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="Create reservations from a CSV or JSONL file")
+    import_parser.add_argument("file")
+    import_parser.add_argument("--format", choices=["csv", "jsonl"])
+    import_parser.add_argument("--dry-run", action="store_true", help="Check the rows without saving")
+    import_parser.add_argument("--errors", help="Write the row errors to this JSONL file")
+
+    export_parser = commands.add_parser("export", help="Write all reservations to a CSV or JSONL file")
+    export_parser.add_argument("file")
+    export_parser.add_argument("--format", choices=["csv", "jsonl"])
+
+    args = parser.parse_args(argv)
+    if args.command == "export":
+        count = export_reservations(args.file, args.format)
+        print(f"Exported {count} reservations to {args.file}")
+        return 0
+
+    result = create_reservations(read_rows(args.file, args.format), dry_run=args.dry_run)
+    if not result["success"]:
+        print(f"Error: {result['error']}")
+        return 1
+    print(f"{'Checked' if args.dry_run else 'Created'} {result['created']} reservations, "
+          f"skipped {result['duplicates']} duplicates, rejected {len(result['errors'])} rows")
+    if args.errors:
+        with open(args.errors, "w", encoding="utf-8") as file:
+            for error in result["errors"]:
+                file.write(json.dumps(error) + "\n")
+    else:
+        for error in result["errors"][:20]:
+            print(f"  row {error['row']}: {error['error']}")
+        if len(result["errors"]) > 20:
+            print(f"  ... {len(result['errors']) - 20} more (use --errors FILE to see them all)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,217 @@
+# tools/catalog.py - Versioned restaurant catalog with change notifications
+
+import inspect
+import logging
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+import sys
+
+# Add parent directory to path so we can import from other modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import RESTAURANTS_FILE
+from utils.helpers import load_json_file, save_json_file
+
+logger = logging.getLogger('catalog')
+
+# Minimum time between checks of the catalog file for outside edits
+POLL_INTERVAL_SECONDS = 1.0
+
+
+def diff_catalogs(old_by_id, new_by_id):
+    """
+    Compute the changes between two versions of the catalog.
+
+    Args:
+        old_by_id (dict): Restaurant ID -> record, before
+        new_by_id (dict): Restaurant ID -> record, after
+
+    Returns:
+        tuple: (added, removed, updated) where added and removed are lists of
+            records and updated is a list of (old record, new record) pairs
+    """
+    added = [record for rid, record in new_by_id.items() if rid not in old_by_id]
+    removed = [record for rid, record in old_by_id.items() if rid not in new_by_id]
+    updated = [(old_by_id[rid], record) for rid, record in new_by_id.items()
+               if rid in old_by_id and old_by_id[rid] != record]
+    return added, removed, updated
+
+
+class RestaurantCatalog:
+    """
+    Keeps the restaurant list in memory with a version number that goes up
+    on every change, and tells subscribers what changed.
+
+    Changes made through upsert_restaurant()/remove_restaurant() are
+    published immediately; edits made to the file by other processes are
+    picked up by poll().
+    """
+
+    def __init__(self, file_path=RESTAURANTS_FILE):
+        """
+        Initialize the catalog and load the restaurant file.
+
+        Args:
+            file_path (str): Restaurant JSON file
+        """
+        self.file_path = file_path
+        self.version = 0
+        self._lock = threading.RLock()
+        self._subscribers = []
+        self._by_id = {}
+        self._file_signature = None
+        self._last_poll = 0.0
+        self._reload()
+
+    def _signature(self):
+        try:
+            stat = os.stat(self.file_path)
+            return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            return None
+
+    def _reload(self):
+        """Read the file and publish the differences from the previous contents."""
+        signature = self._signature()
+        restaurants = load_json_file(self.file_path) or []
+        self._file_signature = signature
+        self._apply({restaurant["id"]: restaurant for restaurant in restaurants})
+
+    def _apply(self, new_by_id):
+        added, removed, updated = diff_catalogs(self._by_id, new_by_id)
+        self._by_id = new_by_id
+        if not (added or removed or updated) and self.version:
+            return
+        self.version += 1
+        delta = {"version": self.version, "added": added, "removed": removed, "updated": updated}
+        for reference in list(self._subscribers):
+            callback = reference()
+            if callback is None:
+                # The subscriber was garbage collected without unsubscribing
+                self._subscribers.remove(reference)
+                continue
+            try:
+                callback(delta)
+            except Exception as e:
+                logger.error(f"Catalog subscriber failed on version {self.version}: {e}", exc_info=True)
+
+    def restaurants(self):
+        """
+        Get the current restaurant list.
+
+        Returns:
+            list: Restaurant records in file order
+        """
+        with self._lock:
+            return list(self._by_id.values())
+
+    def get(self, restaurant_id):
+        """Get one restaurant record by ID, or None."""
+        return self._by_id.get(restaurant_id)
+
+    def subscribe(self, callback):
+        """
+        Register a callback for catalog changes.
+
+        The callback receives a delta dict with the new "version" and the
+        "added", "removed" and "updated" ((old, new) pairs) restaurants.
+        Deltas are delivered one at a time, in version order. A bound method
+        is held weakly, so subscribing does not keep its object alive.
+
+        Args:
+            callback (callable): Function taking the delta
+
+        Returns:
+            tuple: (version, restaurants) the subscriber starts from; the
+                first delta it receives will be for version + 1
+        """
+        with self._lock:
+            self._subscribers.append(weakref.WeakMethod(callback) if inspect.ismethod(callback) else lambda: callback)
+            return self.version, list(self._by_id.values())
+
+    def unsubscribe(self, callback):
+        """Stop sending changes to a callback."""
+        with self._lock:
+            self._subscribers = [reference for reference in self._subscribers if reference() != callback]
+
+    def poll(self, force=False):
+        """
+        Reload the catalog if the file was changed outside this process.
+
+        Checks at most once per POLL_INTERVAL_SECONDS unless forced.
+
+        Args:
+            force (bool): Check the file now
+
+        Returns:
+            int: The current catalog version
+        """
+        now = time.monotonic()
+        if not force and now - self._last_poll < POLL_INTERVAL_SECONDS:
+            return self.version
+        with self._lock:
+            self._last_poll = now
+            if self._signature() != self._file_signature:
+                logger.info(f"Restaurant file {self.file_path} changed, reloading catalog")
+                self._reload()
+            return self.version
+
+    def upsert_restaurant(self, restaurant):
+        """
+        Add a restaurant or replace the one with the same ID, and save the file.
+
+        Args:
+            restaurant (dict): Restaurant record with an "id"
+
+        Returns:
+            bool: True if saved, False otherwise
+        """
+        with self._lock:
+            new_by_id = dict(self._by_id)
+            new_by_id[restaurant["id"]] = restaurant
+            return self._save_and_apply(new_by_id)
+
+    def remove_restaurant(self, restaurant_id):
+        """
+        Remove a restaurant by ID and save the file.
+
+        Args:
+            restaurant_id (str): ID of the restaurant
+
+        Returns:
+            bool: True if it existed and the file was saved, False otherwise
+        """
+        with self._lock:
+            if restaurant_id not in self._by_id:
+                return False
+            new_by_id = dict(self._by_id)
+            del new_by_id[restaurant_id]
+            return self._save_and_apply(new_by_id)
+
+    def _save_and_apply(self, new_by_id):
+        if not save_json_file(self.file_path, list(new_by_id.values())):
+            return False
+        self._file_signature = self._signature()
+        self._apply(new_by_id)
+        return True
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog():
+    """
+    Get the process-wide catalog for RESTAURANTS_FILE, loading it on first use.
+
+    Returns:
+        RestaurantCatalog: The shared catalog
+    """
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = RestaurantCatalog()
+        return _catalog
@@ -0,0 +1,325 @@
+# tools/occupancy.py - Count the tables taken by reservations
+
+import datetime
+import logging
+import threading
+from collections import Counter
+from time import monotonic
+from pathlib import Path
+import sys
+
+# Add parent directory to path so we can import from other modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import AVAILABILITY_HORIZON_DAYS, AVAILABILITY_CHECK_MINUTES, BOOKING_DURATION_MINUTES, SLOT_MINUTES
+from tools.reservation_store import get_store
+
+logger = logging.getLogger('occupancy')
+
+
+def table_type_for(party_size):
+    """
+    Get the table type a party is seated at.
+
+    Args:
+        party_size (int): Number of people
+
+    Returns:
+        str: "small", "medium" or "large", or None if the party is too big
+    """
+    if party_size <= 2:
+        return "small"
+    if party_size <= 4:
+        return "medium"
+    if party_size <= 8:
+        return "large"
+    return None
+
+
+def booking_slots(time):
+    """
+    Get the time slots a booking holds its tables in.
+
+    Args:
+        time (str): Booked time in HH:MM format
+
+    Returns:
+        list: Start of every SLOT_MINUTES slot that overlaps the
+            BOOKING_DURATION_MINUTES after the booked time, in HH:MM format;
+            slots past midnight are numbered on from 24:00
+    """
+    hours, minutes = map(int, time.split(":"))
+    start = hours * 60 + minutes
+    return [f"{slot // 60:02d}:{slot % 60:02d}"
+            for slot in range(start - start % SLOT_MINUTES, start + BOOKING_DURATION_MINUTES, SLOT_MINUTES)]
+
+
+def reservation_tables(reservation):
+    """
+    Get the tables a reservation holds.
+
+    Args:
+        reservation (dict): Reservation record
+
+    Returns:
+        dict: Table type -> number of tables; reservations made before tables
+            could be combined hold one table of their table_type
+    """
+    return reservation.get("tables") or {reservation["table_type"]: 1}
+
+
+class Occupancy:
+    """
+    Tables taken per restaurant, date, time slot and table type.
+
+    A reservation holds its tables in every slot from its booked time
+    until BOOKING_DURATION_MINUTES later, so bookings whose times overlap
+    compete for the same tables. Built once
+    from the stored reservations, it answers "is there a free table?" for
+    any number of new bookings without re-reading the store.
+    """
+
+    def __init__(self, reservations=()):
+        """
+        Count the tables taken by reservations.
+
+        Args:
+            reservations (iterable): Reservation records; cancelled ones are ignored
+        """
+        self._taken = Counter()
+        for reservation in reservations:
+            self.add(reservation)
+
+    @staticmethod
+    def _keys(reservation):
+        tables = reservation_tables(reservation).items()
+        return [((reservation["restaurant_id"], reservation["reservation_date"], slot, table_type), n)
+                for slot in booking_slots(reservation["reservation_time"]) for table_type, n in tables]
+
+    def add(self, reservation):
+        """Count the tables held by a reservation."""
+        if reservation.get("status") != "cancelled":
+            for key, n in self._keys(reservation):
+                self._taken[key] += n
+
+    def remove(self, reservation):
+        """Release the tables held by a reservation."""
+        if reservation.get("status") != "cancelled":
+            for key, n in self._keys(reservation):
+                self._taken[key] -= n
+                if self._taken[key] <= 0:
+                    del self._taken[key]
+
+    def counts(self):
+        """
+        Get every non-zero count.
+
+        Returns:
+            dict: (restaurant_id, date, slot, table_type) -> tables taken
+        """
+        return dict(self._taken)
+
+    def taken(self, restaurant_id, date, time, table_type, release=None):
+        """
+        Get the number of tables of a type taken during a booking at a time.
+
+        Args:
+            restaurant_id (str): ID of the restaurant
+            date (str): Date in YYYY-MM-DD format
+            time (str): Time in HH:MM format
+            table_type (str): "small", "medium" or "large"
+            release (dict, optional): Reservation whose tables are counted as free
+
+        Returns:
+            int: Most tables taken in any slot the booking would hold
+        """
+        released = Counter()
+        if release is not None and release.get("status") != "cancelled":
+            for key, n in self._keys(release):
+                released[key] += n
+        keys = [(restaurant_id, date, slot, table_type) for slot in booking_slots(time)]
+        return max(self._taken[key] - released[key] for key in keys)
+
+    def free_tables(self, restaurant, date, time, release=None):
+        """
+        Get a restaurant's free tables of each type for a booking at a time.
+
+        Args:
+            restaurant (dict): Restaurant record
+            date (str): Date in YYYY-MM-DD format
+            time (str): Time in HH:MM format
+            release (dict, optional): Reservation whose tables are counted as free
+
+        Returns:
+            dict: Table type -> free tables, never below 0
+        """
+        return {
+            table_type: max(table.get("count", 0) - self.taken(restaurant["id"], date, time, table_type, release), 0)
+            for table_type, table in restaurant["tables"].items()
+        }
+
+
+class AvailabilityView:
+    """
+    Tables taken per restaurant, date, time slot and table type for the next
+    AVAILABILITY_HORIZON_DAYS days, kept up to date from the reservation
+    store's change events.
+
+    Each booking, change or cancellation adjusts the counters of the slots
+    it holds, so the number of free tables is a few dict lookups. Dates outside the horizon
+    are counted from the store's date index instead. The view is rebuilt
+    from the store when the store reloads changes made by another process,
+    when the day rolls over, and every check_minutes as a check that the
+    counters have not drifted from the store; drift found is logged.
+    """
+
+    def __init__(self, store, horizon_days=AVAILABILITY_HORIZON_DAYS, check_minutes=AVAILABILITY_CHECK_MINUTES):
+        """
+        Attach a view to a store.
+
+        Args:
+            store (ReservationStore): Store to follow
+            horizon_days (int): Days from today kept in the view
+            check_minutes (float): Recount the view from the store this often; 0 = only when stale
+        """
+        self.store = store
+        self.horizon_days = horizon_days
+        self.check_minutes = check_minutes
+        self._checked_at = None  # monotonic() time of the last rebuild
+        self._occupancy = Occupancy()
+        self._start = None  # First date in the view, None until built
+        self._end = None    # First date after the view
+        self._stale = True
+        store.add_listener(self._on_change)
+
+    def _in_horizon(self, date):
+        return self._start <= date < self._end
+
+    def _on_change(self, old, new):
+        # Called by the store with its lock held
+        if old is None and new is None:
+            self._stale = True
+            return
+        if self._stale:
+            return
+        if old is not None and self._in_horizon(old["reservation_date"]):
+            self._occupancy.remove(old)
+        if new is not None and self._in_horizon(new["reservation_date"]):
+            self._occupancy.add(new)
+
+    def rebuild(self, today=None):
+        """
+        Recount the view from the store.
+
+        Args:
+            today (datetime.date, optional): First day of the horizon; defaults to today
+
+        Returns:
+            int: Number of counters that were wrong; 0 when the view had not
+                drifted or had not been built
+        """
+        today = today or datetime.date.today()
+        dates = [(today + datetime.timedelta(days=offset)).isoformat() for offset in range(self.horizon_days)]
+        with self.store.lock:
+            self.store.refresh()
+            occupancy = Occupancy(record for date in dates for record in self.store.for_date(date))
+            drift = 0
+            if not self._stale:
+                before, after = self._occupancy.counts(), occupancy.counts()
+                drift = sum(1 for key in before.keys() | after.keys() if before.get(key) != after.get(key))
+            self._occupancy = occupancy
+            self._start, self._end = dates[0], (today + datetime.timedelta(days=self.horizon_days)).isoformat()
+            self._stale = False
+            self._checked_at = monotonic()
+        if drift:
+            logger.warning(f"Availability view had drifted from the store: {drift} counters recounted")
+        return drift
+
+    def _check_due(self):
+        return bool(self.check_minutes) and monotonic() - self._checked_at >= self.check_minutes * 60
+
+    def taken(self, restaurant_id, date, time, table_type, release=None):
+        """
+        Get the number of tables of a type taken during a booking at a time.
+
+        Args:
+            restaurant_id (str): ID of the restaurant
+            date (str): Date in YYYY-MM-DD format
+            time (str): Time in HH:MM format
+            table_type (str): "small", "medium" or "large"
+            release (dict, optional): Reservation whose tables are counted as free
+
+        Returns:
+            int: Most tables taken in any slot the booking would hold
+        """
+        with self.store.lock:
+            self.store.refresh()
+            if self._stale or self._start != datetime.date.today().isoformat() or self._check_due():
+                self.rebuild()
+            if self._in_horizon(date):
+                return self._occupancy.taken(restaurant_id, date, time, table_type, release)
+        return Occupancy(self.store.for_date(date, restaurant_id)).taken(restaurant_id, date, time, table_type, release)
+
+    def remaining(self, restaurant, date, time, table_type, release=None):
+        """
+        Get the number of free tables of a type for a booking at a time.
+
+        Args:
+            restaurant (dict): Restaurant record
+            date (str): Date in YYYY-MM-DD format
+            time (str): Time in HH:MM format
+            table_type (str): "small", "medium" or "large"
+            release (dict, optional): Reservation whose tables are counted as free
+
+        Returns:
+            int: Free tables, never below 0
+        """
+        count = restaurant["tables"].get(table_type, {}).get("count", 0)
+        if count <= 0:
+            return 0
+        return max(count - self.taken(restaurant["id"], date, time, table_type, release), 0)
+
+    def free_tables(self, restaurant, date, time, release=None):
+        """
+        Get a restaurant's free tables of each type for a booking at a time.
+
+        Args:
+            restaurant (dict): Restaurant record
+            date (str): Date in YYYY-MM-DD format
+            time (str): Time in HH:MM format
+            release (dict, optional): Reservation whose tables are counted as free
+
+        Returns:
+            dict: Table type -> free tables, never below 0
+        """
+        return {table_type: self.remaining(restaurant, date, time, table_type, release)
+                for table_type in restaurant["tables"]}
+
+    def counts(self):
+        """
+        Get the counters in the view.
+
+        Returns:
+            dict: (restaurant_id, date, slot, table_type) -> tables taken
+        """
+        with self.store.lock:
+            return self._occupancy.counts()
+
+
+_view = None
+_view_lock = threading.Lock()
+
+
+def get_availability_view():
+    """
+    Get the process-wide availability view of the shared reservation store.
+
+    Returns:
+        AvailabilityView: The shared view
+    """
+    global _view
+    with _view_lock:
+        if _view is None:
+            _view = AvailabilityView(get_store())
+        return _view
+
@@ -0,0 +1,105 @@
+# tools/registry.py - Registry of the tools the assistant can call
+
+from pathlib import Path
+import sys
+
+# Add parent directory to path so we can import from other modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import TOOL_TIMEOUT_SECONDS
+
+_tools = {}
+
+
+class Tool:
+    """
+    A registered tool: the function, the JSON schema the LLM sees, and the
+    policies applied when it is called.
+    """
+
+    __slots__ = ("name", "function", "description", "parameters", "timeout", "read_only")
+
+    def __init__(self, name, function, description, parameters, timeout, read_only):
+        self.name = name
+        self.function = function
+        self.description = description
+        self.parameters = parameters
+        self.timeout = timeout
+        self.read_only = read_only
+
+    @property
+    def definition(self):
+        """The tool definition in the chat completions format."""
+        return {
+            "type": "function",
+            "function": {
+                "name": self.name,
+                "description": self.description,
+                "parameters": self.parameters
+            }
+        }
+
+    def __call__(self, **kwargs):
+        return self.function(**kwargs)
+
+
+def register_tool(description, parameters=None, name=None, timeout=None, read_only=False):
+    """
+    Decorator registering a function as a tool.
+
+    Args:
+        description (str): What the tool does, for the LLM
+        parameters (dict, optional): JSON schema of the arguments; the
+            function is called with them as keyword arguments
+        name (str, optional): Tool name; defaults to the function name
+        timeout (float, optional): Seconds the tool may run before the
+            caller gives up on it; defaults to TOOL_TIMEOUT_SECONDS
+        read_only (bool): The tool never modifies data, so identical
+            concurrent calls may share one execution
+
+    Returns:
+        callable: Decorator returning the function unchanged
+    """
+    def decorator(function):
+        tool_name = name or function.__name__
+        if tool_name in _tools and _tools[tool_name].function is not function:
+            raise ValueError(f"Tool {tool_name} is already registered")
+        _tools[tool_name] = Tool(
+            tool_name, function, description,
+            parameters or {"type": "object", "properties": {}, "required": []},
+            timeout or TOOL_TIMEOUT_SECONDS, read_only)
+        return function
+    return decorator
+
+
+def get_tool(name):
+    """
+    Look up a registered tool.
+
+    Args:
+        name (str): Tool name
+
+    Returns:
+        Tool: The tool, or None if there is no tool with that name
+    """
+    return _tools.get(name)
+
+
+def registered_tools():
+    """
+    Get every registered tool.
+
+    Returns:
+        list: Tools in registration order
+    """
+    return list(_tools.values())
+
+
+def tool_definitions():
+    """
+    Get the definitions of every registered tool for the LLM.
+
+    Returns:
+        list: Tool definitions in the chat completions format
+    """
+    return [tool.definition for tool in _tools.values()]
@@ -0,0 +1,350 @@
+# tools/reservation_archive.py - Move old and cancelled reservations into compressed archive segments
+
+import argparse
+import datetime
+import gzip
+import json
+import logging
+import os
+import threading
+import zlib
+from time import sleep
+from pathlib import Path
+import sys
+
+# Add parent directory to path so we can import from other modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import RESERVATION_ARCHIVE_DIR, RESERVATION_RETENTION_DAYS, CANCELLED_RETENTION_DAYS
+from tools.reservation_store import get_store, normalize_name, partition_key
+from utils.file_lock import LockTimeout
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger('reservation_archive')
+
+ARCHIVED = REGISTRY.counter(
+    "foodiespot_reservations_archived_total",
+    "Reservations moved out of the hot store by reason (past, cancelled)")
+COLD_LOOKUPS = REGISTRY.counter(
+    "foodiespot_archive_lookups_total",
+    "Reservation lookups served from the archive by outcome (hit, miss)")
+
+
+def _complete_length(data):
+    """Get the length of the complete gzip members at the start of a segment."""
+    length = 0
+    while length < len(data):
+        member = zlib.decompressobj(wbits=31)
+        try:
+            member.decompress(data[length:])
+        except zlib.error:
+            break
+        if not member.eof:
+            break
+        length = len(data) - len(member.unused_data)
+    return length
+
+
+class ReservationArchive:
+    """
+    Archived reservations in gzip-compressed JSON Lines segments, one per
+    month of reservation date.
+
+    Each archival run appends one gzip member to the segments it touches, so
+    earlier data is never rewritten; a member left torn by an interrupted
+    run is cut off first, as gzip readers stop at it. Lookups decompress and scan the
+    segments, which is slow compared to the hot store but only happens for
+    reservations that are no longer in it. A record archived twice (after a
+    run was interrupted between archiving and removing it from the hot
+    store) is returned once.
+    """
+
+    def __init__(self, directory=RESERVATION_ARCHIVE_DIR):
+        """
+        Open an archive directory; it is created on the first write.
+
+        Args:
+            directory (str): Directory holding the segments
+        """
+        self.directory = directory
+
+    def segment_path(self, month):
+        """Path of the segment of a month, "YYYY-MM"."""
+        return os.path.join(self.directory, f"{month}.jsonl.gz")
+
+    def months(self):
+        """
+        Get the months that have a segment.
+
+        Returns:
+            list: Months as "YYYY-MM", oldest first
+        """
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".jsonl.gz")] for name in names if name.endswith(".jsonl.gz"))
+
+    def append(self, reservations):
+        """
+        Add reservations to their segments and make them durable.
+
+        Args:
+            reservations (list): Reservation records
+        """
+        by_month = {}
+        for reservation in reservations:
+            by_month.setdefault(partition_key(reservation), []).append(reservation)
+        os.makedirs(self.directory, exist_ok=True)
+        for month, records in sorted(by_month.items()):
+            data = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in records)
+            self._drop_torn_member(month)
+            with open(self.segment_path(month), "ab") as file:
+                file.write(gzip.compress(data.encode("utf-8")))
+                file.flush()
+                os.fsync(file.fileno())
+
+    def _drop_torn_member(self, month):
+        # Members appended after a torn one could not be read back
+        path = self.segment_path(month)
+        try:
+            with open(path, "r+b") as file:
+                data = file.read()
+                length = _complete_length(data)
+                if length < len(data):
+                    logger.warning(f"Cutting a partly written member off the end of {path}")
+                    file.truncate(length)
+                    file.flush()
+                    os.fsync(file.fileno())
+        except FileNotFoundError:
+            pass
+
+    def _read_segment(self, month):
+        path = self.segment_path(month)
+        records = {}
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                for line in file:
+                    if line.strip():
+                        record = json.loads(line)
+                        records[record["id"]] = record
+        except FileNotFoundError:
+            pass
+        except (EOFError, gzip.BadGzipFile, zlib.error, ValueError):
+            # A run interrupted mid-append leaves a torn last member; its
+            # records are still in the hot store
+            logger.warning(f"Ignoring a partly written member at the end of {path}")
+        return records
+
+    def records(self, months=None):
+        """
+        Read archived reservations.
+
+        Args:
+            months (list, optional): Months to read; defaults to every segment
+
+        Returns:
+            list: Reservation records, oldest month first
+        """
+        return [record for month in (months or self.months()) for record in self._read_segment(month).values()]
+
+    def get(self, reservation_id):
+        """
+        Find an archived reservation by ID, scanning the newest segments first.
+
+        Args:
+            reservation_id (str): ID of the reservation
+
+        Returns:
+            dict: The reservation, or None if it is not archived
+        """
+        for month in reversed(self.months()):
+            record = self._read_segment(month).get(reservation_id)
+            if record is not None:
+                COLD_LOOKUPS.inc(outcome="hit")
+                return record
+        COLD_LOOKUPS.inc(outcome="miss")
+        return None
+
+    def by_customer(self, customer_name):
+        """
+        Find a customer's archived reservations.
+
+        Args:
+            customer_name (str): Customer name; case and extra spaces are ignored
+
+        Returns:
+            list: Reservation records, oldest month first
+        """
+        name = normalize_name(customer_name)
+        return [record for record in self.records() if normalize_name(record.get("customer_name")) == name]
+
+
+def archive_reason(reservation, today, now, retention_days=RESERVATION_RETENTION_DAYS,
+                   cancelled_days=CANCELLED_RETENTION_DAYS):
+    """
+    Decide whether a reservation has left the retention window.
+
+    Args:
+        reservation (dict): Reservation record
+        today (datetime.date): Current date
+        now (datetime.datetime): Current time
+        retention_days (int): Days after its date a booking is kept
+        cancelled_days (int): Days after its last change a cancelled booking is kept
+
+    Returns:
+        str: "past" or "cancelled", or None to keep the reservation
+    """
+    if reservation["reservation_date"] < (today - datetime.timedelta(days=retention_days)).isoformat():
+        return "past"
+    if reservation.get("status") == "cancelled":
+        changed = reservation.get("updated_at") or reservation.get("created_at")
+        if not changed or changed < (now - datetime.timedelta(days=cancelled_days)).isoformat():
+            return "cancelled"
+    return None
+
+
+def archive_reservations(store=None, archive=None, now=None, dry_run=False):
+    """
+    Move reservations outside the retention window from the store to the archive.
+
+    The records are written to the archive and synced before they are
+    removed from the store, so a crash in between leaves them in both places
+    rather than in neither.
+
+    Args:
+        store (ReservationStore, optional): Hot store; defaults to the shared store
+        archive (ReservationArchive, optional): Archive; defaults to RESERVATION_ARCHIVE_DIR
+        now (datetime.datetime, optional): Current time; defaults to now
+        dry_run (bool): Count the reservations without moving them
+
+    Returns:
+        dict: {"success", "archived": {reason: count}, "kept"}
+    """
+    store = store or get_store()
+    archive = archive or ReservationArchive()
+    now = now or datetime.datetime.now()
+    today = now.date()
+    counts = {"past": 0, "cancelled": 0}
+
+    try:
+        with store.locked():
+            moved = []
+            kept = 0
+            for reservation in store.all():
+                reason = archive_reason(reservation, today, now)
+                if reason is None:
+                    kept += 1
+                    continue
+                counts[reason] += 1
+                moved.append(reservation)
+
+            if moved and not dry_run:
+                try:
+                    archive.append(moved)
+                except OSError as e:
+                    logger.error(f"Error writing the reservation archive: {e}")
+                    return {"success": False, "error": "Failed to write the archive."}
+                if not store.remove_many(r["id"] for r in moved):
+                    return {"success": False, "error": "Failed to remove the archived reservations."}
+                for reason, count in counts.items():
+                    if count:
+                        ARCHIVED.inc(count, reason=reason)
+    except LockTimeout:
+        return {"success": False, "error": "The reservation system is busy. Please try again in a moment."}
+
+    logger.info(f"Archived {len(moved)} reservations ({counts['past']} past, {counts['cancelled']} cancelled), "
+                f"kept {kept}" + (" [dry run]" if dry_run else ""))
+    return {"success": True, "archived": counts, "kept": kept}
+
+
+_archive = None
+_archive_lock = threading.Lock()
+_job = None
+
+
+def get_archive():
+    """
+    Get the process-wide archive in RESERVATION_ARCHIVE_DIR.
+
+    Returns:
+        ReservationArchive: The shared archive
+    """
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = ReservationArchive()
+        return _archive
+
+
+def start_retention_job(interval_hours):
+    """
+    Run archive_reservations() on the shared store from a daemon thread.
+
+    Calling this more than once is harmless; only the first call starts a job.
+
+    Args:
+        interval_hours (float): Hours between runs; the first run is immediate
+
+    Returns:
+        threading.Thread: The running job
+    """
+    global _job
+    with _archive_lock:
+        if _job is not None:
+            return _job
+
+        def run():
+            while True:
+                try:
+                    archive_reservations(archive=get_archive())
+                except Exception as e:
+                    logger.error(f"Reservation archival failed: {e}")
+                sleep(interval_hours * 3600)
+
+        _job = threading.Thread(target=run, name="reservation-retention", daemon=True)
+        _job.start()
+        logger.info(f"Archiving reservations every {interval_hours} hours")
+        return _job
+
+
+def main(argv=None):
+    """Command line entry point: python -m tools.reservation_archive ..."""
+    parser = argparse.ArgumentParser(description="Archive old reservations and look them up")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Move reservations outside the retention window to the archive")
+    run_parser.add_argument("--dry-run", action="store_true", help="Count the reservations without moving them")
+
+    get_parser = commands.add_parser("get", help="Print an archived reservation")
+    get_parser.add_argument("reservation_id")
+
+    search_parser = commands.add_parser("search", help="Print a customer's archived reservations")
+    search_parser.add_argument("customer_name")
+
+    for command in (run_parser, get_parser, search_parser):
+        command.add_argument("--dir", default=RESERVATION_ARCHIVE_DIR, help="Archive directory")
+
+    args = parser.parse_args(argv)
+    archive = ReservationArchive(args.dir)
+    if args.command == "run":
+        result = archive_reservations(archive=archive, dry_run=args.dry_run)
+        if not result["success"]:
+            print(result["error"], file=sys.stderr)
+            return 1
+        print(f"Archived {result['archived']['past']} past and {result['archived']['cancelled']} cancelled "
+              f"reservations, kept {result['kept']}" + (" (dry run)" if args.dry_run else ""))
+    elif args.command == "get":
+        reservation = archive.get(args.reservation_id)
+        if reservation is None:
+            print(f"Reservation {args.reservation_id} is not archived.", file=sys.stderr)
+            return 1
+        print(json.dumps(reservation, indent=2))
+    elif args.command == "search":
+        for reservation in archive.by_customer(args.customer_name):
+            print(json.dumps(reservation))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
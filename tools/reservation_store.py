@@ -0,0 +1,888 @@
+# tools/reservation_store.py - Reservation storage backends
+
+import argparse
+import atexit
+import bisect
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import sys
+
+# Add parent directory to path so we can import from other modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import (RESERVATIONS_FILE, RESERVATIONS_DIR, RESERVATION_BACKEND,
+                    RESERVATION_GROUP_COMMIT_MS, RESERVATION_WAL_CHECKPOINT_BYTES)
+from utils.helpers import load_json_file, save_json_file
+from utils.file_lock import file_lock
+from utils.write_ahead_log import WriteAheadLog
+
+logger = logging.getLogger('reservation_store')
+
+MANIFEST_VERSION = 1
+
+
+class VersionConflict(Exception):
+    """Raised when a reservation changed since the version a write was based on."""
+
+
+def record_version(reservation):
+    """
+    Get the version of a reservation record.
+
+    Args:
+        reservation (dict): Reservation record
+
+    Returns:
+        int: The version; records saved before versioning count as 0
+    """
+    return reservation.get("version", 0)
+
+
+def file_signature(path):
+    """
+    Identify the current version of a file without reading it.
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        tuple: (mtime_ns, size, inode), or None if the file does not exist
+    """
+    try:
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    except OSError:
+        return None
+
+
+def partition_key(reservation):
+    """
+    Get the partition a reservation belongs to.
+
+    Args:
+        reservation (dict): Reservation record
+
+    Returns:
+        str: The month of the reservation date, "YYYY-MM"
+    """
+    return reservation["reservation_date"][:7]
+
+
+class ReservationIndex:
+    """
+    In-memory indexes over a set of reservations, kept up to date on every
+    change:
+
+        by_id        reservation ID -> record
+        by_customer  normalized customer name -> IDs, in insertion order
+        by_slot      (restaurant_id, date) -> [(time, ID), ...] sorted by time
+        by_date      date -> restaurant IDs with reservations that day
+
+    Lookups by ID and customer are dict lookups; time ranges within a
+    restaurant's day are found by bisection.
+    """
+
+    __slots__ = ("by_id", "by_customer", "by_slot", "by_date")
+
+    def __init__(self, reservations=()):
+        self.by_id = {}
+        self.by_customer = {}
+        self.by_slot = {}
+        self.by_date = {}
+        for reservation in reservations:
+            self.add(reservation)
+
+    def add(self, reservation):
+        """
+        Index a reservation, replacing any record with the same ID.
+
+        Returns:
+            dict: The record replaced, or None if the ID is new
+        """
+        previous = self.discard(reservation["id"])
+        reservation_id = reservation["id"]
+        self.by_id[reservation_id] = reservation
+        self.by_customer.setdefault(normalize_name(reservation.get("customer_name")), {})[reservation_id] = None
+        slot = (reservation["restaurant_id"], reservation["reservation_date"])
+        bisect.insort(self.by_slot.setdefault(slot, []), (reservation["reservation_time"], reservation_id))
+        self.by_date.setdefault(reservation["reservation_date"], set()).add(reservation["restaurant_id"])
+        return previous
+
+    def discard(self, reservation_id):
+        """
+        Remove a reservation from the indexes.
+
+        Returns:
+            dict: The removed record, or None if it was not indexed
+        """
+        reservation = self.by_id.pop(reservation_id, None)
+        if reservation is None:
+            return None
+        name = normalize_name(reservation.get("customer_name"))
+        ids = self.by_customer[name]
+        del ids[reservation_id]
+        if not ids:
+            del self.by_customer[name]
+        slot = (reservation["restaurant_id"], reservation["reservation_date"])
+        entries = self.by_slot[slot]
+        del entries[bisect.bisect_left(entries, (reservation["reservation_time"], reservation_id))]
+        if not entries:
+            del self.by_slot[slot]
+            restaurants = self.by_date[reservation["reservation_date"]]
+            restaurants.discard(reservation["restaurant_id"])
+            if not restaurants:
+                del self.by_date[reservation["reservation_date"]]
+        return reservation
+
+    def customer(self, customer_name):
+        """Get a customer's records, oldest booking first."""
+        return [self.by_id[i] for i in self.by_customer.get(normalize_name(customer_name), ())]
+
+    def between(self, restaurant_id, date, start=None, end=None):
+        """
+        Get a restaurant's records on a date with start <= time < end.
+
+        Args:
+            restaurant_id (str): ID of the restaurant
+            date (str): Date in YYYY-MM-DD format
+            start (str, optional): Earliest time, HH:MM; defaults to the start of the day
+            end (str, optional): Time to stop before, HH:MM; defaults to the end of the day
+
+        Returns:
+            list: Records sorted by time
+        """
+        entries = self.by_slot.get((restaurant_id, date), ())
+        low = bisect.bisect_left(entries, (start,)) if start else 0
+        high = bisect.bisect_left(entries, (end,)) if end else len(entries)
+        return [self.by_id[reservation_id] for _, reservation_id in entries[low:high]]
+
+    def on_date(self, date, restaurant_id=None):
+        """Get the records on a date, optionally for one restaurant, sorted by restaurant and time."""
+        restaurants = [restaurant_id] if restaurant_id else sorted(self.by_date.get(date, ()))
+        return [record for rid in restaurants for record in self.between(rid, date)]
+
+
+class ReservationStore:
+    """
+    Common interface of the reservation backends.
+
+    Records are cached in memory, in ReservationIndex objects, and reloaded
+    when another process changes the files underneath. Reads return copies,
+    so callers can change them freely and hand them back to put().
+    Read-modify-write cycles should run inside locked(), which holds the
+    store's file lock and makes sure the cache is current.
+
+    The "lock" attribute guards the cache within the process; listeners
+    added with add_listener() are called while it is held.
+    """
+
+    def __init__(self, lock_path):
+        """
+        Initialize the store.
+
+        Args:
+            lock_path (str): File whose lock guards writes to this store
+        """
+        self.lock_path = lock_path
+        self.lock = threading.RLock()
+        self._local = threading.local()
+        self._listeners = []
+
+    def add_listener(self, listener):
+        """
+        Follow the changes made to the store.
+
+        Args:
+            listener (callable): Called as listener(old, new) for every
+                record written through this store, with old None for an
+                insert and new None for a delete, and as listener(None, None)
+                when the cache is reloaded because the files changed
+                underneath
+        """
+        with self.lock:
+            self._listeners.append(listener)
+
+    def _changed(self, old, new):
+        for listener in self._listeners:
+            listener(old, new)
+
+    @contextmanager
+    def locked(self):
+        """
+        Hold the store's write lock (across processes) while the block runs.
+
+        With group commit, writes made in the block are waited for after the
+        lock is released, so other writers can join the same commit.
+
+        Raises:
+            OSError: If the writes made in the block could not be made durable
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.lock_path)), exist_ok=True)
+        outermost = getattr(self._local, "pending", None) is None
+        with file_lock(self.lock_path):
+            with self.lock:
+                self.refresh()
+                if not outermost:
+                    yield self
+                    return
+                self._local.pending = []
+                try:
+                    yield self
+                finally:
+                    pending, self._local.pending = self._local.pending, None
+        if pending:
+            self._wait_durable(max(pending))
+
+    def _durable_later(self, ticket):
+        """Wait for a write now, or when the enclosing locked() block ends."""
+        pending = getattr(self._local, "pending", None)
+        if pending is None:
+            self._wait_durable(ticket)
+        else:
+            pending.append(ticket)
+
+    def _wait_durable(self, ticket):
+        """Block until a write is durable; only stores with group commit defer writes."""
+
+    def refresh(self):
+        """Reload whatever changed on disk since it was last read."""
+        raise NotImplementedError
+
+    def _indexes(self, months=None):
+        """Iterate over the indexes of the cached records, optionally only those of some months."""
+        raise NotImplementedError
+
+    def _persist(self, records, removed_ids=()):
+        """Write the given records (inserted or replaced) and removals to disk."""
+        raise NotImplementedError
+
+    def get(self, reservation_id):
+        """
+        Get one reservation by ID.
+
+        Args:
+            reservation_id (str): ID of the reservation
+
+        Returns:
+            dict: A copy of the reservation, or None if there is none
+        """
+        with self.lock:
+            self.refresh()
+            for index in self._indexes():
+                record = index.by_id.get(reservation_id)
+                if record is not None:
+                    return dict(record)
+        return None
+
+    def for_date(self, date, restaurant_id=None):
+        """
+        Get the reservations on a date.
+
+        Args:
+            date (str): Date in YYYY-MM-DD format
+            restaurant_id (str, optional): Only this restaurant's reservations
+
+        Returns:
+            list: Copies of the matching reservations, sorted by time
+                within each restaurant
+        """
+        with self.lock:
+            self.refresh()
+            return [dict(record) for index in self._indexes(months=[date[:7]])
+                    for record in index.on_date(date, restaurant_id)]
+
+    def between(self, restaurant_id, date, start=None, end=None):
+        """
+        Get a restaurant's reservations on a date within a time range.
+
+        Args:
+            restaurant_id (str): ID of the restaurant
+            date (str): Date in YYYY-MM-DD format
+            start (str, optional): Earliest time, HH:MM
+            end (str, optional): Time to stop before, HH:MM
+
+        Returns:
+            list: Copies of the reservations with start <= time < end, sorted by time
+        """
+        with self.lock:
+            self.refresh()
+            return [dict(record) for index in self._indexes(months=[date[:7]])
+                    for record in index.between(restaurant_id, date, start, end)]
+
+    def by_customer(self, customer_name):
+        """
+        Get a customer's reservations.
+
+        Args:
+            customer_name (str): Name of the customer (case- and whitespace-insensitive)
+
+        Returns:
+            list: Copies of the customer's reservations
+        """
+        with self.lock:
+            self.refresh()
+            return [dict(record) for index in self._indexes() for record in index.customer(customer_name)]
+
+    def all(self):
+        """
+        Get every reservation in the store.
+
+        Returns:
+            list: Copies of all reservations
+        """
+        with self.lock:
+            self.refresh()
+            return [dict(record) for index in self._indexes() for record in index.by_id.values()]
+
+    def put(self, reservation):
+        """
+        Insert a reservation or replace the one with the same ID, and save it.
+
+        Args:
+            reservation (dict): Reservation record
+
+        Returns:
+            bool: True if saved, False otherwise
+        """
+        return self.put_many([reservation])
+
+    def put_many(self, reservations):
+        """
+        Insert or replace several reservations with a single write.
+
+        Args:
+            reservations (list): Reservation records
+
+        Returns:
+            bool: True if saved, False otherwise
+        """
+        with self.lock:
+            self.refresh()
+            return self._persist([dict(record) for record in reservations])
+
+    def compare_and_put(self, reservation, expected_version):
+        """
+        Replace a reservation only if it is still at the version it was read at.
+
+        The check and the write happen under the store lock; the caller can
+        do its reading and checking without holding it. The saved record
+        gets the next version.
+
+        Args:
+            reservation (dict): Updated reservation record
+            expected_version (int): Version of the record the update is based on
+
+        Returns:
+            dict: A copy of the saved record, or None if it could not be saved
+
+        Raises:
+            VersionConflict: If the reservation is gone or has a different version
+        """
+        with self.locked():
+            current = None
+            for index in self._indexes():
+                current = index.by_id.get(reservation["id"])
+                if current is not None:
+                    break
+            if current is None or record_version(current) != expected_version:
+                raise VersionConflict(f"Reservation {reservation['id']} was changed by another request")
+            record = dict(reservation, version=expected_version + 1)
+            if not self._persist([record]):
+                return None
+            return dict(record)
+
+    def remove_many(self, reservation_ids):
+        """
+        Delete reservations by ID with a single write.
+
+        Args:
+            reservation_ids (iterable): IDs to delete; unknown IDs are ignored
+
+        Returns:
+            bool: True if saved, False otherwise
+        """
+        with self.lock:
+            self.refresh()
+            return self._persist([], removed_ids=set(reservation_ids))
+
+
+def normalize_name(name):
+    """Lowercase a name and collapse its whitespace, for comparisons."""
+    return " ".join(str(name or "").split()).lower()
+
+
+def _apply_entry(index, entry):
+    """
+    Apply one write-ahead log entry to an index.
+
+    Returns:
+        list: (old, new) record pairs for the changes made
+    """
+    changes = []
+    for reservation_id in entry.get("remove", ()):
+        old = index.discard(reservation_id)
+        if old is not None:
+            changes.append((old, None))
+    for record in entry.get("put", ()):
+        changes.append((index.add(record), record))
+    return changes
+
+
+class JsonReservationStore(ReservationStore):
+    """
+    All reservations in one JSON list, the original data/reservations.json layout.
+
+    With group commit on, writes are appended to a write-ahead log next to
+    the file ("<file>.wal") instead of rewriting it. Concurrent writes
+    share one fsync, and a write is acknowledged once its log entry is
+    durable. The log is folded back into the file when it grows past
+    RESERVATION_WAL_CHECKPOINT_BYTES, on flush() and at interpreter exit,
+    and replayed on load.
+    """
+
+    def __init__(self, file_path=RESERVATIONS_FILE, group_commit_ms=0):
+        """
+        Initialize the store.
+
+        Args:
+            file_path (str): Reservation JSON file
+            group_commit_ms (float): Commit window in milliseconds; 0 writes
+                the whole file on every change, as before
+        """
+        super().__init__(file_path)
+        self.file_path = file_path
+        self._index = ReservationIndex()
+        self._signature = False  # Never loaded
+        self._wal = None
+        if group_commit_ms and group_commit_ms > 0:
+            self._wal = WriteAheadLog(f"{file_path}.wal", window=group_commit_ms / 1000)
+            atexit.register(self.close)
+
+    def _current_signature(self):
+        if self._wal is None:
+            return file_signature(self.file_path)
+        return (file_signature(self.file_path), file_signature(self._wal.path))
+
+    def refresh(self):
+        with self.lock:
+            signature = self._current_signature()
+            if signature == self._signature:
+                return
+            records = (load_json_file(self.file_path) if os.path.exists(self.file_path) else None) or []
+            index = ReservationIndex(records)
+            if self._wal is not None:
+                for entry in self._wal.read():
+                    _apply_entry(index, entry)
+            self._index = index
+            self._signature = signature
+            self._changed(None, None)
+
+    def _indexes(self, months=None):
+        return (self._index,)
+
+    def _persist(self, records, removed_ids=()):
+        if self._wal is not None:
+            return self._log(records, removed_ids)
+        by_id = dict(self._index.by_id)
+        for record_id in removed_ids:
+            by_id.pop(record_id, None)
+        for record in records:
+            by_id[record["id"]] = record
+        if not save_json_file(self.file_path, list(by_id.values())):
+            return False
+        # Bring the index up to date with the changes instead of rebuilding it
+        for record_id in removed_ids:
+            old = self._index.discard(record_id)
+            if old is not None:
+                self._changed(old, None)
+        for record in records:
+            self._changed(self._index.add(record), record)
+        self._signature = file_signature(self.file_path)
+        return True
+
+    def _log(self, records, removed_ids):
+        entry = {"put": records, "remove": sorted(removed_ids)}
+        try:
+            ticket = self._wal.append(entry)
+        except OSError as e:
+            logger.error(f"Failed to append to {self._wal.path}: {e}")
+            return False
+        for old, new in _apply_entry(self._index, entry):
+            self._changed(old, new)
+        self._signature = self._current_signature()
+        if self._wal.size() > RESERVATION_WAL_CHECKPOINT_BYTES:
+            self.flush()
+        self._durable_later(ticket)
+        return True
+
+    def _wait_durable(self, ticket):
+        try:
+            self._wal.commit(ticket)
+        except OSError:
+            with self.lock:
+                self._signature = False  # Reload what actually reached the disk
+            raise
+
+    def flush(self):
+        """
+        Fold the write-ahead log into the reservation file and empty it.
+
+        Returns:
+            bool: True if the log was folded in (or there is none), False otherwise
+        """
+        if self._wal is None:
+            return True
+        with file_lock(self.lock_path):
+            with self.lock:
+                self.refresh()
+                if self._wal.size() == 0:
+                    return True
+                if not save_json_file(self.file_path, list(self._index.by_id.values())):
+                    return False
+                self._wal.truncate()
+                self._signature = self._current_signature()
+                return True
+
+    def close(self):
+        """Flush the write-ahead log on shutdown; registered with atexit."""
+        if self._wal is None:
+            return
+        atexit.unregister(self.close)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Failed to flush {self._wal.path} on shutdown: {e}")
+        self._wal.close()
+
+
+class PartitionedReservationStore(ReservationStore):
+    """
+    Reservations split into one JSON file per month of the reservation date,
+    listed in a small manifest.
+
+    Looking up a date only reads that month's file. Looking up an ID reads
+    the small ID files of the months until one lists it, then that month's
+    file; each ID file is rewritten only with its partition, so a write
+    rewrites only the months it touches and the manifest. Past months can
+    be moved out of the hot set with archive_partitions(). Each month
+    loaded has its own ReservationIndex, so lookups by customer cost one
+    dict lookup per month.
+
+    Layout of the directory:
+        manifest.json               {"version", "partitions": {month: {"file", "count"}}, "archived": [...]}
+        partitions/YYYY-MM.json     reservations whose date falls in that month
+        partitions/YYYY-MM.ids.json IDs of the reservations in that month
+    """
+
+    def __init__(self, directory=RESERVATIONS_DIR):
+        """
+        Initialize the store.
+
+        Args:
+            directory (str): Directory holding the manifest and partitions
+        """
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        super().__init__(self.manifest_path)
+        self._manifest = {"version": MANIFEST_VERSION, "partitions": {}, "archived": []}
+        self._manifest_signature = False
+        self._partitions = {}     # month -> ReservationIndex, only the months read so far
+        self._signatures = {}     # month -> signature of the partition file when read
+        self._month_ids = {}      # month -> IDs from its ID file, for months not loaded
+        self._id_signatures = {}  # month -> signature of the ID file when read
+
+    def _partition_path(self, month):
+        return os.path.join(self.directory, "partitions", f"{month}.json")
+
+    def _ids_path(self, month):
+        return os.path.join(self.directory, "partitions", f"{month}.ids.json")
+
+    def refresh(self):
+        with self.lock:
+            signature = file_signature(self.manifest_path)
+            if signature == self._manifest_signature:
+                return
+            manifest = load_json_file(self.manifest_path) if signature else None
+            self._manifest = manifest or {"version": MANIFEST_VERSION, "partitions": {}, "archived": []}
+            self._manifest_signature = signature
+            # Forget months that are gone or were rewritten by someone else
+            for month in list(self._partitions):
+                if (month not in self._manifest["partitions"]
+                        or file_signature(self._partition_path(month)) != self._signatures.get(month)):
+                    del self._partitions[month]
+                    self._signatures.pop(month, None)
+            for month in list(self._month_ids):
+                if (month not in self._manifest["partitions"]
+                        or file_signature(self._ids_path(month)) != self._id_signatures.get(month)):
+                    del self._month_ids[month]
+                    self._id_signatures.pop(month, None)
+            self._changed(None, None)
+
+    def months(self):
+        """
+        Get the months that have a hot partition.
+
+        Returns:
+            list: "YYYY-MM" strings, oldest first
+        """
+        with self.lock:
+            self.refresh()
+            return sorted(self._manifest["partitions"])
+
+    def _partition(self, month):
+        partition = self._partitions.get(month)
+        if partition is None:
+            records = []
+            if month in self._manifest["partitions"]:
+                path = self._partition_path(month)
+                self._signatures[month] = file_signature(path)
+                records = load_json_file(path) or []
+            partition = self._partitions[month] = ReservationIndex(records)
+        return partition
+
+    def _indexes(self, months=None):
+        for month in sorted(self._manifest["partitions"]) if months is None else months:
+            if month in self._manifest["partitions"]:
+                yield self._partition(month)
+
+    def _ids_in(self, month):
+        """IDs in a month, from its partition if loaded, else from its ID file."""
+        partition = self._partitions.get(month)
+        if partition is not None:
+            return partition.by_id
+        ids = self._month_ids.get(month)
+        if ids is None:
+            path = self._ids_path(month)
+            signature = file_signature(path)
+            if signature is None:
+                # Partitions written before the ID files: read the partition itself
+                return self._partition(month).by_id
+            ids = self._month_ids[month] = frozenset(load_json_file(path) or [])
+            self._id_signatures[month] = signature
+        return ids
+
+    def _month_of(self, reservation_id):
+        # Newest months first: most lookups are for upcoming reservations
+        for month in sorted(self._manifest["partitions"], reverse=True):
+            if reservation_id in self._ids_in(month):
+                return month
+        return None
+
+    def get(self, reservation_id):
+        with self.lock:
+            self.refresh()
+            month = self._month_of(reservation_id)
+            record = self._partition(month).by_id.get(reservation_id) if month else None
+            return dict(record) if record is not None else None
+
+    def _persist(self, records, removed_ids=()):
+        # month -> {id: record} for every month that changes
+        changed = {}
+
+        def month_records(month):
+            if month not in changed:
+                changed[month] = dict(self._partition(month).by_id)
+            return changed[month]
+
+        for record_id in removed_ids:
+            month = self._month_of(record_id)
+            if month is not None:
+                month_records(month).pop(record_id, None)
+        for record in records:
+            # A changed date can move a reservation to another month
+            old_month = self._month_of(record["id"])
+            new_month = partition_key(record)
+            if old_month is not None and old_month != new_month:
+                month_records(old_month).pop(record["id"], None)
+            month_records(new_month)[record["id"]] = record
+
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "partitions": dict(self._manifest["partitions"]),
+            "archived": list(self._manifest.get("archived", []))
+        }
+        os.makedirs(os.path.join(self.directory, "partitions"), exist_ok=True)
+        for month, partition in changed.items():
+            path = self._partition_path(month)
+            self._month_ids.pop(month, None)
+            self._id_signatures.pop(month, None)
+            if partition:
+                # The ID file goes first: listing an ID that is not saved yet only costs a wasted read
+                if not save_json_file(self._ids_path(month), sorted(partition)):
+                    return False
+                if not save_json_file(path, list(partition.values())):
+                    return False
+                manifest["partitions"][month] = {"file": os.path.relpath(path, self.directory), "count": len(partition)}
+            else:
+                manifest["partitions"].pop(month, None)
+                for stale in (path, self._ids_path(month)):
+                    if os.path.exists(stale):
+                        os.remove(stale)
+
+        # The manifest goes last, so it never lists a partition that was not written
+        if not save_json_file(self.manifest_path, manifest):
+            return False
+        self._manifest = manifest
+        self._manifest_signature = file_signature(self.manifest_path)
+        for month, partition in changed.items():
+            index = self._partition(month)
+            for record_id in set(index.by_id) - set(partition):
+                self._changed(index.discard(record_id), None)
+            for record in partition.values():
+                if index.by_id.get(record["id"]) is not record:
+                    self._changed(index.add(record), record)
+            if partition:
+                self._signatures[month] = file_signature(self._partition_path(month))
+            else:
+                self._partitions.pop(month, None)
+                self._signatures.pop(month, None)
+        return True
+
+    def archive_partitions(self, before_month, archive_dir=None):
+        """
+        Move the partitions of months before a given one out of the hot set.
+
+        The partition files are moved to an archive directory and listed
+        under "archived" in the manifest; they are no longer read by
+        lookups.
+
+        Args:
+            before_month (str): First month to keep, "YYYY-MM"
+            archive_dir (str, optional): Where to move the files; defaults
+                to <directory>/archive
+
+        Returns:
+            list: The months archived, or None if the manifest could not be
+                saved (the partitions are then left in place)
+        """
+        archive_dir = archive_dir or os.path.join(self.directory, "archive")
+        with self.locked():
+            months = [month for month in sorted(self._manifest["partitions"]) if month < before_month]
+            if not months:
+                return []
+            os.makedirs(archive_dir, exist_ok=True)
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "partitions": dict(self._manifest["partitions"]),
+                "archived": list(self._manifest.get("archived", []))
+            }
+            moved = []
+            for month in months:
+                target = os.path.join(archive_dir, f"{month}.json")
+                os.replace(self._partition_path(month), target)
+                moved.append((month, target))
+                entry = manifest["partitions"].pop(month)
+                manifest["archived"].append({"month": month, "file": os.path.relpath(target, self.directory),
+                                             "count": entry["count"]})
+            if not save_json_file(self.manifest_path, manifest):
+                # The old manifest still lists the partitions: put them back
+                for month, target in moved:
+                    os.replace(target, self._partition_path(month))
+                logger.error(f"Failed to save the manifest; partitions {months} were not archived")
+                return None
+            for month in months:
+                self._partitions.pop(month, None)
+                self._signatures.pop(month, None)
+                self._month_ids.pop(month, None)
+                self._id_signatures.pop(month, None)
+                if os.path.exists(self._ids_path(month)):
+                    os.remove(self._ids_path(month))
+            self._manifest = manifest
+            self._manifest_signature = file_signature(self.manifest_path)
+            self._changed(None, None)
+            logger.info(f"Archived reservation partitions {months}")
+            return months
+
+
+def create_store(backend=RESERVATION_BACKEND, file_path=RESERVATIONS_FILE, directory=RESERVATIONS_DIR):
+    """
+    Create a reservation store.
+
+    Args:
+        backend (str): "json" (one file) or "partitioned" (monthly files)
+        file_path (str): File for the json backend
+        directory (str): Directory for the partitioned backend
+
+    Returns:
+        ReservationStore: The store
+    """
+    if backend == "json":
+        return JsonReservationStore(file_path, group_commit_ms=RESERVATION_GROUP_COMMIT_MS)
+    if backend == "partitioned":
+        return PartitionedReservationStore(directory)
+    raise ValueError(f"Unknown reservation backend: {backend}")
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """
+    Get the process-wide reservation store configured by RESERVATION_BACKEND.
+
+    Returns:
+        ReservationStore: The shared store
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = create_store()
+        return _store
+
+
+def migrate(source, target):
+    """
+    Copy every reservation from one store to another in a single write.
+
+    Args:
+        source (ReservationStore): Store to read
+        target (ReservationStore): Store to write
+
+    Returns:
+        int: Number of reservations copied
+    """
+    reservations = source.all()
+    with target.locked():
+        if not target.put_many(reservations):
+            raise IOError("Failed to write the migrated reservations")
+    return len(reservations)
+
+
+def main(argv=None):
+    """Command line entry point: python -m tools.reservation_store ..."""
+    parser = argparse.ArgumentParser(description="Manage reservation storage")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = commands.add_parser("migrate", help="Copy reservations between backends")
+    migrate_parser.add_argument("--from", dest="source", choices=["json", "partitioned"], default="json")
+    migrate_parser.add_argument("--to", dest="target", choices=["json", "partitioned"], default="partitioned")
+    migrate_parser.add_argument("--file", default=RESERVATIONS_FILE, help="File of the json backend")
+    migrate_parser.add_argument("--dir", default=RESERVATIONS_DIR, help="Directory of the partitioned backend")
+
+    archive_parser = commands.add_parser("archive", help="Move months before a given one out of the hot set")
+    archive_parser.add_argument("before", help="First month to keep, YYYY-MM")
+    archive_parser.add_argument("--dir", default=RESERVATIONS_DIR, help="Directory of the partitioned backend")
+
+    args = parser.parse_args(argv)
+    if args.command == "migrate":
+        if args.source == args.target:
+            parser.error("--from and --to must differ")
+        source = create_store(args.source, args.file, args.dir)
+        target = create_store(args.target, args.file, args.dir)
+        count = migrate(source, target)
+        print(f"Migrated {count} reservations from {args.source} to {args.target}")
+    elif args.command == "archive":
+        months = PartitionedReservationStore(args.dir).archive_partitions(args.before)
+        if months is None:
+            print("Failed to save the manifest; nothing was archived", file=sys.stderr)
+            return 1
+        print(f"Archived {len(months)} partitions: {', '.join(months) or 'none'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,14 +2,55 @@
 
 import json
 import datetime
+import functools
+import random
+from time import sleep
 from pathlib import Path
 import sys
 
 # Add parent directory to path so we can import from other modules
 sys.path.append(str(Path(__file__).parent.parent))
 
-from config import RESTAURANTS_FILE, RESERVATIONS_FILE
-from utils.helpers import load_json_file, save_json_file, generate_id, is_valid_date_format, is_valid_time_format
+from config import RESTAURANTS_FILE
+from utils.helpers import load_json_file, generate_id, is_valid_date_format, is_valid_time_format
+from tools.registry import register_tool
+from tools.reservation_store import get_store, normalize_name, record_version, VersionConflict
+from tools.reservation_archive import get_archive
+from tools.occupancy import table_type_for, get_availability_view
+from tools.table_allocator import table_capacities, allocate, can_seat, main_table_type, record_allocation
+from utils.singleflight import SingleFlight, make_key
+from utils.file_lock import LockTimeout
+from utils.metrics import REGISTRY
+
+# Attempts at a modification whose reservation keeps changing underneath, and
+# the base of the random delay between them, in seconds
+MODIFY_ATTEMPTS = 3
+MODIFY_RETRY_DELAY = 0.005
+
+RESERVATION_CONFLICTS = REGISTRY.counter(
+    "foodiespot_reservation_conflicts_total",
+    "Reservation modifications that lost a compare-and-swap by outcome")
+
+# Coalesces identical booking requests that arrive while the first is still being written
+_reservation_flight = SingleFlight("reservations")
+
+def _reservations_locked(function):
+    """
+    Run a read-modify-write of the reservation store while holding its lock,
+    so concurrent writers (other threads or Streamlit processes) cannot
+    overwrite each other's changes.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        try:
+            with get_store().locked():
+                return function(*args, **kwargs)
+        except LockTimeout:
+            return {"success": False, "error": "The reservation system is busy. Please try again in a moment."}
+        except OSError:
+            # With group commit the write is made durable when the lock is released
+            return {"success": False, "error": "Failed to save the reservation. Please try again."}
+    return wrapper
 
 def search_restaurants(location=None, cuisine=None, min_capacity=None, features=None, price_range=None):
     """
@@ -59,6 +100,15 @@ def search_restaurants(location=None, cuisine=None, min_capacity=None, features=
     
     return results
 
+@register_tool(
+    description="Get a list of all available cuisine types",
+    parameters={
+        "type": "object",
+        "properties": {},
+        "required": []
+    },
+    read_only=True
+)
 def get_cuisines():
     """
     Get a list of all available cuisine types.
@@ -74,6 +124,15 @@ def get_cuisines():
     
     return sorted(list(cuisines))
 
+@register_tool(
+    description="Get a list of all available restaurant locations",
+    parameters={
+        "type": "object",
+        "properties": {},
+        "required": []
+    },
+    read_only=True
+)
 def get_locations():
     """
     Get a list of all available restaurant locations.
@@ -89,6 +148,15 @@ def get_locations():
     
     return sorted(list(locations))
 
+@register_tool(
+    description="Get a list of all available restaurant features",
+    parameters={
+        "type": "object",
+        "properties": {},
+        "required": []
+    },
+    read_only=True
+)
 def get_features():
     """
     Get a list of all available restaurant features.
@@ -105,6 +173,38 @@ def get_features():
     
     return sorted(list(features))
 
+@register_tool(
+    description="Check if a restaurant has availability for a specific date, time, and party size",
+    parameters={
+        "type": "object",
+        "properties": {
+            "restaurant_id": {
+                "type": "string",
+                "description": "Unique identifier of the restaurant"
+            },
+            "date": {
+                "type": "string",
+                "description": "Date for reservation (YYYY-MM-DD format)"
+            },
+            "time": {
+                "type": "string",
+                "description": "Time for reservation (HH:MM format, 24-hour)"
+            },
+            "party_size": {
+                "type": "integer",
+                "description": "Number of people in the party",
+                "minimum": 1
+            }
+        },
+        "required": [
+            "restaurant_id",
+            "date",
+            "time",
+            "party_size"
+        ]
+    },
+    read_only=True
+)
 def check_availability(restaurant_id, date, time, party_size):
     """
     Check if a restaurant has availability for a party.
@@ -115,6 +215,23 @@ def check_availability(restaurant_id, date, time, party_size):
         time (str): Time in HH:MM format
         party_size (int): Number of people
         
+    Returns:
+        dict: Result with availability status and details
+    """
+    return _check_availability(restaurant_id, date, time, party_size)
+
+def _check_availability(restaurant_id, date, time, party_size, release=None):
+    """
+    Check availability as check_availability() does, optionally counting the
+    table of a reservation being changed as free.
+    
+    Args:
+        restaurant_id (str): ID of the restaurant
+        date (str): Date in YYYY-MM-DD format
+        time (str): Time in HH:MM format
+        party_size (int): Number of people
+        release (dict, optional): Reservation whose own table may be reused
+        
     Returns:
         dict: Result with availability status and details
     """
@@ -143,6 +260,31 @@ def check_availability(restaurant_id, date, time, party_size):
     if not restaurant:
         return {"available": False, "error": f"Restaurant with ID {restaurant_id} not found."}
     
+    return _availability_for(restaurant, date, time, party_size, release)
+
+def seating_error(restaurant, party_size, date, time):
+    """
+    Explain why a party could not be given tables.
+    
+    Args:
+        restaurant (dict): Restaurant record
+        party_size (int): Number of people
+        date (str): Date in YYYY-MM-DD format
+        time (str): Time in HH:MM format
+        
+    Returns:
+        str: Error message
+    """
+    capacities = table_capacities(restaurant)
+    total = {table_type: table.get("count", 0) for table_type, table in restaurant["tables"].items()}
+    if can_seat(party_size, total, capacities):
+        return f"No tables left for a party of {party_size} at {time} on {date}."
+    if party_size > max(capacities.values(), default=0):
+        return "Party size exceeds maximum table capacity."
+    return "No tables available for this party size."
+
+def _availability_for(restaurant, date, time, party_size, release=None):
+    """Check a restaurant's hours and free tables for a party; see _check_availability()."""
     # Check restaurant hours
     restaurant_open = restaurant["hours"]["open"]
     restaurant_close = restaurant["hours"]["close"]
@@ -153,33 +295,71 @@ def check_availability(restaurant_id, date, time, party_size):
             "error": f"Restaurant is not open at {time}. Hours: {restaurant_open} - {restaurant_close}"
         }
     
-    # For this simplified version, we'll just check if party size fits in any table
-    # In a real system, you'd check against existing reservations
-    
-    # Find appropriate table size
-    table_type = None
-    if party_size <= 2:
-        table_type = "small"
-    elif party_size <= 4:
-        table_type = "medium"
-    elif party_size <= 8:
-        table_type = "large"
-    else:
-        return {"available": False, "error": "Party size exceeds maximum table capacity."}
+    # Free tables for the length of the booking, counting the tables of the reservation being changed as free
+    capacities = table_capacities(restaurant)
+    free = get_availability_view().free_tables(restaurant, date, time, release)
     
-    # Check if that table type is available
-    if restaurant["tables"][table_type]["count"] > 0:
-        return {
-            "available": True,
-            "restaurant_name": restaurant["name"],
-            "table_type": table_type,
-            "party_size": party_size,
-            "date": date,
-            "time": time
-        }
-    else:
-        return {"available": False, "error": "No tables available for this party size."}
+    # Pick a table, or push smaller tables together
+    tables = allocate(party_size, free, capacities)
+    if tables is None:
+        return {"available": False, "error": seating_error(restaurant, party_size, date, time)}
     
+    table_type = main_table_type(tables, capacities)
+    return {
+        "available": True,
+        "restaurant_name": restaurant["name"],
+        "table_type": table_type,
+        "tables": tables,
+        "tables_remaining": free[table_type],
+        "party_size": party_size,
+        "date": date,
+        "time": time
+    }
+    
+@register_tool(
+    description="Search for and recommend restaurants based on user preferences with fallback options if initial search yields no results",
+    parameters={
+        "type": "object",
+        "properties": {
+            "party_size": {
+                "type": "integer",
+                "description": "Number of people in the party",
+                "minimum": 1
+            },
+            "date": {
+                "type": "string",
+                "description": "Date for the reservation (YYYY-MM-DD format)"
+            },
+            "time": {
+                "type": "string",
+                "description": "Time for the reservation (HH:MM format, 24-hour)"
+            },
+            "location": {
+                "type": "string",
+                "description": "Preferred area or neighborhood"
+            },
+            "cuisine": {
+                "type": "string",
+                "description": "Type of cuisine preferred"
+            },
+            "price_range": {
+                "type": "string",
+                "description": "Price range ($ for budget, $$ for mid-range, $$$ for high-end)"
+            },
+            "features": {
+                "type": "string",
+                "description": "Comma-separated list of desired features (e.g., 'outdoor seating, kid-friendly')"
+            },
+            "limit": {
+                "type": "integer",
+                "description": "Number of top restaurants to return based on rating (default: 5)",
+                "minimum": 1
+            }
+        },
+        "required": []
+    },
+    read_only=True
+)
 def recommend_restaurants(party_size=None, date=None, time=None, location=None, 
                          cuisine=None, price_range=None, features=None, limit=5,
                          fallback_search=True):
@@ -261,15 +441,10 @@ def recommend_restaurants(party_size=None, date=None, time=None, location=None,
     
     # If date and time are provided, filter by availability
     available_restaurants = []
-    if date and time and party_size:
+    if date and time and party_size and is_valid_date_format(date) and is_valid_time_format(time):
         for restaurant in results:
-            # Check availability
-            availability = check_availability(
-                restaurant_id=restaurant["id"],
-                date=date,
-                time=time,
-                party_size=party_size
-            )
+            # Check availability against the availability view
+            availability = _availability_for(restaurant, date, time, int(party_size))
             
             # Add to available restaurants if available
             if availability.get("available", False):
@@ -306,6 +481,54 @@ def recommend_restaurants(party_size=None, date=None, time=None, location=None,
         "available_count": len(available_restaurants) if filtered_by_availability else None
     }    
     
+@register_tool(
+    description="Create a new restaurant reservation",
+    parameters={
+        "type": "object",
+        "properties": {
+            "restaurant_id": {
+                "type": "string",
+                "description": "Unique identifier of the restaurant"
+            },
+            "customer_name": {
+                "type": "string",
+                "description": "Full name of the customer"
+            },
+            "party_size": {
+                "type": "integer",
+                "description": "Number of people in the party",
+                "minimum": 1
+            },
+            "reservation_date": {
+                "type": "string",
+                "description": "Date of reservation (YYYY-MM-DD format)"
+            },
+            "reservation_time": {
+                "type": "string",
+                "description": "Time of reservation (HH:MM format, 24-hour)"
+            },
+            "customer_email": {
+                "type": "string",
+                "description": "Email address of the customer (optional)"
+            },
+            "customer_phone": {
+                "type": "string",
+                "description": "Phone number of the customer (optional)"
+            },
+            "special_requests": {
+                "type": "string",
+                "description": "Any special requests or notes for the reservation (optional)"
+            }
+        },
+        "required": [
+            "restaurant_id",
+            "customer_name",
+            "party_size",
+            "reservation_date",
+            "reservation_time"
+        ]
+    }
+)
 def create_reservation(restaurant_id, customer_name, party_size, reservation_date, 
                      reservation_time, customer_email=None, customer_phone=None, 
                      special_requests=None):
@@ -323,32 +546,68 @@ def create_reservation(restaurant_id, customer_name, party_size, reservation_dat
         special_requests (str, optional): Special requests
         
     Returns:
-        dict: The created reservation or error information
+        dict: The created reservation or error information. Asking for a
+            booking that already exists returns the existing reservation
+            with "already_exists" set, so retries cannot double-book.
     """
-    # First check availability
-    availability = check_availability(restaurant_id, reservation_date, reservation_time, party_size)
-    
-    if not availability["available"]:
-        return {"success": False, "error": availability.get("error", "No availability")}
-    
-    # Find the restaurant to get its name
-    restaurants = load_json_file(RESTAURANTS_FILE)
-    restaurant_name = ""
-    for r in restaurants:
-        if r["id"] == restaurant_id:
-            restaurant_name = r["name"]
-            break
+    key = reservation_key(restaurant_id, customer_name, party_size, reservation_date, reservation_time)
+    # Identical requests running at the same time share one write
+    return _reservation_flight.do(
+        key, _create_reservation, key, restaurant_id, customer_name, party_size, reservation_date,
+        reservation_time, customer_email, customer_phone, special_requests)
+
+def reservation_key(restaurant_id, customer_name, party_size, reservation_date, reservation_time):
+    """
+    Build the key identifying a booking request, for idempotent creation.
     
-    # Determine table type
-    if int(party_size) <= 2:
-        table_type = "small"
-    elif int(party_size) <= 4:
-        table_type = "medium"
-    else:
-        table_type = "large"
+    Args:
+        restaurant_id (str): ID of the restaurant
+        customer_name (str): Name of the customer
+        party_size (int): Number of people
+        reservation_date (str): Date in YYYY-MM-DD format
+        reservation_time (str): Time in HH:MM format
+        
+    Returns:
+        str: The key; the name is compared case- and whitespace-insensitively
+    """
+    name = normalize_name(customer_name)
+    return make_key(str(restaurant_id), name, str(party_size).strip(), reservation_date, reservation_time)
+
+def _find_reservation_by_key(reservations, key):
+    for reservation in reservations:
+        if reservation.get("status") != "cancelled" and key == reservation_key(
+                reservation["restaurant_id"], reservation.get("customer_name"), reservation["party_size"],
+                reservation["reservation_date"], reservation["reservation_time"]):
+            return reservation
+    return None
+
+def new_reservation_record(restaurant_id, restaurant_name, customer_name, party_size, reservation_date,
+                           reservation_time, customer_email=None, customer_phone=None, special_requests=None,
+                           now=None, table_type=None, tables=None):
+    """
+    Build a confirmed reservation record with a new ID.
     
-    # Create reservation object
-    now = datetime.datetime.now().isoformat()
+    Args:
+        restaurant_id (str): ID of the restaurant
+        restaurant_name (str): Name of the restaurant
+        customer_name (str): Name of the customer
+        party_size (int): Number of people
+        reservation_date (str): Date in YYYY-MM-DD format
+        reservation_time (str): Time in HH:MM format
+        customer_email (str, optional): Customer's email
+        customer_phone (str, optional): Customer's phone number
+        special_requests (str, optional): Special requests
+        now (str, optional): ISO timestamp for created_at/updated_at; defaults to now
+        table_type (str, optional): Biggest table type assigned; defaults to
+            the type a party of that size sits at
+        tables (dict, optional): Table type -> tables assigned; defaults to
+            one table of table_type
+        
+    Returns:
+        dict: The reservation record
+    """
+    now = now or datetime.datetime.now().isoformat()
+    table_type = table_type or table_type_for(int(party_size)) or "large"
     reservation = {
         "id": generate_id("res"),
         "restaurant_id": restaurant_id,
@@ -358,7 +617,9 @@ def create_reservation(restaurant_id, customer_name, party_size, reservation_dat
         "reservation_date": reservation_date,
         "reservation_time": reservation_time,
         "table_type": table_type,
+        "tables": tables or {table_type: 1},
         "status": "confirmed",
+        "version": 1,
         "created_at": now,
         "updated_at": now
     }
@@ -370,39 +631,96 @@ def create_reservation(restaurant_id, customer_name, party_size, reservation_dat
         reservation["customer_phone"] = customer_phone
     if special_requests:
         reservation["special_requests"] = special_requests
+    return reservation
+
+@_reservations_locked
+def _create_reservation(key, restaurant_id, customer_name, party_size, reservation_date,
+                        reservation_time, customer_email, customer_phone, special_requests):
+    """Create the reservation unless one with the same key exists; see create_reservation()."""
+    store = get_store()
+    # Only bookings for the same restaurant and date can share the key
+    existing = _find_reservation_by_key(store.for_date(reservation_date, restaurant_id), key)
+    if existing:
+        return {"success": True, "reservation": existing, "already_exists": True}
     
-    # Save the reservation
-    reservations = load_json_file(RESERVATIONS_FILE)
-    if not reservations:
-        reservations = []
+    # First check availability
+    availability = check_availability(restaurant_id, reservation_date, reservation_time, party_size)
+    
+    if not availability["available"]:
+        return {"success": False, "error": availability.get("error", "No availability")}
+    
+    # Find the restaurant to get its name
+    restaurants = load_json_file(RESTAURANTS_FILE)
+    restaurant = None
+    for r in restaurants:
+        if r["id"] == restaurant_id:
+            restaurant = r
+            break
     
-    reservations.append(reservation)
-    success = save_json_file(RESERVATIONS_FILE, reservations)
+    # Create reservation object with the tables chosen by the availability check
+    reservation = new_reservation_record(
+        restaurant_id, restaurant["name"], customer_name, party_size, reservation_date,
+        reservation_time, customer_email, customer_phone, special_requests,
+        table_type=availability["table_type"], tables=availability["tables"])
+    
+    # Save the reservation
+    if not store.put(reservation):
+        return {"success": False, "error": "Failed to save the reservation."}
     
+    record_allocation(reservation["party_size"], reservation["tables"], table_capacities(restaurant))
     return {"success": True, "reservation": reservation}
 
+@register_tool(
+    description="Get information about a specific reservation by ID",
+    parameters={
+        "type": "object",
+        "properties": {
+            "reservation_id": {
+                "type": "string",
+                "description": "Unique identifier of the reservation"
+            }
+        },
+        "required": [
+            "reservation_id"
+        ]
+    },
+    read_only=True
+)
 def get_reservation(reservation_id):
     """
-    This is a placeholder. In a real application, this would retrieve a reservation from storage.
-    For this simplified example, we'll just return a dummy reservation.
+    Get a reservation by ID, looking in the archive if it is no longer in the store.
     
     Args:
         reservation_id (str): ID of the reservation
         
     Returns:
-        dict: The reservation information
+        dict: The reservation information; "archived" is True for archived reservations
     """
-    reservations = load_json_file(RESERVATIONS_FILE)
+    reservation = get_store().get(reservation_id)
+    if reservation:
+        return {"success": True, "reservation": reservation}
     
-    if not reservations:
-        return {"success": False, "error": "No reservations found."}
-    
-    for reservation in reservations:
-        if reservation["id"] == reservation_id:
-            return {"success": True, "reservation": reservation}
+    reservation = get_archive().get(reservation_id)
+    if reservation:
+        return {"success": True, "reservation": reservation, "archived": True}
     
     return {"success": False, "error": f"Reservation {reservation_id} not found."}
 
+@register_tool(
+    description="Cancel an existing restaurant reservation",
+    parameters={
+        "type": "object",
+        "properties": {
+            "reservation_id": {
+                "type": "string",
+                "description": "Unique identifier of the reservation"
+            }
+        },
+        "required": [
+            "reservation_id"
+        ]
+    }
+)
 def cancel_reservation(reservation_id):
     """
     Cancel a reservation by ID.
@@ -425,11 +743,60 @@ def cancel_reservation(reservation_id):
     else:
         return result
 
+@register_tool(
+    description="Modify an existing restaurant reservation",
+    parameters={
+        "type": "object",
+        "properties": {
+            "reservation_id": {
+                "type": "string",
+                "description": "Unique identifier of the reservation"
+            },
+            "party_size": {
+                "type": "integer",
+                "description": "New number of people in the party (optional)",
+                "minimum": 1
+            },
+            "reservation_date": {
+                "type": "string",
+                "description": "New date of reservation (YYYY-MM-DD format) (optional)"
+            },
+            "reservation_time": {
+                "type": "string",
+                "description": "New time of reservation (HH:MM format, 24-hour) (optional)"
+            },
+            "special_requests": {
+                "type": "string",
+                "description": "New special requests or notes for the reservation (optional)"
+            },
+            "status": {
+                "type": "string",
+                "description": "New status for the reservation (confirmed, pending, cancelled) (optional)",
+                "enum": [
+                    "confirmed",
+                    "pending",
+                    "cancelled"
+                ]
+            }
+        },
+        "required": [
+            "reservation_id"
+        ]
+    }
+)
 def modify_reservation(reservation_id, party_size=None, reservation_date=None, 
-                      reservation_time=None, special_requests=None, status=None):
+                      reservation_time=None, special_requests=None, status=None,
+                      expected_version=None):
     """
     Modify an existing reservation.
     
+    Changes are saved with compare-and-swap on the reservation's version:
+    if another request changes the same reservation in the meantime, the
+    modification is re-applied to the new version, up to MODIFY_ATTEMPTS
+    times, instead of overwriting it. The new tables are checked and
+    saved under the store lock, so two changes cannot both take the last
+    free table.
+    
     Args:
         reservation_id (str): ID of the reservation
         party_size (int, optional): New party size
@@ -437,9 +804,12 @@ def modify_reservation(reservation_id, party_size=None, reservation_date=None,
         reservation_time (str, optional): New time (HH:MM)
         special_requests (str, optional): New special requests
         status (str, optional): New status (confirmed, pending, cancelled)
+        expected_version (int, optional): Only modify the reservation if it
+            is still at this version; a mismatch is reported, not retried
         
     Returns:
-        dict: Result of the modification
+        dict: Result of the modification; "conflict" is set when the
+            reservation kept changing underneath
     """
     # Input validation
     if reservation_date and not is_valid_date_format(reservation_date):
@@ -454,36 +824,65 @@ def modify_reservation(reservation_id, party_size=None, reservation_date=None,
         except ValueError:
             return {"success": False, "error": "Party size must be a number."}
     
-    # Load all reservations
-    reservations = load_json_file(RESERVATIONS_FILE)
-    
-    if not reservations:
-        return {"success": False, "error": "No reservations found."}
+    attempts = 1 if expected_version is not None else MODIFY_ATTEMPTS
+    for attempt in range(attempts):
+        try:
+            return _modify_reservation(reservation_id, party_size, reservation_date, reservation_time,
+                                       special_requests, status, expected_version)
+        except VersionConflict:
+            RESERVATION_CONFLICTS.inc(outcome="retried" if attempt + 1 < attempts else "failed")
+            if attempt + 1 < attempts:
+                sleep(random.uniform(0, MODIFY_RETRY_DELAY * (attempt + 1)))
+        except LockTimeout:
+            return {"success": False, "error": "The reservation system is busy. Please try again in a moment."}
+        except OSError:
+            return {"success": False, "error": "Failed to save reservation changes."}
     
+    return {
+        "success": False,
+        "conflict": True,
+        "error": f"Reservation {reservation_id} was changed by another request. Please check it and try again."
+    }
+
+def _modify_reservation(reservation_id, party_size, reservation_date, reservation_time,
+                        special_requests, status, expected_version):
+    """Apply one modification attempt; see modify_reservation()."""
     # Find the reservation to modify
-    reservation_index = None
-    for i, reservation in enumerate(reservations):
-        if reservation["id"] == reservation_id:
-            reservation_index = i
-            break
+    store = get_store()
+    current_reservation = store.get(reservation_id)
     
-    if reservation_index is None:
+    if current_reservation is None:
         return {"success": False, "error": f"Reservation {reservation_id} not found."}
     
-    # Get the current reservation
-    current_reservation = reservations[reservation_index]
+    version = record_version(current_reservation)
+    if expected_version is not None and version != expected_version:
+        raise VersionConflict(f"Reservation {reservation_id} is at version {version}, not {expected_version}")
     
-    # Check availability if changing date, time, or party size
-    if (reservation_date or reservation_time or party_size) and current_reservation["status"] != "cancelled":
+    # Check availability and save under one lock, so no other booking can take the tables in between
+    with store.locked():
+        return _apply_modification(store, current_reservation, version, party_size, reservation_date,
+                                   reservation_time, special_requests, status)
+
+def _apply_modification(store, current_reservation, version, party_size, reservation_date,
+                        reservation_time, special_requests, status):
+    """Check the new tables and save the change; called with the store lock held."""
+    # Check availability if changing date, time, or party size of a booking that will hold tables,
+    # or if a cancelled booking is taken up again
+    availability = None
+    reactivated = current_reservation["status"] == "cancelled" and status and status != "cancelled"
+    stays_active = current_reservation["status"] != "cancelled" and status != "cancelled"
+    if reactivated or (stays_active and (reservation_date or reservation_time or party_size)):
         check_date = reservation_date or current_reservation["reservation_date"]
         check_time = reservation_time or current_reservation["reservation_time"]
         check_party = party_size or current_reservation["party_size"]
         
-        availability = check_availability(
+        # The reservation's own tables can be kept
+        availability = _check_availability(
             current_reservation["restaurant_id"],
             check_date,
             check_time,
-            check_party
+            check_party,
+            release=current_reservation
         )
         
         if not availability["available"]:
@@ -492,13 +891,12 @@ def modify_reservation(reservation_id, party_size=None, reservation_date=None,
     # Apply modifications
     if party_size:
         current_reservation["party_size"] = party_size
-        # Update table type
-        if party_size <= 2:
-            current_reservation["table_type"] = "small"
-        elif party_size <= 4:
-            current_reservation["table_type"] = "medium"
-        else:
-            current_reservation["table_type"] = "large"
+    
+    # Update the tables to the ones the availability check assigned; a cancelled booking
+    # holds none, and is given tables again when it is taken up
+    if availability is not None:
+        current_reservation["table_type"] = availability["table_type"]
+        current_reservation["tables"] = availability["tables"]
     
     if reservation_date:
         current_reservation["reservation_date"] = reservation_date
@@ -515,10 +913,44 @@ def modify_reservation(reservation_id, party_size=None, reservation_date=None,
     # Update the timestamp
     current_reservation["updated_at"] = datetime.datetime.now().isoformat()
     
-    # Save the updated reservations
-    success = save_json_file(RESERVATIONS_FILE, reservations)
+    # Save the change unless someone else saved one first
+    saved = store.compare_and_put(current_reservation, version)
     
-    if success:
-        return {"success": True, "reservation": current_reservation}
+    if saved:
+        return {"success": True, "reservation": saved}
     else:
-        return {"success": False, "error": "Failed to save reservation changes."}
\ No newline at end of file
+        return {"success": False, "error": "Failed to save reservation changes."}
+
+@register_tool(
+    description="Get all reservations for a customer by name",
+    parameters={
+        "type": "object",
+        "properties": {
+            "customer_name": {
+                "type": "string",
+                "description": "Name of the customer"
+            }
+        },
+        "required": [
+            "customer_name"
+        ]
+    },
+    read_only=True
+)
+def get_customer_reservations(customer_name):
+    """
+    Get all reservations made under a customer's name.
+    
+    Args:
+        customer_name (str): Name of the customer (case-insensitive)
+        
+    Returns:
+        dict: The customer's reservations, soonest first
+    """
+    matches = get_store().by_customer(customer_name)
+    
+    if not matches:
+        return {"success": False, "error": f"No reservations found for {customer_name}."}
+    
+    matches.sort(key=lambda r: (r["reservation_date"], r["reservation_time"]))
+    return {"success": True, "count": len(matches), "reservations": matches}
\ No newline at end of file
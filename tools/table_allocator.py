@@ -0,0 +1,157 @@
+# tools/table_allocator.py - Assign tables to parties, combining tables when needed
+
+from functools import lru_cache
+from itertools import product
+from pathlib import Path
+import sys
+
+# Add parent directory to path so we can import from other modules
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import MAX_COMBINED_TABLES
+from utils.metrics import REGISTRY
+
+ALLOCATIONS = REGISTRY.counter(
+    "foodiespot_table_allocations_total",
+    "Table allocation attempts by outcome (single, combined, rejected)")
+SEAT_UTILIZATION = REGISTRY.histogram(
+    "foodiespot_table_seat_utilization_ratio",
+    "Share of the assigned seats used by the party, per booking",
+    buckets=(0.25, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0))
+
+
+def table_capacities(restaurant):
+    """
+    Get the seats per table of each table type of a restaurant.
+
+    Args:
+        restaurant (dict): Restaurant record
+
+    Returns:
+        dict: Table type -> seats per table
+    """
+    return {table_type: table["capacity"] for table_type, table in restaurant["tables"].items()}
+
+
+@lru_cache(maxsize=4096)
+def _best_combination(party_size, free, capacities, max_tables):
+    """
+    Find the cheapest tables seating a party.
+
+    The limit is an argument rather than read from the module, so that
+    cached answers are never reused under a different limit.
+
+    Args:
+        party_size (int): Number of people
+        free (tuple): Free tables per type, capped at max_tables
+        capacities (tuple): Seats per table per type, same order as free
+        max_tables (int): Most tables that may be pushed together
+
+    Returns:
+        tuple: Tables used per type, or None if no combination fits
+    """
+    best = None
+    best_cost = None
+    # At most max_tables tables in total, so at most a few dozen candidates
+    for counts in product(*(range(count + 1) for count in free)):
+        tables = sum(counts)
+        if tables == 0 or tables > max_tables:
+            continue
+        seats = sum(n * capacity for n, capacity in zip(counts, capacities))
+        if seats < party_size:
+            continue
+        # Fewest tables to push together first, then fewest empty seats
+        cost = (tables, seats - party_size)
+        if best_cost is None or cost < best_cost:
+            best, best_cost = counts, cost
+    return best
+
+
+def _allowed_types(party_size, capacities):
+    natural = min((capacity for capacity in capacities.values() if capacity >= party_size), default=None)
+    return sorted(
+        (table_type for table_type, capacity in capacities.items()
+         if natural is None or capacity <= natural),
+        key=lambda table_type: capacities[table_type])
+
+
+def _combination(party_size, free, capacities):
+    types = _allowed_types(party_size, capacities)
+    counts = _best_combination(
+        party_size,
+        tuple(min(max(free.get(table_type, 0), 0), MAX_COMBINED_TABLES) for table_type in types),
+        tuple(capacities[table_type] for table_type in types),
+        MAX_COMBINED_TABLES)
+    if counts is None:
+        return None
+    return {table_type: n for table_type, n in zip(types, counts) if n}
+
+
+def can_seat(party_size, tables, capacities):
+    """
+    Check whether a party could be seated if the given tables were free.
+
+    Args:
+        party_size (int): Number of people
+        tables (dict): Table type -> number of tables
+        capacities (dict): Table type -> seats per table
+
+    Returns:
+        bool: True if some allowed combination seats the party
+    """
+    return _combination(party_size, tables, capacities) is not None
+
+
+def allocate(party_size, free, capacities):
+    """
+    Choose the tables for a party.
+
+    A party is seated at tables of its natural type (the smallest type that
+    seats it on its own) or smaller types pushed together, never at a bigger
+    type, so large tables stay free for large parties. Parties bigger than
+    every table combine tables of any type. Among the combinations of at
+    most MAX_COMBINED_TABLES free tables that seat the party, the one with
+    the fewest tables, then the fewest empty seats, wins.
+
+    Args:
+        party_size (int): Number of people
+        free (dict): Table type -> free tables
+        capacities (dict): Table type -> seats per table
+
+    Returns:
+        dict: Table type -> tables assigned, or None if the party cannot be seated
+    """
+    tables = _combination(party_size, free, capacities)
+    if tables is None:
+        ALLOCATIONS.inc(outcome="rejected")
+    else:
+        ALLOCATIONS.inc(outcome="single" if sum(tables.values()) == 1 else "combined")
+    return tables
+
+
+def main_table_type(tables, capacities):
+    """
+    Get the biggest table type among assigned tables.
+
+    Args:
+        tables (dict): Table type -> tables assigned
+        capacities (dict): Table type -> seats per table
+
+    Returns:
+        str: The table type with the most seats per table
+    """
+    return max(tables, key=lambda table_type: capacities[table_type])
+
+
+def record_allocation(party_size, tables, capacities):
+    """
+    Track how well a booking uses the seats it was given.
+
+    Args:
+        party_size (int): Number of people
+        tables (dict): Table type -> tables assigned
+        capacities (dict): Table type -> seats per table
+    """
+    seats = sum(n * capacities[table_type] for table_type, n in tables.items())
+    if seats:
+        SEAT_UTILIZATION.observe(party_size / seats)
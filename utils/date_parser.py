@@ -0,0 +1,209 @@
+# utils/date_parser.py - Deterministic parsing of natural-language dates and times
+
+import datetime
+import re
+from functools import lru_cache
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9, "oct": 10, "october": 10,
+    "nov": 11, "november": 11, "dec": 12, "december": 12
+}
+
+COUNT_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7}
+
+# Hours said without am/pm ("at 7", "7:30") are taken as evening up to this
+# hour, since that is when people eat out
+LATEST_EVENING_HOUR = 9
+
+_MONTH = r"(" + "|".join(sorted(MONTHS, key=len, reverse=True)) + r")\.?"
+_ORDINAL_DAY = r"(\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?:,?\s*(\d{4}))?"
+
+ISO_DATE = re.compile(r"\b(\d{4})[-/.](\d{1,2})[-/.](\d{1,2})\b")
+DAY_FIRST_DATE = re.compile(r"\b(\d{1,2})[-/.](\d{1,2})[-/.](\d{4})\b")
+DAY_MONTH_DATE = re.compile(r"\b" + _ORDINAL_DAY + r"\s+(?:of\s+)?" + _MONTH + _YEAR + r"\b")
+MONTH_DAY_DATE = re.compile(r"\b" + _MONTH + r"\s+" + _ORDINAL_DAY + _YEAR + r"\b")
+RELATIVE_DAY = re.compile(r"\b(day after tomorrow|tomorrow|today|tonight)\b")
+IN_PERIOD = re.compile(r"\bin\s+(\d+|" + "|".join(COUNT_WORDS) + r")\s+(days?|weeks?)\b")
+NEXT_WEEK = re.compile(r"\bnext week\b")
+WEEKDAY = re.compile(r"\b(?:(this|next|coming)\s+)?(" + "|".join(WEEKDAYS) + r")\b")
+ORDINAL_ONLY = re.compile(r"\bthe\s+(\d{1,2})(?:st|nd|rd|th)\b")
+
+NAMED_TIME = re.compile(r"\b(noon|midday|midnight)\b")
+CLOCK_TIME = re.compile(r"\b([01]?\d|2[0-3]):([0-5]\d)(?::[0-5]\d)?(?:\s*([ap])\.?m\b\.?)?")
+DOTTED_TIME = re.compile(r"\b(1[0-2]|0?[1-9])\.([0-5]\d)\s*([ap])\.?m\b")
+MERIDIEM_TIME = re.compile(r"\b(1[0-2]|0?[1-9])\s*([ap])\.?m\b")
+HALF_PAST = re.compile(r"\b(half|quarter)\s+(past|to)\s+(1[0-2]|[1-9])\b")
+BARE_HOUR = re.compile(r"\b(?:at\s+(1[0-2]|[1-9])(?!\s*(?:people|persons|guests|pax|:|\d))\b|(1[0-2]|[1-9])\s*o'?clock\b)")
+
+
+def _safe_date(year, month, day):
+    try:
+        return datetime.date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _upcoming(today, month, day, year=None):
+    """The date for a day and month, rolling over to next year if it has passed."""
+    if year:
+        return _safe_date(year, month, day)
+    candidate = _safe_date(today.year, month, day)
+    if candidate and candidate < today:
+        candidate = _safe_date(today.year + 1, month, day)
+    return candidate
+
+
+def _count(word):
+    return COUNT_WORDS[word] if word in COUNT_WORDS else int(word)
+
+
+@lru_cache(maxsize=1024)
+def _parse_date(text, today_ordinal):
+    today = datetime.date.fromordinal(today_ordinal)
+
+    match = ISO_DATE.search(text)
+    if match:
+        return _safe_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+
+    match = DAY_FIRST_DATE.search(text)
+    if match:
+        return _safe_date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+
+    match = RELATIVE_DAY.search(text)
+    if match:
+        offset = {"today": 0, "tonight": 0, "tomorrow": 1, "day after tomorrow": 2}[match.group(1)]
+        return today + datetime.timedelta(days=offset)
+
+    match = IN_PERIOD.search(text)
+    if match:
+        days = _count(match.group(1)) * (7 if match.group(2).startswith("week") else 1)
+        return today + datetime.timedelta(days=days)
+
+    match = DAY_MONTH_DATE.search(text)
+    if match:
+        year = int(match.group(3)) if match.group(3) else None
+        return _upcoming(today, MONTHS[match.group(2)], int(match.group(1)), year)
+
+    match = MONTH_DAY_DATE.search(text)
+    if match:
+        year = int(match.group(3)) if match.group(3) else None
+        return _upcoming(today, MONTHS[match.group(1)], int(match.group(2)), year)
+
+    match = WEEKDAY.search(text)
+    if match:
+        days_ahead = (WEEKDAYS.index(match.group(2)) - today.weekday()) % 7
+        if match.group(1) == "next" and days_ahead == 0:
+            days_ahead = 7
+        return today + datetime.timedelta(days=days_ahead)
+
+    if NEXT_WEEK.search(text):
+        return today + datetime.timedelta(days=7)
+
+    match = ORDINAL_ONLY.search(text)
+    if match:
+        day = int(match.group(1))
+        candidate = _safe_date(today.year, today.month, day)
+        if candidate is None or candidate < today:
+            next_month = today.replace(day=1) + datetime.timedelta(days=32)
+            candidate = _safe_date(next_month.year, next_month.month, day)
+        return candidate
+
+    return None
+
+
+def _dining_meridiem(hour):
+    """The am/pm to assume for an hour given without one."""
+    return "p" if 1 <= hour <= LATEST_EVENING_HOUR else None
+
+
+def _to_24_hour(hour, minute, meridiem):
+    if meridiem:
+        hour = hour % 12 + (12 if meridiem == "p" else 0)
+    return f"{hour:02d}:{minute:02d}"
+
+
+@lru_cache(maxsize=1024)
+def _parse_time(text):
+    match = NAMED_TIME.search(text)
+    if match:
+        return "00:00" if match.group(1) == "midnight" else "12:00"
+
+    match = CLOCK_TIME.search(text)
+    if match:
+        hour, meridiem = int(match.group(1)), match.group(3)
+        # "07:30" is a 24-hour time; "7:30" is read like "at 7"
+        if not meridiem and not match.group(1).startswith("0"):
+            meridiem = _dining_meridiem(hour)
+        return _to_24_hour(hour, int(match.group(2)), meridiem)
+
+    match = DOTTED_TIME.search(text)
+    if match:
+        return _to_24_hour(int(match.group(1)), int(match.group(2)), match.group(3))
+
+    match = MERIDIEM_TIME.search(text)
+    if match:
+        return _to_24_hour(int(match.group(1)), 0, match.group(2))
+
+    match = HALF_PAST.search(text)
+    if match:
+        hour = int(match.group(3))
+        minute = 30 if match.group(1) == "half" else 15
+        if match.group(2) == "to":
+            hour, minute = hour - 1 or 12, 60 - minute
+        return _to_24_hour(hour, minute, _dining_meridiem(hour))
+
+    match = BARE_HOUR.search(text)
+    if match:
+        hour = int(match.group(1) or match.group(2))
+        return _to_24_hour(hour, 0, _dining_meridiem(hour))
+
+    return None
+
+
+def parse_date(text, today=None):
+    """
+    Find a date in free text and convert it to YYYY-MM-DD.
+
+    Understands ISO and day-first numeric dates ("2025-06-14", "14/06/2025"),
+    month names ("June 14", "14th of June"), "today"/"tonight"/"tomorrow",
+    "day after tomorrow", "in 3 days", "next week", weekdays ("friday" is the
+    coming one, today included; "next friday" skips today) and "the 14th".
+
+    Args:
+        text (str): Text to search
+        today (datetime.date, optional): Date relative expressions count from
+
+    Returns:
+        str: Date in YYYY-MM-DD format, or None if no valid date was found
+    """
+    if not text:
+        return None
+    today = today or datetime.date.today()
+    parsed = _parse_date(str(text).strip().lower(), today.toordinal())
+    return parsed.strftime("%Y-%m-%d") if parsed else None
+
+
+def parse_time(text):
+    """
+    Find a time of day in free text and convert it to 24-hour HH:MM.
+
+    Understands "19:00", "7:30 pm", "7.30pm", "7pm", "noon", "midnight",
+    "half past 7" and bare hours ("at 7", "7 o'clock"). Hours from 1 to
+    LATEST_EVENING_HOUR given without am/pm are read as evening, with or
+    without minutes ("7:30" is 19:30); a leading zero ("07:30") keeps the
+    24-hour reading.
+
+    Args:
+        text (str): Text to search
+
+    Returns:
+        str: Time in HH:MM format, or None if no time was found
+    """
+    if not text:
+        return None
+    return _parse_time(str(text).strip().lower())
@@ -0,0 +1,146 @@
+# utils/file_lock.py - Advisory cross-process file locks with bounded waiting
+
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are kept apart
+    fcntl = None
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger('file_lock')
+
+# How long a writer waits for the lock before giving up
+DEFAULT_LOCK_TIMEOUT = 5.0
+
+# Polling interval while another process holds the lock, doubled up to the maximum
+POLL_INTERVAL = 0.002
+MAX_POLL_INTERVAL = 0.05
+
+LOCK_WAIT = REGISTRY.histogram(
+    "foodiespot_file_lock_wait_seconds",
+    "Time spent acquiring file locks by file")
+LOCK_CONTENDED = REGISTRY.counter(
+    "foodiespot_file_lock_contended_total",
+    "File lock acquisitions that had to wait by file")
+LOCK_TIMEOUTS = REGISTRY.counter(
+    "foodiespot_file_lock_timeouts_total",
+    "File lock acquisitions that gave up by file")
+
+
+class LockTimeout(TimeoutError):
+    """Raised when a file lock cannot be acquired in time."""
+
+
+class _PathLock:
+    """
+    The lock for one path: a re-entrant thread lock so threads of this
+    process queue up without polling, plus an flock held while any thread
+    of this process owns it.
+    """
+
+    __slots__ = ("thread_lock", "fd", "depth")
+
+    def __init__(self):
+        self.thread_lock = threading.RLock()
+        self.fd = None
+        self.depth = 0
+
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _path_lock(lock_path):
+    with _locks_guard:
+        lock = _locks.get(lock_path)
+        if lock is None:
+            lock = _locks[lock_path] = _PathLock()
+        return lock
+
+
+def _acquire_flock(lock_path, deadline):
+    """
+    Open the lock file and take an exclusive flock on it, polling until the deadline.
+
+    Returns:
+        tuple: (file descriptor or None on timeout, whether it had to wait)
+    """
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    interval = POLL_INTERVAL
+    waited = False
+    while True:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd, waited
+        except BlockingIOError:
+            waited = True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                os.close(fd)
+                return None, waited
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, MAX_POLL_INTERVAL)
+
+
+def _timed_out(path, timeout):
+    name = os.path.basename(str(path))
+    LOCK_CONTENDED.inc(file=name)
+    LOCK_TIMEOUTS.inc(file=name)
+    logger.warning(f"Gave up waiting {timeout:g}s for the lock on {path}")
+    return LockTimeout(f"Timed out after {timeout:g}s waiting for the lock on {path}")
+
+
+@contextmanager
+def file_lock(path, timeout=DEFAULT_LOCK_TIMEOUT):
+    """
+    Hold an exclusive advisory lock for a file while the block runs.
+
+    The lock is taken on a "<path>.lock" file next to it, so the data file
+    itself can still be replaced by an atomic rename. Locks are re-entrant
+    within a thread. Readers do not need the lock; only read-modify-write
+    cycles do.
+
+    Args:
+        path (str): The file to lock
+        timeout (float): Seconds to wait before giving up
+
+    Raises:
+        LockTimeout: If the lock is not acquired within the timeout
+    """
+    lock_path = os.path.abspath(str(path)) + ".lock"
+    name = os.path.basename(str(path))
+    lock = _path_lock(lock_path)
+    started = time.monotonic()
+    deadline = started + timeout
+
+    contended = not lock.thread_lock.acquire(blocking=False)
+    if contended and not lock.thread_lock.acquire(timeout=timeout):
+        raise _timed_out(path, timeout)
+    try:
+        if lock.depth == 0 and fcntl is not None:
+            fd, waited = _acquire_flock(lock_path, deadline)
+            contended = contended or waited
+            if fd is None:
+                raise _timed_out(path, timeout)
+            lock.fd = fd
+        if contended:
+            LOCK_CONTENDED.inc(file=name)
+        LOCK_WAIT.observe(time.monotonic() - started, file=name)
+
+        lock.depth += 1
+        try:
+            yield
+        finally:
+            lock.depth -= 1
+            if lock.depth == 0 and lock.fd is not None:
+                fcntl.flock(lock.fd, fcntl.LOCK_UN)
+                os.close(lock.fd)
+                lock.fd = None
+    finally:
+        lock.thread_lock.release()
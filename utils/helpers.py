@@ -2,6 +2,13 @@
 
 import json
 import datetime
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from utils.tracing import span
 
 def load_json_file(file_path):
     """
@@ -14,8 +21,11 @@ def load_json_file(file_path):
         dict or list: The loaded JSON data
     """
     try:
-        with open(file_path, 'r') as file:
-            return json.load(file)
+        with span("load_json_file", path=str(file_path)) as load_span:
+            with open(file_path, 'r') as file:
+                if load_span.recording:
+                    load_span.set_attribute("bytes", os.fstat(file.fileno()).st_size)
+                return json.load(file)
     except FileNotFoundError:
         print(f"Error: File '{file_path}' not found.")
         return []
@@ -28,7 +38,11 @@ def load_json_file(file_path):
 
 def save_json_file(file_path, data):
     """
-    Save data to a JSON file.
+    Save data to a JSON file atomically.
+    
+    The data is written to a temporary file in the same directory, flushed
+    to disk and renamed over the original, so readers and crashes only ever
+    see the old or the new contents, never a partial file.
     
     Args:
         file_path (str): Path to the JSON file
@@ -37,13 +51,49 @@ def save_json_file(file_path, data):
     Returns:
         bool: True if successful, False otherwise
     """
+    temp_path = None
     try:
-        with open(file_path, 'w') as file:
-            json.dump(data, file, indent=2)
+        with span("save_json_file", path=str(file_path)) as save_span:
+            directory = os.path.dirname(os.path.abspath(file_path))
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+            with os.fdopen(fd, 'w') as file:
+                json.dump(data, file, indent=2)
+                file.flush()
+                os.fsync(file.fileno())
+                if save_span.recording:
+                    save_span.set_attribute("bytes", file.tell())
+            if os.path.exists(file_path):
+                os.chmod(temp_path, os.stat(file_path).st_mode & 0o777)
+            else:
+                os.chmod(temp_path, 0o644)
+            os.replace(temp_path, file_path)
+            temp_path = None
+            fsync_directory(directory)
         return True
     except Exception as e:
         print(f"Error saving file: {e}")
         return False
+    finally:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def fsync_directory(directory):
+    """
+    Flush a directory entry change (such as a rename) to disk, where supported.
+    
+    Args:
+        directory (str): Path to the directory
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
 
 def is_valid_date_format(date_str):
     """
@@ -77,9 +127,31 @@ def is_valid_time_format(time_str):
     except ValueError:
         return False
 
+# Crockford base32, whose character order matches numeric order
+ID_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+
+_id_lock = threading.Lock()
+_id_state = {"pid": None, "node": 0, "millis": -1, "sequence": 0}
+
+def _encode_id(value, length):
+    chars = []
+    for _ in range(length):
+        value, digit = divmod(value, 32)
+        chars.append(ID_ALPHABET[digit])
+    return "".join(reversed(chars))
+
 def generate_id(prefix=""):
     """
-    Generate a unique ID based on timestamp.
+    Generate a unique, time-sortable ID.
+    
+    After the prefix comes the UTC creation time to the millisecond as 17
+    digits (YYYYMMDDHHMMSSmmm), then 16 Crockford base32 characters
+    encoding a 32-bit node component that is random per process (re-drawn
+    after a fork) and a 48-bit sequence that starts at a random value each
+    millisecond and counts up within it. IDs from one process therefore
+    sort in creation order, IDs from different processes or hosts do not
+    collide, and, since the older timestamp IDs ("res" + YYYYMMDDHHMMSSffffff)
+    start the same way, new IDs sort after them.
     
     Args:
         prefix (str): Prefix for the ID
@@ -87,5 +159,77 @@ def generate_id(prefix=""):
     Returns:
         str: Unique ID
     """
-    timestamp = datetime.datetime.now().strftime('%Y%m%d%H%M%S%f')
-    return f"{prefix}{timestamp}"
\ No newline at end of file
+    with _id_lock:
+        state = _id_state
+        pid = os.getpid()
+        if state["pid"] != pid:
+            state["pid"] = pid
+            state["node"] = int.from_bytes(os.urandom(4), "big")
+            state["millis"] = -1
+        millis = time.time_ns() // 1_000_000
+        if millis > state["millis"]:
+            state["millis"] = millis
+            # Leave headroom so counting up cannot overflow within the millisecond
+            state["sequence"] = int.from_bytes(os.urandom(6), "big") >> 1
+        else:
+            # Same millisecond, or the clock went backwards: keep counting
+            state["sequence"] += 1
+            if state["sequence"] >= 1 << 48:
+                state["millis"] += 1
+                state["sequence"] = 0
+        millis = state["millis"]
+        value = (state["node"] << 48) | state["sequence"]
+    created = datetime.datetime.fromtimestamp(millis // 1000, tz=datetime.timezone.utc)
+    return f"{prefix}{created:%Y%m%d%H%M%S}{millis % 1000:03d}{_encode_id(value, 16)}"
+
+def id_timestamp(id_str, prefix=""):
+    """
+    Get the creation time encoded in an ID from generate_id().
+    
+    Args:
+        id_str (str): The ID
+        prefix (str): Prefix the ID was generated with
+        
+    Returns:
+        datetime.datetime: Creation time (UTC), or None if the ID is not in that format
+    """
+    body = id_str[len(prefix):] if id_str.startswith(prefix) else None
+    if (not body or len(body) != 33 or not body[:17].isdigit()
+            or any(char not in ID_ALPHABET for char in body[17:].upper())):
+        return None
+    try:
+        created = datetime.datetime.strptime(body[:14], "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+    return created.replace(microsecond=int(body[14:17]) * 1000, tzinfo=datetime.timezone.utc)
+
+def approximate_size(obj):
+    """
+    Estimate the memory used by an object and everything it refers to.
+    
+    Follows dicts, lists, tuples, sets and __slots__ attributes; objects
+    reachable more than once are counted once.
+    
+    Args:
+        obj: Object to measure
+        
+    Returns:
+        int: Approximate size in bytes
+    """
+    seen = set()
+    total = 0
+    stack = [obj]
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        elif hasattr(type(current), "__slots__"):
+            stack.extend(getattr(current, slot) for slot in type(current).__slots__ if hasattr(current, slot))
+    return total
\ No newline at end of file
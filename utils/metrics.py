@@ -0,0 +1,254 @@
+# utils/metrics.py - In-process metrics registry with Prometheus text export
+
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger('metrics')
+
+# Default latency buckets in seconds, from a cached lookup up to a slow completion
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(labels):
+    """Render a label dict as a Prometheus label set."""
+    if not labels:
+        return ""
+    parts = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{name}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value):
+    """Render a sample value the way Prometheus expects."""
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """A monotonically increasing counter, optionally split by labels."""
+
+    type_name = "counter"
+
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        """
+        Increase the counter.
+
+        Args:
+            amount (float): Amount to add (default: 1)
+            **labels: Label values identifying the series
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Get the current value of one series."""
+        with self._lock:
+            return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def render(self):
+        """Render the counter samples in Prometheus text format."""
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """A cumulative latency histogram, optionally split by labels."""
+
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        """
+        Record one observation.
+
+        Args:
+            value (float): Observed value, in seconds for latencies
+            **labels: Label values identifying the series
+        """
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Time the enclosed block and record it, even if it raises.
+
+        Args:
+            **labels: Label values identifying the series
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self, **labels):
+        """Get a copy of one series (bucket counts, sum and count)."""
+        with self._lock:
+            series = self._series.get(tuple(sorted(labels.items())))
+            if series is None:
+                return {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            return {"buckets": list(series["buckets"]), "sum": series["sum"], "count": series["count"]}
+
+    def render(self):
+        """Render the histogram samples in Prometheus text format."""
+        with self._lock:
+            items = sorted((key, dict(series, buckets=list(series["buckets"])))
+                           for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            for bound, count in zip(self.buckets, series["buckets"]):
+                lines.append(f"{self.name}_bucket{_format_labels(key + (('le', _format_value(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{_format_labels(key + (('le', '+Inf'),))} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric of the process and renders them for export."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _get_or_create(self, cls, name, documentation, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} is already registered as a {metric.type_name}")
+            return metric
+
+    def counter(self, name, documentation):
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, documentation)
+
+    def histogram(self, name, documentation, buckets=DEFAULT_BUCKETS):
+        """Get or create a histogram."""
+        return self._get_or_create(Histogram, name, documentation, buckets=buckets)
+
+    def render_prometheus(self):
+        """
+        Render every registered metric in the Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text
+        """
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            documentation = metric.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"# HELP {metric.name} {documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, file_path):
+        """
+        Write the exposition text to a file, e.g. for the node_exporter textfile collector.
+
+        Args:
+            file_path (str): Destination file
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        tmp_path = None
+        try:
+            # A temporary file of our own, so concurrent exports never write into each other's
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(file_path)),
+                                            prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+            with os.fdopen(fd, 'w') as file:
+                file.write(self.render_prometheus())
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, file_path)
+            tmp_path = None
+            return True
+        except OSError as e:
+            logger.error(f"Error writing metrics to {file_path}: {e}")
+            return False
+        finally:
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+# Process-wide registry used by the application
+REGISTRY = MetricsRegistry()
+
+_server = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port, host="127.0.0.1", registry=REGISTRY):
+    """
+    Serve the registry on http://host:port/metrics from a daemon thread.
+
+    Calling this more than once is harmless; only the first call starts a server.
+
+    Args:
+        port (int): Port to listen on
+        host (str): Interface to bind (default: localhost only)
+        registry (MetricsRegistry): Registry to expose
+
+    Returns:
+        ThreadingHTTPServer: The running server
+    """
+    global _server
+    with _server_lock:
+        if _server is not None:
+            return _server
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = registry.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        _server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+        logger.info(f"Serving metrics on http://{host}:{port}/metrics")
+        return _server
@@ -0,0 +1,140 @@
+# utils/profiling.py - On-demand cProfile/tracemalloc capture for single queries
+
+import cProfile
+import contextvars
+import functools
+import logging
+import os
+import pstats
+import random
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+from config import PROFILE_DIR, PROFILE_SAMPLE_RATE, PROFILE_TRACEMALLOC
+
+logger = logging.getLogger('profiling')
+
+# cProfile can only profile one thing at a time per process
+_profile_lock = threading.Lock()
+
+# Profiles of work the turn being profiled handed to other threads
+_worker_profiles = contextvars.ContextVar("worker_profiles", default=None)
+
+
+def should_profile(force=False, sample_rate=None):
+    """
+    Decide whether the current query gets profiled.
+
+    Args:
+        force (bool): Profile regardless of sampling (e.g. sidebar toggle)
+        sample_rate (float, optional): Fraction of queries to profile;
+            defaults to PROFILE_SAMPLE_RATE
+
+    Returns:
+        bool: True if the query should be profiled
+    """
+    if force:
+        return True
+    rate = PROFILE_SAMPLE_RATE if sample_rate is None else sample_rate
+    return rate > 0 and random.random() < rate
+
+
+def profiled(call):
+    """
+    Wrap a callable so that work it does on another thread is part of the profile.
+
+    cProfile only sees the thread that enabled it. When the wrapper runs in
+    a copy of a profiled turn's context (e.g. a tool on the worker pool),
+    it profiles the call on its own thread and hands the result to the
+    turn, which merges it into profile.pstats. Otherwise it just calls.
+
+    Args:
+        call (callable): Function to run
+
+    Returns:
+        callable: The wrapped function
+    """
+    @functools.wraps(call)
+    def run(*args, **kwargs):
+        profiles = _worker_profiles.get()
+        if profiles is None:
+            return call(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler already covers every thread (Python 3.12+)
+            return call(*args, **kwargs)
+        try:
+            return call(*args, **kwargs)
+        finally:
+            profiler.disable()
+            profiles.append(profiler)
+    return run
+
+
+def _dump_stats(profiler, worker_profiles, path):
+    """Write a turn's profile merged with the profiles of its worker threads."""
+    stats = pstats.Stats(profiler)
+    for worker_profiler in list(worker_profiles):
+        try:
+            stats.add(worker_profiler)
+        except TypeError:
+            pass  # Nothing was recorded
+    stats.dump_stats(path)
+
+
+@contextmanager
+def profile_turn(turn_id, force=False, sample_rate=None, trace_memory=None, output_dir=None):
+    """
+    Profile the enclosed block and dump the results to <output_dir>/<turn_id>/.
+
+    Writes profile.pstats (open with pstats or snakeviz) and, when memory
+    tracing is on, allocations.tracemalloc (load with tracemalloc.Snapshot.load).
+    Calls wrapped with profiled() that run on other threads during the block
+    are merged into profile.pstats; a call still running when the block ends
+    is left out. If another query is already being profiled the block runs
+    unprofiled.
+
+    Args:
+        turn_id (str): Identifier of the conversation turn
+        force (bool): Profile regardless of sampling
+        sample_rate (float, optional): Override PROFILE_SAMPLE_RATE
+        trace_memory (bool, optional): Override PROFILE_TRACEMALLOC
+        output_dir (str, optional): Override PROFILE_DIR
+
+    Yields:
+        str: Directory the profile will be written to, or None if not profiling
+    """
+    if not should_profile(force, sample_rate) or not _profile_lock.acquire(blocking=False):
+        yield None
+        return
+
+    trace_memory = PROFILE_TRACEMALLOC if trace_memory is None else trace_memory
+    turn_dir = os.path.join(output_dir or PROFILE_DIR, str(turn_id))
+    started_tracemalloc = trace_memory and not tracemalloc.is_tracing()
+    profiler = cProfile.Profile()
+    worker_profiles = []
+    token = _worker_profiles.set(worker_profiles)
+    try:
+        if started_tracemalloc:
+            tracemalloc.start()
+        profiler.enable()
+        try:
+            yield turn_dir
+        finally:
+            profiler.disable()
+            try:
+                os.makedirs(turn_dir, exist_ok=True)
+                _dump_stats(profiler, worker_profiles, os.path.join(turn_dir, "profile.pstats"))
+                if trace_memory:
+                    tracemalloc.take_snapshot().dump(os.path.join(turn_dir, "allocations.tracemalloc"))
+                logger.info(f"Wrote profile for turn {turn_id} to {turn_dir}")
+            except OSError as e:
+                logger.error(f"Error writing profile for turn {turn_id}: {e}")
+    finally:
+        _worker_profiles.reset(token)
+        if started_tracemalloc:
+            tracemalloc.stop()
+        _profile_lock.release()
@@ -0,0 +1,117 @@
+# utils/singleflight.py - Coalesce identical concurrent calls into one execution
+
+import copy
+import json
+import logging
+import threading
+
+logger = logging.getLogger('singleflight')
+
+
+def make_key(*parts):
+    """
+    Build a stable coalescing key from arbitrary JSON-like parts.
+
+    Args:
+        *parts: Values identifying the call (name, arguments, payload, ...)
+
+    Returns:
+        str: Deterministic key for the call
+    """
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+class _Call:
+    """A single in-flight computation shared by every caller with the same key."""
+
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Ensures that concurrent callers asking for the same key share one
+    computation instead of each doing the full work.
+
+    Only calls that overlap in time are coalesced; nothing is cached once
+    the leading call has returned.
+    """
+
+    def __init__(self, name):
+        """
+        Initialize an empty single-flight group.
+
+        Args:
+            name (str): Name used in logs and stats
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) unless an identical call is already running,
+        in which case wait for it and share its result.
+
+        Args:
+            key (str): Coalescing key, see make_key()
+            fn (callable): The computation to run
+
+        Returns:
+            The result of the computation. Callers that joined an in-flight
+            call receive a deep copy so they cannot mutate each other's data.
+
+        Raises:
+            Exception: Whatever the leading computation raised
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.waiters:
+                logger.debug(f"[{self.name}] shared one result with {call.waiters} waiting caller(s)")
+            call.event.set()
+
+    def stats(self):
+        """
+        Get coalescing counters for this group.
+
+        Returns:
+            dict: Executions, coalesced requests and calls currently in flight
+        """
+        with self._lock:
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls)
+            }
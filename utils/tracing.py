@@ -0,0 +1,266 @@
+# utils/tracing.py - Lightweight trace spans written as JSON Lines
+
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+from config import TRACE_FILE
+
+logger = logging.getLogger('tracing')
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+def _now_us():
+    """Wall-clock time in microseconds, comparable across threads and processes."""
+    return time.time_ns() // 1000
+
+
+class Span:
+    """A timed operation within a trace, with attributes and point-in-time events."""
+
+    __slots__ = ("trace", "span_id", "parent_id", "name", "attributes", "events",
+                 "start_us", "duration_us", "status", "thread_id")
+
+    def __init__(self, trace, name, parent_id, attributes):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes)
+        self.events = []
+        self.start_us = _now_us()
+        self.duration_us = None
+        self.status = "ok"
+        self.thread_id = threading.get_ident()
+
+    @property
+    def recording(self):
+        return True
+
+    def set_attribute(self, key, value):
+        """Attach an attribute (payload size, token count, ...) to the span."""
+        self.attributes[key] = value
+
+    def add_event(self, name, **attributes):
+        """Record a point-in-time event such as an API key rotation."""
+        self.events.append({"name": name, "ts_us": _now_us(), "attributes": attributes})
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_us": self.start_us,
+            "duration_us": self.duration_us,
+            "status": self.status,
+            "pid": os.getpid(),
+            "tid": self.thread_id,
+            "attributes": self.attributes,
+            "events": self.events
+        }
+
+
+class _NoopSpan:
+    """Stand-in used when tracing is disabled; every operation does nothing."""
+
+    __slots__ = ()
+    recording = False
+
+    def set_attribute(self, key, value):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class _Trace:
+    """Collects the finished spans of one trace until its root span ends."""
+
+    def __init__(self, tracer, trace_id):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.finished = []
+        self.closed = False
+        self.lock = threading.Lock()
+
+
+class Tracer:
+    """
+    Produces nested spans and appends each finished trace to a JSON Lines
+    file, one span per line.
+    """
+
+    def __init__(self, file_path=None):
+        """
+        Initialize the tracer.
+
+        Args:
+            file_path (str, optional): Output file; tracing is disabled when None
+        """
+        self.file_path = file_path
+        self._write_lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return bool(self.file_path)
+
+    @contextmanager
+    def start_trace(self, name, trace_id=None, **attributes):
+        """
+        Start a new trace whose root span covers the enclosed block.
+
+        Args:
+            name (str): Root span name
+            trace_id (str, optional): Identifier to use for the trace
+            **attributes: Attributes for the root span
+
+        Yields:
+            Span: The root span
+        """
+        if not self.enabled:
+            yield NOOP_SPAN
+            return
+        trace = _Trace(self, trace_id or uuid.uuid4().hex)
+        try:
+            with self._span(trace, name, None, attributes) as root:
+                yield root
+        finally:
+            with trace.lock:
+                spans, trace.finished, trace.closed = trace.finished, [], True
+            self._write(spans)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Open a child span of the current span. Outside a trace this is a no-op.
+
+        Args:
+            name (str): Span name
+            **attributes: Span attributes
+
+        Yields:
+            Span: The new span, or a no-op span when not tracing
+        """
+        parent = _current_span.get()
+        if parent is None or not self.enabled:
+            yield NOOP_SPAN
+            return
+        with self._span(parent.trace, name, parent.span_id, attributes) as span:
+            yield span
+
+    @contextmanager
+    def _span(self, trace, name, parent_id, attributes):
+        span = Span(trace, name, parent_id, attributes)
+        token = _current_span.set(span)
+        start = time.perf_counter()
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.set_attribute("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.duration_us = int((time.perf_counter() - start) * 1_000_000)
+            _current_span.reset(token)
+            with trace.lock:
+                late = trace.closed
+                if not late:
+                    trace.finished.append(span)
+            if late:
+                # The trace was already written, e.g. a tool finishing after its deadline
+                self._write([span])
+
+    def _write(self, spans):
+        if not spans:
+            return
+        lines = "".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans)
+        try:
+            with self._write_lock:
+                with open(self.file_path, 'a') as file:
+                    file.write(lines)
+        except OSError as e:
+            logger.error(f"Error writing trace to {self.file_path}: {e}")
+
+
+def current_span():
+    """
+    Get the active span in this context.
+
+    Returns:
+        Span: The current span, or a no-op span outside a trace
+    """
+    return _current_span.get() or NOOP_SPAN
+
+
+# Process-wide tracer used by the application
+TRACER = Tracer(TRACE_FILE)
+
+start_trace = TRACER.start_trace
+span = TRACER.span
+
+
+def to_chrome_trace(jsonl_path, output_path):
+    """
+    Convert a JSON Lines trace file to the Chrome trace event format, which
+    chrome://tracing, Perfetto and speedscope can open.
+
+    Args:
+        jsonl_path (str): Trace file written by the Tracer
+        output_path (str): Destination JSON file
+
+    Returns:
+        int: Number of spans converted
+    """
+    events = []
+    with open(jsonl_path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            args = dict(record.get("attributes") or {})
+            args.update(trace_id=record["trace_id"], span_id=record["span_id"],
+                        parent_id=record["parent_id"], status=record["status"])
+            events.append({
+                "name": record["name"],
+                "cat": record["trace_id"],
+                "ph": "X",
+                "ts": record["start_us"],
+                "dur": record["duration_us"] or 0,
+                "pid": record.get("pid", 0),
+                "tid": record.get("tid", 0),
+                "args": args
+            })
+            for event in record.get("events") or []:
+                events.append({
+                    "name": event["name"],
+                    "cat": record["trace_id"],
+                    "ph": "i",
+                    "s": "t",
+                    "ts": event["ts_us"],
+                    "pid": record.get("pid", 0),
+                    "tid": record.get("tid", 0),
+                    "args": event.get("attributes") or {}
+                })
+    with open(output_path, 'w') as file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+    return sum(1 for event in events if event["ph"] == "X")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m utils.tracing <traces.jsonl> <chrome_trace.json>")
+        sys.exit(1)
+    count = to_chrome_trace(sys.argv[1], sys.argv[2])
+    print(f"Converted {count} spans to {sys.argv[2]}")
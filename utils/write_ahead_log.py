@@ -0,0 +1,200 @@
+# utils/write_ahead_log.py - Append-only JSON Lines log with group commit
+
+import json
+import logging
+import os
+import threading
+import time
+
+from utils.metrics import REGISTRY
+
+logger = logging.getLogger('write_ahead_log')
+
+COMMIT_BATCH = REGISTRY.histogram(
+    "foodiespot_wal_commit_batch_entries",
+    "Log entries made durable by one fsync",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+COMMIT_LATENCY = REGISTRY.histogram(
+    "foodiespot_wal_commit_seconds",
+    "Time from asking for an entry to be durable until it is")
+
+
+class WriteAheadLog:
+    """
+    An append-only log of JSON entries made durable in groups.
+
+    append() writes an entry to the file at once, so other processes reading
+    the log see it, but does not fsync. commit() waits until an entry is on
+    disk. The first caller to commit becomes the leader: it waits for the
+    commit window so that concurrent writers can append too, then a single
+    fsync makes every entry appended so far durable and wakes all waiters.
+
+    Appends from several processes must be serialized by the caller (the
+    reservation store appends under its file lock).
+    """
+
+    def __init__(self, path, window=0.002):
+        """
+        Open (or create) the log.
+
+        Args:
+            path (str): Log file
+            window (float): Seconds the leader waits to gather more entries
+                before each fsync
+        """
+        self.path = path
+        self.window = window
+        self._fd = None
+        self._condition = threading.Condition()
+        self._appended = 0  # Entries appended through this handle
+        self._durable = 0   # Entries known to be on disk
+        self._syncing = False
+        self._failed = None
+
+    def _file(self):
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        return self._fd
+
+    def _drop_torn_entry(self, fd):
+        # An entry appended after a torn one would be joined to it and make the log unreadable
+        size = os.fstat(fd).st_size
+        if not size or os.pread(fd, 1, size - 1) == b"\n":
+            return
+        end = size
+        while end > 0:
+            start = max(end - 4096, 0)
+            newline = os.pread(fd, end - start, start).rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        logger.warning(f"Cutting a partly written last entry off {self.path}")
+        os.ftruncate(fd, end)
+
+    def append(self, entry):
+        """
+        Write an entry to the end of the log without waiting for it to be durable.
+
+        A torn last line left by a crash is cut off first, so the entry
+        starts on a line of its own.
+
+        Args:
+            entry (dict): JSON-serializable entry
+
+        Returns:
+            int: Ticket to pass to commit()
+        """
+        data = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._condition:
+            fd = self._file()
+            self._drop_torn_entry(fd)
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            self._appended += 1
+            return self._appended
+
+    def commit(self, ticket):
+        """
+        Wait until an entry, and every entry appended before it, is durable.
+
+        Args:
+            ticket (int): Ticket returned by append()
+
+        Raises:
+            OSError: If the fsync covering the entry failed
+        """
+        started = time.monotonic()
+        with self._condition:
+            while self._durable < ticket:
+                if self._failed is not None:
+                    raise self._failed
+                if self._syncing:
+                    self._condition.wait()
+                    continue
+                # Lead this group: let other writers append, then sync them all at once
+                self._syncing = True
+                self._condition.release()
+                error = None
+                try:
+                    if self.window > 0:
+                        time.sleep(self.window)
+                    with self._condition:
+                        target = self._appended
+                        fd = self._file()
+                    try:
+                        os.fsync(fd)
+                    except OSError as e:
+                        error = e
+                finally:
+                    self._condition.acquire()
+                self._syncing = False
+                if error is None:
+                    COMMIT_BATCH.observe(target - self._durable)
+                    self._durable = max(self._durable, target)
+                else:
+                    logger.error(f"Failed to sync {self.path}: {error}")
+                    self._failed = error
+                self._condition.notify_all()
+        COMMIT_LATENCY.observe(time.monotonic() - started)
+
+    def read(self):
+        """
+        Read every entry in the log.
+
+        A torn last line, left by a crash in the middle of an append, is
+        ignored; that entry was never acknowledged.
+
+        Returns:
+            list: Entries, oldest first
+        """
+        try:
+            with open(self.path, "rb") as file:
+                lines = file.read().split(b"\n")
+        except FileNotFoundError:
+            return []
+        entries = []
+        for number, line in enumerate(lines):
+            if not line.strip():
+                continue
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                if number < len(lines) - 1 and any(rest.strip() for rest in lines[number + 1:]):
+                    raise ValueError(f"Corrupt entry on line {number + 1} of {self.path}")
+                logger.warning(f"Ignoring a partly written last entry in {self.path}")
+        return entries
+
+    def size(self):
+        """Size of the log file in bytes."""
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def truncate(self):
+        """
+        Empty the log once its entries are saved elsewhere.
+
+        Entries waiting for commit count as durable afterwards, since the
+        caller has already written them durably somewhere else.
+        """
+        with self._condition:
+            fd = self._file()
+            os.ftruncate(fd, 0)
+            os.fsync(fd)
+            self._durable = self._appended
+            self._failed = None
+            self._condition.notify_all()
+
+    def close(self):
+        """Make everything appended durable and close the file."""
+        with self._condition:
+            if self._fd is not None:
+                if self._durable < self._appended:
+                    os.fsync(self._fd)
+                    self._durable = self._appended
+                os.close(self._fd)
+                self._fd = None
+            self._condition.notify_all()